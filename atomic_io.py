@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# Atomic IO: 임시 파일 + 이름 바꾸기(rename) 방식의 안전한 파일 쓰기, 프로세스 간 잠금, 데이터 버전 카운터
+#
+# - atomic_write: 같은 폴더의 임시 파일에 모두 쓴 뒤 os.replace로 교체하므로, 읽는 쪽은 항상 완전한 파일만 봅니다.
+# - file_lock: <파일>.lock 에 대한 권고 잠금(advisory lock)으로 관리자 화면과 계수 갱신 스크립트의 동시 쓰기를 막습니다.
+# - data_version / bump_version: 데이터 폴더가 바뀔 때마다 1씩 증가하는 카운터입니다.
+#   캐시는 파일을 다시 읽는 대신 이 값만 확인하여 정확히 바뀐 경우에만 무효화합니다.
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+VERSION_FILENAME = ".version"
+
+_bump_listeners = []  # bump_version 직후 호출할 함수 (data_dir, 새 버전)
+
+
+def _lock_fd(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            time.sleep(0.05)  # LK_LOCK은 약 10초 후 포기하므로 잠금을 얻을 때까지 다시 시도합니다.
+
+
+def _unlock_fd(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path):
+    """
+    path에 대한 배타적 권고 잠금을 겁니다. (잠금 파일: <path>.lock)
+    같은 프로세스 안에서도 중첩해서 걸면 교착 상태가 되므로 주의해야 합니다.
+    """
+    lock_path = f"{path}.lock"
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _lock_fd(fd)
+        try:
+            yield
+        finally:
+            _unlock_fd(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(directory):
+    if os.name != 'posix':
+        return
+    fd = os.open(directory or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, write_func, durable=True):
+    """
+    write_func(임시 파일 경로)로 내용을 쓴 뒤 path를 원자적으로 교체합니다.
+    쓰기 도중 오류가 나면 임시 파일을 지우고 기존 파일은 그대로 둡니다.
+    durable=False이면 fsync를 생략합니다. (캐시처럼 전원이 꺼져 잃어도 다시 만들 수 있는 파일용)
+    """
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory or '.')
+    os.close(fd)
+    try:
+        write_func(tmp_path)
+        # mkstemp는 소유자 전용 권한(0600)으로 만들므로 기존 파일의 권한을 이어받습니다.
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        if durable:
+            with open(tmp_path, 'rb+') as f:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if durable:
+        _fsync_dir(directory)
+
+
+def write_text_atomic(path, text, encoding='utf-8'):
+    def _write(tmp_path):
+        with open(tmp_path, 'w', encoding=encoding) as f:
+            f.write(text)
+    atomic_write(path, _write)
+
+
+def write_csv_atomic(df, path, **to_csv_kwargs):
+    atomic_write(path, lambda tmp_path: df.to_csv(tmp_path, **to_csv_kwargs))
+
+
+def data_version(data_dir='data'):
+    """데이터 폴더의 현재 버전을 반환합니다. 작은 파일 하나만 읽으므로 매 화면 갱신마다 호출해도 됩니다."""
+    try:
+        with open(os.path.join(data_dir, VERSION_FILENAME), 'r', encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def bump_version(data_dir='data', expected=None):
+    """
+    데이터 폴더의 버전을 1 올리고 새 버전을 반환합니다. 데이터 파일을 쓴 뒤 호출합니다.
+    expected가 주어지면 현재 버전이 expected일 때만 올리고, 이미 다른 곳에서 올렸으면 None을 반환합니다.
+    (여러 워커의 파일 감시자가 같은 변경을 한 번만 반영하도록)
+    """
+    version_path = os.path.join(data_dir, VERSION_FILENAME)
+    with file_lock(version_path):
+        current = data_version(data_dir)
+        if expected is not None and current != expected:
+            return None
+        version = current + 1
+        write_text_atomic(version_path, str(version))
+    for listener in list(_bump_listeners):
+        listener(data_dir, version)
+    return version
+
+
+def add_bump_listener(listener):
+    """이 프로세스에서 bump_version이 호출될 때마다 listener(data_dir, 새 버전)를 호출합니다."""
+    _bump_listeners.append(listener)
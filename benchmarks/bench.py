@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# Bench: 점수 계산, 계수 산출, 일정 계산, 보고서 생성 경로의 벤치마크 실행 및 결과 비교
+#
+# 실행:
+#   python benchmarks/bench.py run [--only 이름 ...] [--quick] [--output 결과.json] [--save-baseline]
+#   python benchmarks/bench.py compare [기준.json] [결과.json] [--threshold 0.15]
+#   python benchmarks/bench.py list
+#
+# 결과 JSON에는 항목별 처리량(건/초), p50/p95 지연시간(ms), 최대 메모리(KB)가 기록됩니다.
+# compare는 기준 대비 p50/p95가 threshold 이상 느려지거나, 처리량이 줄거나, 메모리가 늘어난 항목을
+# 회귀(regression)로 표시하고 종료 코드 1을 반환합니다.
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, 'latest.json')
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+
+sys.path.insert(0, REPO_DIR)
+from cases import CASES, SkipBenchmark, prepare_workspace  # noqa: E402
+
+
+def _percentile(sorted_values, q):
+    """선형 보간 백분위수 (sorted_values는 정렬된 목록)"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * q
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+def measure(func, items, iterations, warmup=1):
+    """func를 반복 호출하여 지연시간 분포, 처리량, 최대 메모리를 측정합니다."""
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+
+    # tracemalloc은 호출을 느리게 하므로 시간 측정과 분리하여 한 번 더 호출합니다.
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    total = sum(durations)
+    return {
+        'iterations': iterations,
+        'items_per_call': items,
+        'p50_ms': _percentile(durations, 0.50) * 1000,
+        'p95_ms': _percentile(durations, 0.95) * 1000,
+        'mean_ms': statistics.fmean(durations) * 1000,
+        'throughput_per_s': items * iterations / total if total > 0 else float('inf'),
+        'peak_mem_kb': peak / 1024,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _quiet_streamlit():
+    """Streamlit 밖에서 호출되는 st.* 경고가 결과 출력을 가리지 않도록 로그 수준을 낮춥니다."""
+    from streamlit import config as st_config
+    from streamlit import logger as st_logger
+    st_config.get_config_options()  # 설정을 먼저 읽어야 이후 st.* 호출 때 로그 수준이 다시 바뀌지 않습니다.
+    st_logger.set_log_level(logging.ERROR)
+
+
+def run_benchmarks(names=None, quick=False):
+    names = names or list(CASES.keys())
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise ValueError(f"알 수 없는 벤치마크: {', '.join(unknown)}")
+
+    results, skipped = {}, {}
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='railway_bench_') as workspace:
+        prepare_workspace(workspace)
+        os.chdir(workspace)  # DataManager는 현재 폴더의 data/를 읽습니다.
+        try:
+            for name in names:
+                case = CASES[name]
+                iterations = max(2, case['iterations'] // 4) if quick else case['iterations']
+                try:
+                    func, items = case['setup'](workspace)
+                except SkipBenchmark as e:
+                    skipped[name] = str(e)
+                    print(f"  - {name:<30} 건너뜀: {e}")
+                    continue
+                results[name] = measure(func, items, iterations)
+                r = results[name]
+                print(f"  - {name:<30} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  "
+                      f"{r['throughput_per_s']:>12,.0f} 건/s  메모리 {r['peak_mem_kb']:>9,.0f} KB")
+        finally:
+            os.chdir(original_cwd)
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def compare_results(baseline, current, threshold=0.15, memory_threshold=0.25):
+    """기준 결과와 비교하여 (항목별 비교 행 목록, 회귀 항목 목록)을 반환합니다."""
+    rows, regressions = [], []
+    for name, cur in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            rows.append((name, None, '신규'))
+            continue
+        ratios = {
+            'p50': cur['p50_ms'] / base['p50_ms'] if base['p50_ms'] else 1.0,
+            'p95': cur['p95_ms'] / base['p95_ms'] if base['p95_ms'] else 1.0,
+            'throughput': base['throughput_per_s'] / cur['throughput_per_s'] if cur['throughput_per_s'] else float('inf'),
+            'memory': cur['peak_mem_kb'] / base['peak_mem_kb'] if base['peak_mem_kb'] else 1.0,
+        }
+        reasons = [key for key in ('p50', 'p95', 'throughput') if ratios[key] > 1 + threshold]
+        if ratios['memory'] > 1 + memory_threshold:
+            reasons.append('memory')
+        if reasons:
+            regressions.append((name, reasons))
+        rows.append((name, ratios, '회귀: ' + ', '.join(reasons) if reasons else '정상'))
+    return rows, regressions
+
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_json(data, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="철도 성과 분석 도구 벤치마크")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="벤치마크 실행")
+    run_parser.add_argument('--only', nargs='+', help="실행할 항목 이름")
+    run_parser.add_argument('--quick', action='store_true', help="반복 횟수를 줄여 빠르게 실행")
+    run_parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    run_parser.add_argument('--save-baseline', action='store_true', help=f"결과를 기준으로 저장 ({DEFAULT_BASELINE})")
+
+    compare_parser = sub.add_parser('compare', help="기준 결과와 비교")
+    compare_parser.add_argument('baseline', nargs='?', default=DEFAULT_BASELINE)
+    compare_parser.add_argument('current', nargs='?', default=DEFAULT_OUTPUT)
+    compare_parser.add_argument('--threshold', type=float, default=0.15, help="시간/처리량 허용 악화 비율 (기본 0.15 = 15%%)")
+    compare_parser.add_argument('--memory-threshold', type=float, default=0.25, help="메모리 허용 증가 비율")
+
+    sub.add_parser('list', help="벤치마크 항목 목록")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name, case in CASES.items():
+            print(f"{name:<30} 반복 {case['iterations']}회")
+        return 0
+
+    if args.command == 'run':
+        _quiet_streamlit()
+        print("🚀 벤치마크 실행")
+        data = run_benchmarks(args.only, args.quick)
+        _save_json(data, args.output)
+        print(f"✅ 결과 저장: {args.output}")
+        if args.save_baseline:
+            _save_json(data, DEFAULT_BASELINE)
+            print(f"✅ 기준 저장: {DEFAULT_BASELINE}")
+        return 0
+
+    rows, regressions = compare_results(_load_json(args.baseline), _load_json(args.current), args.threshold, args.memory_threshold)
+    print("기준 대비 배율 (1보다 크면 나빠진 것)")
+    print(f"{'항목':<30}{'p50':>8}{'p95':>8}{'처리량':>8}{'메모리':>8}  판정")
+    for name, ratios, verdict in rows:
+        if ratios is None:
+            print(f"{name:<30}{'':>32}  {verdict}")
+            continue
+        print(f"{name:<30}{ratios['p50']:>7.2f}x{ratios['p95']:>7.2f}x{ratios['throughput']:>7.2f}x{ratios['memory']:>7.2f}x  {verdict}")
+    if regressions:
+        print(f"🚨 회귀 {len(regressions)}건 (허용 {args.threshold:.0%})")
+        return 1
+    print("✅ 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
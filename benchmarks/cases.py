@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# Cases: 벤치마크 항목 정의
+# 각 항목의 setup(workspace)은 (측정할 함수, 1회 호출당 처리 건수)를 반환합니다.
+# 실행 환경에서 사용할 수 없는 항목은 setup에서 SkipBenchmark를 발생시킵니다.
+import contextlib
+import io
+import os
+
+import pandas as pd
+
+from generators import KPIS, RAIL_TYPES, make_coefficients, make_pai_survey, make_policy_catalog, make_survey, make_tci_survey
+
+CASES = {}
+
+RAIL_TYPE_CODES = {"고속철도": "H", "일반철도": "L", "광역철도": "W"}
+
+
+class SkipBenchmark(Exception):
+    """실행 환경 문제로 측정할 수 없는 항목입니다. (예: PDF 렌더링용 시스템 라이브러리 없음)"""
+
+
+def benchmark(name, iterations=20):
+    def register(setup):
+        CASES[name] = {'setup': setup, 'iterations': iterations}
+        return setup
+    return register
+
+
+def prepare_workspace(workspace):
+    """DataManager가 읽는 data/ 폴더와 계수 갱신 스크립트가 읽는 mini/ 폴더를 합성 데이터로 만듭니다."""
+    data_dir = os.path.join(workspace, 'data')
+    mini_dir = os.path.join(workspace, 'mini')
+    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(mini_dir, exist_ok=True)
+
+    coeffs_df = make_coefficients()
+    coeffs_df.to_csv(os.path.join(data_dir, 'coefficients.csv'), index=False, sep='\t', encoding='utf-8')
+    make_policy_catalog(1000).to_csv(os.path.join(data_dir, 'policy_db.csv'), index=False, encoding='utf-8')
+    for i, row in coeffs_df.iterrows():
+        survey_df = make_survey(300, row['model_type'], seed=i)
+        survey_df.to_csv(os.path.join(mini_dir, f"{row['kpi']}_{RAIL_TYPE_CODES[row['rail_type']]}.csv"), index=False)
+
+
+def _calculator():
+    from m1 import DataManager
+    from m2 import SatisfactionCalculator
+    config, _, _ = DataManager().load_coefficients()
+    return SatisfactionCalculator(config)
+
+
+def _scalar_inputs():
+    values = [v * 0.5 for v in range(1, 201)]
+    pairs = [(rail_type, kpi) for rail_type in RAIL_TYPES for kpi in KPIS]
+    return pairs, values
+
+
+@benchmark("satisfaction_forward")
+def satisfaction_forward(workspace):
+    calc = _calculator()
+    pairs, values = _scalar_inputs()
+
+    def run():
+        for rail_type, kpi in pairs:
+            for value in values:
+                calc.calculate_satisfaction(rail_type, kpi, value)
+    return run, len(pairs) * len(values)
+
+
+@benchmark("satisfaction_reverse")
+def satisfaction_reverse(workspace):
+    calc = _calculator()
+    pairs, _ = _scalar_inputs()
+    scores = [s * 0.05 for s in range(1, 201)]
+
+    def run():
+        for rail_type, kpi in pairs:
+            for score in scores:
+                calc.reverse_calculate_value(rail_type, kpi, score)
+    return run, len(pairs) * len(scores)
+
+
+@benchmark("satisfaction_forward_array")
+def satisfaction_forward_array(workspace):
+    import numpy as np
+    calc = _calculator()
+    pairs, _ = _scalar_inputs()
+    values = np.linspace(0.5, 100.0, 10_000)
+
+    def run():
+        for rail_type, kpi in pairs:
+            calc.calculate_satisfaction_array(rail_type, kpi, values)
+    return run, len(pairs) * len(values)
+
+
+@benchmark("tci_score_array")
+def tci_score_array(workspace):
+    import numpy as np
+    from m2 import calculate_tci_score_array
+    modes = ['대중교통', '도보', '승용차', '택시/배웅', 'PM']
+    coeffs = {'P': dict(zip(modes, [0.3, 0.25, 0.15, 0.1, 0.1])), 'c': dict(zip(modes, [150.0, 80.0, 200.0, 120.0, 60.0]))}
+    rng = np.random.default_rng(0)
+    distances = rng.uniform(0.0, 600.0, (100_000, len(modes)))
+    distances[rng.random(distances.shape) < 0.3] = np.nan
+    return (lambda: calculate_tci_score_array(distances, coeffs, 10.0, modes)), len(distances)
+
+
+@benchmark("kpi_indicator_values")
+def kpi_indicator_values(workspace):
+    import numpy as np
+    import indicators
+    rng = np.random.default_rng(0)
+    rows = 1_000_000
+    kpis = rng.choice(list(indicators.INDICATORS), rows).astype(object)
+    val1, val2, val3 = rng.uniform(0, 300, rows), rng.uniform(0, 300, rows), rng.uniform(0, 5000, rows)
+    val2[rng.random(rows) < 0.05] = 0.0
+    return (lambda: indicators.kpi_values(kpis, val1, val2, val3)), rows
+
+
+@benchmark("load_coefficients", iterations=50)
+def load_coefficients(workspace):
+    from m1 import DataManager
+    return (lambda: DataManager().load_coefficients()), 1
+
+
+def _survey_fit(model_type):
+    def setup(workspace):
+        from m6 import SurveyAnalyzer
+        survey_df = make_survey(500, 'B' if model_type == 'auto' else model_type).rename(columns={'KPI': 'kpi_value', 'Satisfaction': 'satisfaction_score'})
+        analyzer = SurveyAnalyzer()
+        return (lambda: analyzer.calculate_coefficients("고속철도", "운행횟수", survey_df, model_type=model_type)), 1
+    return setup
+
+
+for _model in ('A', 'B', 'C', 'auto'):
+    benchmark(f"survey_fit_model_{_model}")(_survey_fit(_model))
+
+
+@benchmark("survey_fit_tci", iterations=5)
+def survey_fit_tci(workspace):
+    from m6 import SurveyAnalyzer
+    survey_df = make_tci_survey(100_000).rename(columns={'Satisfaction': 'satisfaction_score'})
+    analyzer = SurveyAnalyzer()
+    return (lambda: analyzer.calculate_coefficients("고속철도", "환승시설 편의성", survey_df, model_type='auto')), len(survey_df)
+
+
+@benchmark("survey_fit_pai_weights", iterations=5)
+def survey_fit_pai_weights(workspace):
+    from m6 import SurveyAnalyzer
+    survey_df = make_pai_survey(500_000).rename(columns={'Satisfaction': 'satisfaction_score'})
+    analyzer = SurveyAnalyzer()
+    return (lambda: analyzer.calculate_coefficients("고속철도", "물리적 접근성", survey_df, model_type='A')), len(survey_df)
+
+
+@benchmark("coefficient_updater_refit", iterations=5)
+def coefficient_updater_refit(workspace):
+    import coefficient_updater
+    # 스크립트의 경로 상수를 작업 폴더로 바꿔 저장소의 실제 계수 파일을 건드리지 않도록 합니다.
+    coefficient_updater.DATA_DIR = os.path.join(workspace, 'data')
+    coefficient_updater.MINI_DIR = os.path.join(workspace, 'mini')
+    coefficient_updater.COEFF_FILE_PATH = os.path.join(workspace, 'data', 'coefficients.csv')
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            coefficient_updater.update_coefficients()
+    return run, len(make_coefficients())
+
+
+@benchmark("create_timeline_data")
+def create_timeline_data(workspace):
+    from m4 import ProjectRecommender
+    catalog = make_policy_catalog(1000)
+    recommender = ProjectRecommender()
+    return (lambda: recommender.create_timeline_data(catalog, 2040, 6)), len(catalog)
+
+
+@benchmark("generate_report", iterations=5)
+def generate_report(workspace):
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError) as e:
+        raise SkipBenchmark(f"weasyprint를 사용할 수 없습니다: {str(e).splitlines()[0]}")
+    import altair as alt
+    from m4 import ProjectRecommender
+    from m5 import PdfGenerator
+
+    catalog = make_policy_catalog(30)
+    timeline_df = ProjectRecommender().create_timeline_data(catalog, 2035, 12)
+    line_df = pd.DataFrame({'연도': list(range(2025, 2036)), '만족도': [5 + 0.3 * i for i in range(11)]})
+    report_data = {
+        'target_kpi': '운행횟수', 'rail_type': '고속철도', 'line_name': '합성노선', 'unit': '회/일',
+        'input_val_1': 40, 'current_val': 40.0, 'current_score': 6.5, 'target_year': 2035, 'target_month': 12,
+        'future_input_val_1': 60, 'is_fail': True, 'future_predict_score': 7.2, 'future_goal_score': 8.5,
+        'future_predict_val': 60.0, 'future_goal_val': 80.0,
+        'summary_df': pd.DataFrame({'구분': ['현재', '예측', '목표'], '만족도': [6.5, 7.2, 8.5]}),
+        'active_policies': catalog.assign(start_date_calc='2030-01', duration_months_display='60개월'),
+        'line_chart': alt.Chart(line_df).mark_line().encode(x='연도:O', y='만족도:Q'),
+        'timeline_chart': alt.Chart(timeline_df).mark_bar().encode(x='Start:T', x2='End:T', y='Project:N'),
+        'analysis_proposal': ["합성 데이터로 생성한 보고서입니다."],
+    }
+    generator = PdfGenerator()
+    return (lambda: generator.generate_report(report_data)), 1
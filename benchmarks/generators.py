@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Generators: 벤치마크용 합성 데이터 (정책 카탈로그, 설문조사, 시나리오 묶음, 만족도 계수)
+# 같은 seed를 주면 항상 같은 데이터가 만들어지므로 실행 간 결과를 비교할 수 있습니다.
+import numpy as np
+import pandas as pd
+
+RAIL_TYPES = ["고속철도", "일반철도", "광역철도"]
+KPIS = ["PAI", "TAI", "EAI", "TF", "TV", "TOTP", "TCI", "SC", "TC", "TPC"]
+CATEGORIES = ["철도 건설", "차량", "운영", "시설 개량", "역사", "환승", "안전", "정보화"]
+RELATED_KPIS = ["열차 운행횟수, 열차이용 쾌적성", "표정속도", "환승시설 편의성", "역사 시설 쾌적성", "열차운행 정시성"]
+PROCESSES = ["예비타당성조사 → 기본계획 → 기본설계 및 실시설계 → 공사 착공", "계획 수립 → 시행", "설계 → 시공 → 준공"]
+S_MAX = 10.0
+
+
+def make_policy_catalog(rows, seed=0):
+    """data/policy_db.csv와 같은 컬럼의 추진 과제 카탈로그"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'active': rng.random(rows) < 0.5,
+        'category': rng.choice(CATEGORIES, rows),
+        'name': [f"추진 과제 {i}" for i in range(rows)],
+        'cost': [f"{c:,}원/km" for c in rng.integers(10**6, 10**10, rows)],
+        'duration_months': rng.integers(1, 240, rows),
+        'process': rng.choice(PROCESSES, rows),
+        'related_kpi': rng.choice(RELATED_KPIS, rows),
+    })
+
+
+def make_coefficients(seed=0):
+    """철도 유형 x 성과지표 조합의 계수표 (PAI, TF는 Model A, 나머지는 Model B)"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for kpi in KPIS:
+        for rail_type in RAIL_TYPES:
+            if kpi in ("PAI", "TF"):
+                rows.append([rail_type, kpi, 'A', 'c', rng.uniform(0.02, 0.1), None, None, rng.uniform(0.6, 0.9)])
+            else:
+                rows.append([rail_type, kpi, 'B', 'a', rng.uniform(0.03, 0.8), f"{kpi}_0", rng.uniform(3, 120), rng.uniform(0.4, 0.9)])
+    return pd.DataFrame(rows, columns=['rail_type', 'kpi', 'model_type', 'param1_name', 'param1_value', 'param2_name', 'param2_value', 'R_squared'])
+
+
+def make_survey(rows, model_type='A', seed=0, noise=0.6):
+    """설문조사 결과 양식(respond_ID, KPI, Satisfaction)의 합성 응답. 지정한 모델 곡선에 잡음을 더합니다."""
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0.5, 60.0, rows)
+    if model_type == 'A':
+        s = S_MAX * (1 - np.exp(-0.05 * x))
+    elif model_type == 'B':
+        s = S_MAX / (1 + np.exp(0.15 * (x - 30.0)))
+    else:
+        s = S_MAX * np.exp(-0.03 * x)
+    s = np.clip(np.round(s + rng.normal(0, noise, rows)), 0, S_MAX)
+    return pd.DataFrame({'respond_ID': [f"R{i:06d}" for i in range(rows)], 'KPI': x.round(2), 'Satisfaction': s})
+
+
+TCI_MODES = ["대중교통", "도보", "승용차", "택시/배웅", "PM"]
+
+
+def make_tci_survey(rows, seed=0, noise=0.6):
+    """환승시설 편의성 응답(respond_ID, 수단별 환승 거리 m, Satisfaction). 이용하지 않은 수단은 빈 칸입니다."""
+    rng = np.random.default_rng(seed)
+    P = np.array([0.3, 0.25, 0.15, 0.1, 0.1])
+    c = np.array([150.0, 80.0, 200.0, 120.0, 60.0])
+    distances = rng.uniform(10.0, 600.0, (rows, len(TCI_MODES))).round()
+    distances[rng.random(distances.shape) < 0.5] = np.nan
+    distances[np.isnan(distances).all(axis=1), 0] = 100.0
+    terms = np.where(np.isnan(distances), 0.0, 1 - np.exp(-c / np.nan_to_num(distances, nan=1.0)))
+    s = np.clip(np.round(S_MAX * terms @ P + rng.normal(0, noise, rows)), 0, S_MAX)
+    df = pd.DataFrame(distances, columns=TCI_MODES)
+    df.insert(0, 'respond_ID', [f"R{i:06d}" for i in range(rows)])
+    df['Satisfaction'] = s
+    return df
+
+
+PAI_MODES = ["도보", "마을/시내버스", "광역버스", "지하철/광역철도", "승용차", "자전거", "택시", "공유PM"]
+
+
+def make_pai_survey(rows, seed=0, noise=0.6):
+    """물리적 접근성 응답(respond_ID, 접근 수단별 이용 가능 여부 1/0, Satisfaction). 기존 고속철도 가중치와 Model A 곡선을 따릅니다."""
+    rng = np.random.default_rng(seed)
+    weights = np.array([10.28, 18.22, 4.21, 19.16, 20.56, 0.47, 26.64, 0.47])
+    available = (rng.random((rows, len(PAI_MODES))) < 0.5).astype(int)
+    s = S_MAX * (1 - np.exp(-0.03608 * available @ weights))
+    s = np.clip(np.round(s + rng.normal(0, noise, rows)), 0, S_MAX)
+    df = pd.DataFrame(available, columns=PAI_MODES)
+    df.insert(0, 'respond_ID', [f"R{i:06d}" for i in range(rows)])
+    df['Satisfaction'] = s
+    return df
+
+
+def make_survey_archive(rows, seed=0):
+    """여러 설문을 묶어 보관한 형태 (rail_type, kpi 구분 컬럼 포함)"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'respond_ID': [f"R{i:08d}" for i in range(rows)],
+        'rail_type': rng.choice(RAIL_TYPES, rows),
+        'kpi': rng.choice(KPIS, rows),
+        'KPI': rng.gamma(2.0, 10.0, rows).round(2),
+        'Satisfaction': rng.integers(0, 11, rows).astype(float),
+    })
+
+
+def make_scenario_batch(count, seed=0):
+    """시나리오 라이브러리/비교 화면에서 쓰는 형식의 시나리오 (이름, 값 dict) 목록"""
+    rng = np.random.default_rng(seed)
+    kpi_names = ["시간적 접근성", "운행횟수", "표정속도", "열차운행 정시성", "열차이용 쾌적성", "역사 시설 쾌적성", "경제적 접근성"]
+    scenarios = []
+    for i in range(count):
+        scenarios.append((f"scenario_{i}", {
+            'target_kpi': str(rng.choice(kpi_names)),
+            'rail_type': str(rng.choice(RAIL_TYPES)),
+            'line_name': f"노선{i % 50}",
+            'input_val_1': float(rng.uniform(1, 200)),
+            'input_val_2': float(rng.uniform(1, 300)),
+            'input_val_3': float(rng.uniform(0, 5000)),
+            'input_minute': float(rng.uniform(10, 300)),
+            'target_year_input': int(rng.integers(2026, 2040)),
+            'target_month_input': int(rng.integers(1, 13)),
+            'predict_score': float(rng.uniform(2, 9)),
+            'future_goal_score_input': float(rng.uniform(3, 10)),
+            'goal_input_method': '만족도',
+        }))
+    return scenarios
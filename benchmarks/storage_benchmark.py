@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Storage Benchmark: 대용량 정책 카탈로그와 설문조사 보관 데이터의 CSV / Parquet 읽기 시간과 메모리 비교
+# 실행: python benchmarks/storage_benchmark.py [--policy-rows 200000] [--survey-rows 2000000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generators import make_policy_catalog, make_survey_archive  # noqa: E402
+from storage import CSV_SEPARATORS, read_parquet, write_parquet  # noqa: E402
+
+def _best_of(func, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(dataset, df, workdir, repeat):
+    csv_path = os.path.join(workdir, f"{dataset}.csv")
+    parquet_path = os.path.join(workdir, f"{dataset}.parquet")
+    sep = CSV_SEPARATORS[dataset]
+    df.to_csv(csv_path, index=False, encoding='utf-8', sep=sep)
+    write_parquet(df, parquet_path, dataset)
+
+    csv_time, csv_df = _best_of(lambda: pd.read_csv(csv_path, encoding='utf-8', sep=sep), repeat)
+    parquet_time, parquet_df = _best_of(lambda: read_parquet(parquet_path), repeat)
+    return {
+        'dataset': dataset,
+        'rows': len(df),
+        'csv_mb': os.path.getsize(csv_path) / 2**20,
+        'parquet_mb': os.path.getsize(parquet_path) / 2**20,
+        'csv_load_s': csv_time,
+        'parquet_load_s': parquet_time,
+        'csv_mem_mb': csv_df.memory_usage(deep=True).sum() / 2**20,
+        'parquet_mem_mb': parquet_df.memory_usage(deep=True).sum() / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV / Parquet 저장 형식 성능 비교")
+    parser.add_argument('--policy-rows', type=int, default=200_000)
+    parser.add_argument('--survey-rows', type=int, default=2_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [
+            run('policy', make_policy_catalog(args.policy_rows), workdir, args.repeat),
+            run('survey', make_survey_archive(args.survey_rows), workdir, args.repeat),
+        ]
+
+    print(f"{'데이터':<8}{'행 수':>12}{'파일 CSV/PQ (MB)':>22}{'읽기 CSV/PQ (s)':>22}{'메모리 CSV/PQ (MB)':>24}")
+    for r in results:
+        print(f"{r['dataset']:<8}{r['rows']:>12,}"
+              f"{r['csv_mb']:>12.1f} / {r['parquet_mb']:<7.1f}"
+              f"{r['csv_load_s']:>12.3f} / {r['parquet_load_s']:<7.3f}"
+              f"{r['csv_mem_mb']:>13.1f} / {r['parquet_mem_mb']:<7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+# Change Log: 데이터 파일의 행 단위 변경분을 추가 전용(append-only) 로그로 저장하고 주기적으로 압축합니다.
+#
+# 파일 구성 (예: data/policy_db_modified.csv)
+#   - 기준 파일: data/policy_db_modified.csv
+#   - 변경 로그: data/policy_db_modified.csv.changes
+#       1행: {"base": [크기, 수정시각, inode], "generation": 세대, "ids": [행ID, ...]}
+#            -> 이 로그가 적용될 기준 파일의 스탬프, 행 ID 체계의 세대, 기준 파일 각 행의 ID
+#       2행~: {"set": {행ID: {컬럼: 값}}, "add": [[행ID, {컬럼: 값}]], "delete": [행ID]}  -> 저장 1회당 1행
+#
+# 행 ID는 기준 파일의 행 번호(0부터)이며, 새로 추가된 행은 시간 기반 ID를 받습니다.
+# 압축은 행 ID와 세대를 그대로 유지하므로, 압축 전에 읽은 화면에서도 이어서 저장할 수 있습니다.
+# 기준 파일이 통째로 바뀌면(전체 저장, 외부 수정) 스탬프가 달라져 이전 로그는 무시되고 새 세대가 시작됩니다.
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from atomic_io import atomic_write, bump_version, file_lock, write_text_atomic
+
+COMPACT_THRESHOLD = 50  # 로그에 쌓인 저장 횟수가 이 값을 넘으면 백그라운드에서 압축합니다.
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def _generation_of(stamp):
+    """기준 파일을 새로 쓸 때 시작되는 행 ID 세대 이름입니다."""
+    return "-".join(str(v) for v in stamp) if stamp else None
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return str(value)
+
+
+def _clean_cells(cells):
+    """NaN/None을 JSON null로 통일합니다."""
+    cleaned = {}
+    for col, value in cells.items():
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            cleaned[col] = None
+        else:
+            cleaned[col] = value
+    return cleaned
+
+
+def editor_changes(input_df, edit_state, transform=None):
+    """
+    st.data_editor의 편집 상태(edited_rows / added_rows / deleted_rows)를 행 ID 기준 변경분으로 변환합니다.
+    - input_df: data_editor에 전달한 DataFrame (index = 행 ID)
+    - transform: 화면용 컬럼을 저장용 컬럼으로 바꾸는 함수 (cells -> cells)
+    반환값: (set, add, delete)
+    """
+    transform = transform or (lambda cells: cells)
+    edit_state = edit_state or {}
+    index = input_df.index
+
+    updates = {}
+    for pos, cells in edit_state.get('edited_rows', {}).items():
+        updates[int(index[int(pos)])] = _clean_cells(transform(dict(cells)))
+
+    # 여러 관리자가 동시에 행을 추가해도 충돌하지 않도록 시간 기반 ID를 사용합니다.
+    base_id = time.time_ns()
+    added = [[base_id + i, _clean_cells(transform(dict(cells)))]
+             for i, cells in enumerate(edit_state.get('added_rows', []))]
+
+    deleted = [int(index[int(pos)]) for pos in edit_state.get('deleted_rows', [])]
+    for row_id in deleted:
+        updates.pop(row_id, None)
+    return updates, added, deleted
+
+
+class ChangeLog:
+    """데이터 파일 하나에 대한 행 단위 변경 로그입니다."""
+
+    _locks = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, base_path, read_func, write_func):
+        """
+        - read_func(path) -> DataFrame: 기준 파일 읽기
+        - write_func(df, path): 기준 파일 쓰기
+        """
+        self.base_path = base_path
+        self.log_path = f"{base_path}.changes"
+        self.read_func = read_func
+        self.write_func = write_func
+        with ChangeLog._locks_guard:
+            self.lock = ChangeLog._locks.setdefault(os.path.abspath(base_path), threading.Lock())
+
+    # --- 읽기 ---
+    def _read_log(self):
+        """(헤더, 저장 단위 목록)을 반환합니다. 쓰는 중인 마지막 줄(개행 없음)은 무시합니다."""
+        if not os.path.exists(self.log_path):
+            return {}, []
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        lines = content.split('\n')
+        complete = lines[:-1]  # 마지막 원소는 개행 뒤의 빈 문자열이거나 미완성 줄입니다.
+        if not complete:
+            return {}, []
+        header = json.loads(complete[0])
+        batches = []
+        for line in complete[1:]:
+            try:
+                batches.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # 비정상 종료로 잘린 줄은 건너뜁니다.
+        return header, batches
+
+    def _current_log(self, stamp):
+        """기준 파일에 적용할 수 있는 (세대, 행 ID 목록, 저장 단위 목록)을 반환합니다."""
+        header, batches = self._read_log()
+        if header.get('base') != stamp:
+            generation, ids = self._next_state(header, stamp)
+            return generation, ids, []
+        return header.get('generation'), header.get('ids'), batches
+
+    @staticmethod
+    def _next_state(header, stamp):
+        """
+        헤더가 가리키지 않는 기준 파일의 (세대, 행 ID)
+        - 압축 중(헤더에 'compacting')이면 기준 파일은 이미 로그를 반영한 것이므로 압축 후의 세대와 행 ID
+        - 로그가 없거나 다른 기준 파일의 로그이면 기준 파일의 행 번호가 곧 행 ID인 새 세대
+        """
+        compacting = header.get('compacting')
+        if compacting is not None:
+            return compacting['generation'], compacting['ids']
+        return _generation_of(stamp), None
+
+    @staticmethod
+    def _apply_batches(df, batches):
+        if not batches:
+            return df
+        rows = {row_id: row for row_id, row in zip(df.index, df.to_dict('records'))}
+        for batch in batches:
+            for row_id in batch.get('delete', []):
+                rows.pop(int(row_id), None)
+            for row_id, cells in batch.get('set', {}).items():
+                row = rows.get(int(row_id))
+                if row is not None:
+                    row.update(cells)
+            for row_id, cells in batch.get('add', []):
+                rows[int(row_id)] = dict(cells)
+        result = pd.DataFrame.from_records(list(rows.values()), index=list(rows.keys()), columns=df.columns)
+        for col in result.columns:
+            # 로그에서 복원한 값 때문에 숫자 컬럼이 object가 되지 않도록 원래 타입을 유지합니다.
+            if pd.api.types.is_numeric_dtype(df[col].dtype) and not pd.api.types.is_bool_dtype(df[col].dtype):
+                result[col] = pd.to_numeric(result[col], errors='coerce')
+        return result
+
+    def read_snapshot(self):
+        """
+        기준 파일에 변경 로그를 적용한 일관된 스냅샷을 반환합니다. (index = 행 ID)
+        df.attrs['generation']에 행 ID 세대를 기록하며, 기준 파일이 없으면 None을 반환합니다.
+        """
+        for _ in range(3):
+            stamp_before = _file_stamp(self.base_path)
+            if stamp_before is None:
+                return None
+            df = self.read_func(self.base_path)
+            generation, ids, batches = self._current_log(stamp_before)
+            if _file_stamp(self.base_path) != stamp_before:
+                continue  # 읽는 도중 압축이 일어났으므로 다시 읽습니다.
+            df = df.reset_index(drop=True)
+            if ids is not None and len(ids) == len(df):
+                df.index = pd.Index(ids, dtype='int64')
+            df = self._apply_batches(df, batches)
+            df.attrs['generation'] = generation
+            return df
+        raise RuntimeError(f"'{self.base_path}' 파일이 계속 변경되어 일관된 스냅샷을 읽지 못했습니다.")
+
+    def pending_batches(self):
+        return len(self._current_log(_file_stamp(self.base_path))[2])
+
+    # --- 쓰기 ---
+    @contextmanager
+    def _locked(self):
+        """같은 프로세스의 스레드와 다른 프로세스(계수 갱신 스크립트 등)의 쓰기를 모두 막습니다."""
+        with self.lock, file_lock(self.base_path):
+            yield
+
+    def _write_header_locked(self, generation, ids=None):
+        header = {'base': _file_stamp(self.base_path), 'generation': generation, 'ids': ids}
+        write_text_atomic(self.log_path, json.dumps(header) + '\n')
+
+    def _mark_compacting_locked(self, generation, ids):
+        """
+        기준 파일을 바꾸기 전에 압축 후의 세대와 행 ID를 헤더에 기록합니다. (저장 단위 줄은 그대로 둠)
+        기준 파일 교체와 헤더 갱신 사이에 읽는 쪽도 같은 세대와 행 ID를 보게 됩니다. (_next_state)
+        """
+        content = ''
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        first, _, rest = content.partition('\n')
+        header = json.loads(first) if first else {}
+        header['compacting'] = {'generation': generation, 'ids': ids}
+        write_text_atomic(self.log_path, json.dumps(header) + '\n' + rest)
+
+    def _write_base_locked(self, df):
+        atomic_write(self.base_path, lambda tmp_path: self.write_func(df, tmp_path))
+
+    def _notify(self):
+        bump_version(os.path.dirname(self.base_path))
+
+    def write_full(self, df):
+        """전체 데이터를 기준 파일로 쓰고 로그를 비웁니다. 행 ID는 새 세대의 행 번호로 다시 매겨집니다. (일괄 교체 시 사용)"""
+        with self._locked():
+            self._write_base_locked(df)
+            self._write_header_locked(_generation_of(_file_stamp(self.base_path)))
+        self._notify()
+
+    def rewrite(self, update_func, default_func=None):
+        """
+        잠금을 유지한 채로 현재 스냅샷을 읽고 update_func(df)의 결과로 전체를 교체합니다.
+        읽기와 쓰기 사이에 다른 저장이 끼어들어 변경분을 잃어버리는 일을 막습니다.
+        - default_func: 기준 파일이 아직 없을 때 스냅샷 대신 사용할 DataFrame을 반환하는 함수
+        """
+        with self._locked():
+            df = self.read_snapshot()
+            if df is None:
+                df = default_func() if default_func else None
+            updated = update_func(df)
+            self._write_base_locked(updated)
+            self._write_header_locked(_generation_of(_file_stamp(self.base_path)))
+        self._notify()
+        return updated
+
+    def append(self, updates=None, added=None, deleted=None, generation=None):
+        """
+        변경분을 로그에 한 줄로 추가합니다. 비용은 변경된 행 수에 비례합니다.
+        generation: 변경분의 행 ID를 만든 스냅샷의 세대(df.attrs['generation']). 그 사이 전체 저장으로
+                    행 ID 체계가 바뀌었다면 잘못된 행을 고치지 않도록 ValueError를 발생시킵니다.
+        """
+        updates, added, deleted = updates or {}, added or [], deleted or []
+        if not (updates or added or deleted):
+            return 0
+        batch = {'set': {str(k): v for k, v in updates.items()}, 'add': added, 'delete': deleted}
+        line = json.dumps(batch, ensure_ascii=False, default=_json_default) + '\n'
+
+        with self._locked():
+            stamp = _file_stamp(self.base_path)
+            header, batches = self._read_log()
+            if header.get('base') != stamp:
+                next_generation, ids = self._next_state(header, stamp)
+                self._write_header_locked(next_generation, ids)
+                header, batches = {'generation': next_generation}, []
+            if generation is not None and generation != header.get('generation'):
+                raise ValueError("다른 곳에서 데이터가 먼저 갱신되었습니다. 데이터를 새로고침한 뒤 다시 저장해주세요.")
+            with open(self.log_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    line = '\n' + line  # 비정상 종료로 잘린 줄과 합쳐지지 않도록 줄을 바꿉니다.
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            pending = len(batches) + 1
+        self._notify()
+
+        if pending >= COMPACT_THRESHOLD:
+            self.compact_in_background()
+        return pending
+
+    def compact(self):
+        """로그를 기준 파일에 반영하고 로그를 비웁니다. 행 ID와 세대는 그대로 유지됩니다."""
+        with self._locked():
+            df = self.read_snapshot()
+            if df is None:
+                return
+            generation, ids = df.attrs['generation'], [int(i) for i in df.index]
+            self._mark_compacting_locked(generation, ids)
+            self._write_base_locked(df)
+            self._write_header_locked(generation, ids)
+        self._notify()
+
+    def compact_in_background(self):
+        thread = threading.Thread(target=self.compact, name=f"compact:{os.path.basename(self.base_path)}", daemon=True)
+        thread.start()
+        return thread
+
+    def remove(self):
+        """기준 파일과 로그를 모두 삭제합니다. (초기 복원 시 사용)"""
+        with self._locked():
+            for path in (self.log_path, self.base_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        self._notify()
@@ -7,7 +7,10 @@
 import os
 import pandas as pd
 import numpy as np
-from scipy.optimize import curve_fit
+from atomic_io import bump_version, write_csv_atomic
+from fitting import cross_validate_many, fit_job, fit_many, fit_pai, fit_tci, keep_absent_pai_weights, make_job, pai_design, tci_design
+from ingest import read_table
+from storage import is_parquet, read_parquet
 
 # --- 상수 정의 ---
 # mini/coefficient_analyzer.py 와 동일한 로직을 가져옴
@@ -32,69 +35,117 @@ RAIL_TYPE_CODE_MAP = {
 }
 
 class SurveyAnalyzer:
-    def __init__(self):
+    """설문 데이터를 관리자 화면(m6)과 같은 피팅 작업(fitting.make_job)으로 바꿉니다."""
+
+    def __init__(self, b_x0='mean'):
         self.kpi_abbreviations = KPI_ABBREVIATIONS
         self.s_max = 10.0
+        self.b_x0 = b_x0
 
-    def _model_a(self, X, c, X0): return self.s_max * (1 - np.exp(-c * (X - X0)))
-    def _model_b(self, X, a, X0): return self.s_max / (1 + np.exp(a * (X - X0)))
-    def _model_c(self, X, c): return self.s_max * np.exp(-c * X)
-
-    def _fit_model(self, X_data, S_data, model_func, initial_guesses, bounds=None):
-        try:
-            popt, _ = curve_fit(model_func, X_data, S_data, p0=initial_guesses, bounds=bounds, maxfev=5000)
-            return popt
-        except (RuntimeError, ValueError):
-            return None
-
-    def calculate_single_model(self, survey_df, kpi_abbr, model_type):
+    def make_job(self, survey_df, rail_type, kpi_abbr, model_type, key=None):
+        """설문 데이터(KPI, Satisfaction 열)로 피팅 작업을 만듭니다. 데이터가 3개 미만이거나 모델을 모르면 None"""
         # Ensure data is numeric, coercing errors to NaN and then dropping them
         survey_df['KPI'] = pd.to_numeric(survey_df['KPI'], errors='coerce')
         survey_df['Satisfaction'] = pd.to_numeric(survey_df['Satisfaction'], errors='coerce')
         survey_df.dropna(subset=['KPI', 'Satisfaction'], inplace=True)
-        
-        X_data = survey_df['KPI'].values
-        S_data = survey_df['Satisfaction'].values
 
-        if len(X_data) < 3:
+        if len(survey_df) < 3 or model_type not in ('A', 'B', 'C'):
             return None
+        return make_job(kpi_abbr, rail_type, model_type, survey_df['KPI'].values, survey_df['Satisfaction'].values,
+                        key=key, b_x0=self.b_x0, s_max=self.s_max)
 
-        model_func, popt, params_found = None, None, None
-        
-        # 모델 타입에 따라 분기
-        if model_type == 'A':
-            model_func = self._model_a
-            initial_guesses = [0.1, np.median(X_data)] 
-            bounds = ([0, X_data.min()], [np.inf, X_data.max()])
-            popt = self._fit_model(X_data, S_data, model_func, initial_guesses, bounds)
-            if popt is not None: params_found = {'c': popt[0], f'{kpi_abbr}_0': popt[1]}
-        elif model_type == 'B':
-            model_func = self._model_b
-            popt = self._fit_model(X_data, S_data, model_func, [0.1, np.median(X_data)], ([0, X_data.min()], [np.inf, X_data.max()]))
-            if popt is not None: params_found = {'a': popt[0], f'{kpi_abbr}_0': popt[1]}
-        elif model_type == 'C':
-            model_func = self._model_c
-            popt = self._fit_model(X_data, S_data, model_func, [0.001], ([0.], [np.inf]))
-            if popt is not None: params_found = {'c': popt[0]}
-
-        if params_found:
-            s_pred = model_func(X_data, *popt)
-            sse = np.sum((S_data - s_pred) ** 2)
-            sst = np.sum((S_data - np.mean(S_data)) ** 2)
-            r_squared = 1 - (sse / sst) if sst > 0 else 0
-            stats = {"R-squared": r_squared}
-            return {'params': params_found, 'stats': stats}
-        return None
-
-def update_coefficients():
+    def calculate_single_model(self, survey_df, kpi_abbr, model_type, rail_type=None):
+        job = self.make_job(survey_df, rail_type, kpi_abbr, model_type)
+        if job is None:
+            return None
+        result = fit_job(job)
+        return result if result['params'] else None
+
+
+def update_coefficients(b_x0='mean', cv=None):
     """
     coefficients.csv 파일을 읽고, 각 행에 대해 분석을 수행한 후,
     계산된 파라미터로 다시 파일을 업데이트합니다.
+    저장은 임시 파일에 쓴 뒤 교체하므로 앱은 잘린 파일을 보지 않습니다. 관리자 화면의 저장은 이 파일이 아니라
+    coefficients_modified 파일(변경 로그)에 기록되며, 그 파일이 있으면 앱은 이 스크립트의 결과 대신 그것을 사용합니다.
+    b_x0: Model B의 변곡점 처리 ('mean': 관리자 화면과 같이 평균으로 고정, 'free': 함께 추정)
+    cv: 폴드 수. 주면 계수 산출 뒤 행마다 k-fold 교차 검증 결과(표본 외 RMSE/R², 계수 변동계수)를 출력합니다.
     """
+    _update_coefficients(b_x0, cv)
+    bump_version(DATA_DIR)
+
+
+def _print_cross_validation(jobs, coeffs_df, k):
+    """모든 행의 폴드를 한 번에 피팅해 교차 검증 결과를 출력합니다. (계수 파일은 바꾸지 않음)"""
+    print(f"\n🔁 {k}-fold 교차 검증 결과 (표본 외)")
+    for report in cross_validate_many(jobs, k=k):
+        row = coeffs_df.loc[report['key']]
+        summary = report['summary']
+        stability = ', '.join(f"{p.parameter} CV={p.cv:.3f}" for p in report['parameters'].itertuples())
+        failed = f" | 실패 폴드: {summary['failed folds']}" if summary['failed folds'] else ""
+        print(f"   {row['rail_type']}-{row['kpi']} | 모델: {row['model_type']} | "
+              f"RMSE: {summary['RMSE mean']:.4f}±{summary['RMSE std']:.4f} | "
+              f"R²: {summary['R-squared mean']:.4f}±{summary['R-squared std']:.4f} | 계수 안정성: {stability}{failed}")
+
+
+def _update_tci_rows(coeffs_df, rail_type, survey_df, indices, s_max):
+    """TCI 설문 데이터(수단별 거리)로 P_j, c_j를 함께 추정해 수단별 행(param1: P_<수단>, param2: c_<수단>)을 갱신합니다."""
     try:
-        # The CSV file is actually tab-separated, so specify sep='\t'
-        coeffs_df = pd.read_csv(COEFF_FILE_PATH, encoding='cp949', sep='\t')
-    except FileNotFoundError:
+        D, S = tci_design(survey_df)
+        result = fit_tci(D, S, s_max=s_max)
+    except ValueError as e:
+        print(f"❌ 분석 실패: {rail_type}-TCI | {e}")
+        return
+    if result['params'] is None:
+        print(f"❌ 분석 실패: {rail_type}-TCI | 계수를 산출할 수 없습니다. ({result['message']})")
+        return
+    params, stats = result['params'], result['stats']
+    print(f"✅ 분석 완료: {rail_type}-TCI | 응답자: {len(S):,}명 | R²: {stats['R-squared']:.4f} | ΣP: {stats['Sum P']:.4f} | 반복: {stats['Iterations']}회 | 결과: {params}")
+    for index in indices:
+        for name_col, value_col in (('param1_name', 'param1_value'), ('param2_name', 'param2_value')):
+            name = coeffs_df.loc[index, name_col]
+            if name in params:
+                coeffs_df.loc[index, value_col] = params[name]
+        coeffs_df.loc[index, 'R_squared'] = stats['R-squared']
+
+
+def _update_pai_rows(coeffs_df, rail_type, survey_df, indices, s_max):
+    """PAI 설문 데이터의 접근 수단 열로 가중치(w_<수단>)와 alpha를 추정해 해당 행을 갱신합니다. (곡선 계수는 파일의 현재 값)"""
+    curve = coeffs_df[(coeffs_df['rail_type'] == rail_type) & (coeffs_df['kpi'] == 'PAI') & coeffs_df['param1_name'].isin(['c', 'a'])]
+    if curve.empty:
+        print(f"❌ 분석 실패: {rail_type}-PAI 가중치 | 만족도 곡선 계수(c 또는 a) 행이 없습니다.")
+        return
+    curve = curve.iloc[0]
+    x0 = float(curve['param2_value']) if curve['model_type'] == 'B' else None
+    try:
+        A, S, modes = pai_design(survey_df)
+        result = fit_pai(A, S, modes, curve['model_type'], [float(curve['param1_value'])], s_max=s_max, x0=x0)
+    except ValueError as e:
+        print(f"⚠️ 경고: {rail_type}-PAI 가중치 | {e}")
+        return
+    if result['params'] is None:
+        print(f"❌ 분석 실패: {rail_type}-PAI 가중치 | 계수를 산출할 수 없습니다. ({result['message']})")
+        return
+    # 파일에 열이 없는 수단은 현재 행의 가중치 기여(alpha × w)를 유지합니다.
+    rows = coeffs_df.loc[indices]
+    previous = dict(zip(rows['param1_name'], rows['param1_value'].astype(float)))
+    previous_weights = {name[2:]: value for name, value in previous.items() if str(name).startswith('w_')}
+    params, kept = keep_absent_pai_weights(result, previous_weights, previous.get('alpha', 1.0))
+    stats = result['stats']
+    print(f"✅ 분석 완료: {rail_type}-PAI 가중치 | 응답자: {len(S):,}명 | R²: {stats['R-squared']:.4f} | 반복: {stats['Iterations']}회 | 결과: {params}")
+    if kept:
+        print(f"   ↳ 설문 파일에 열이 없어 기존 기여를 유지한 수단: {', '.join(kept)}")
+    for index in indices:
+        name = coeffs_df.loc[index, 'param1_name']
+        if name in params:
+            coeffs_df.loc[index, 'param1_value'] = params[name]
+            coeffs_df.loc[index, 'R_squared'] = stats['R-squared']
+
+
+def _update_coefficients(b_x0='mean', cv=None):
+    # 인코딩(utf-8/cp949)과 구분자(탭)는 파일 앞부분으로 판별
+    coeffs_df = read_table(COEFF_FILE_PATH)
+    if coeffs_df is None:
         print(f"🚨 오류: '{COEFF_FILE_PATH}' 파일을 찾을 수 없습니다.")
         return
 
@@ -102,15 +153,27 @@ def update_coefficients():
     if 'R_squared' not in coeffs_df.columns:
         coeffs_df['R_squared'] = np.nan
 
-    analyzer = SurveyAnalyzer()
+    analyzer = SurveyAnalyzer(b_x0=b_x0)
     print("🚀 계수 업데이트를 시작합니다...")
 
+    # 1) 모든 행의 설문 데이터를 읽어 피팅 작업을 만든 뒤, 2) fit_many로 한 번에 피팅합니다. (큰 작업은 CPU가 여러 개일 때 프로세스 풀)
+    jobs = []
+    tci_rows = {}  # 철도 유형 -> (설문 데이터, 수단별 계수 행 목록): TCI는 철도 유형마다 모든 수단을 함께 추정
+    pai_rows = {}  # 철도 유형 -> 가중치(w_<수단>, alpha) 행 목록: 곡선 계수(c)를 갱신한 뒤 같은 설문 파일로 추정
+    pai_surveys = {}
     # DataFrame 복사본을 만들어 순회 중 변경사항이 원본에 영향을 주지 않도록 함
     for index, row in coeffs_df.copy().iterrows():
         rail_type = row['rail_type']
         kpi = row['kpi']
         model_type = row['model_type']
 
+        if model_type == 'TCI' and rail_type in tci_rows:
+            tci_rows[rail_type][1].append(index)
+            continue
+        if kpi == 'PAI' and (str(row['param1_name']).startswith('w_') or row['param1_name'] == 'alpha'):
+            pai_rows.setdefault(rail_type, []).append(index)
+            continue
+
         # 소스 데이터 파일 이름 구성
         rail_code = RAIL_TYPE_CODE_MAP.get(rail_type)
         if not rail_code:
@@ -120,7 +183,11 @@ def update_coefficients():
         source_filename = f"{kpi}_{rail_code}.csv"
         source_filepath = os.path.join(MINI_DIR, source_filename)
 
-        if not os.path.exists(source_filepath):
+        # 설문 데이터를 Parquet로 보관한 경우 CSV보다 우선하여 사용
+        parquet_filepath = os.path.join(MINI_DIR, f"{kpi}_{rail_code}.parquet")
+        if os.path.exists(parquet_filepath):
+            source_filepath = parquet_filepath
+        elif not os.path.exists(source_filepath):
             # 'TV' -> 'Tv' 같은 대소문자 변형 시도
             if kpi.lower() != kpi:
                 source_filename_lower = f"{kpi.lower()}_{rail_code}.csv"
@@ -135,7 +202,12 @@ def update_coefficients():
                 continue
         
         try:
-            survey_df = pd.read_csv(source_filepath)
+            survey_df = read_parquet(source_filepath) if is_parquet(source_filepath) else read_table(source_filepath)
+            if model_type == 'TCI':
+                tci_rows[rail_type] = (survey_df, [index])
+                continue
+            if kpi == 'PAI':
+                pai_surveys[rail_type] = survey_df.copy()
             if 'KPI' not in survey_df.columns or 'Satisfaction' not in survey_df.columns:
                  print(f"⚠️ 경고: '{source_filepath}'에 'KPI' 또는 'Satisfaction' 열이 없습니다. (행 {index+2})")
                  continue
@@ -143,14 +215,24 @@ def update_coefficients():
             print(f"🚨 오류: '{source_filepath}' 파일 읽기 중 오류 발생: {e} (행 {index+2})")
             continue
 
-        # 분석 수행
-        result = analyzer.calculate_single_model(survey_df, kpi, model_type)
+        job = analyzer.make_job(survey_df, rail_type, kpi, model_type, key=index)
+        if job is None:
+            print(f"❌ 분석 실패: {rail_type}-{kpi} | 모델: {model_type} | 데이터가 부족하거나 알 수 없는 모델입니다.")
+            continue
+        jobs.append(job)
+
+    # 분석 수행
+    for result in fit_many(jobs):
+        index = result['key']
+        row = coeffs_df.loc[index]
+        rail_type, kpi, model_type = row['rail_type'], row['kpi'], row['model_type']
 
-        if result and 'params' in result and 'stats' in result:
+        if result['params']:
             params = result['params']
             stats = result['stats']
             r_squared = stats['R-squared']
-            print(f"✅ 분석 완료: {rail_type}-{kpi} | 모델: {model_type} | R²: {r_squared:.4f} | 결과: {params}")
+            unit = f" | 피팅 단위: 1/{result['scale']:,.0f} (계수는 원래 단위)" if result['scale'] != 1.0 else ""
+            print(f"✅ 분석 완료: {rail_type}-{kpi} | 모델: {model_type} | R²: {r_squared:.4f} | 반복: {stats['Iterations']}회{unit} | 결과: {params}")
 
             # 파라미터 업데이트
             param1_name = row['param1_name']
@@ -164,16 +246,35 @@ def update_coefficients():
             # R-squared 값 업데이트
             coeffs_df.loc[index, 'R_squared'] = r_squared
         else:
-            print(f"❌ 분석 실패: {rail_type}-{kpi} | 모델: {model_type} | 계수를 산출할 수 없습니다.")
+            print(f"❌ 분석 실패: {rail_type}-{kpi} | 모델: {model_type} | 계수를 산출할 수 없습니다. ({result['error']})")
+
+    for rail_type, (survey_df, indices) in tci_rows.items():
+        _update_tci_rows(coeffs_df, rail_type, survey_df, indices, analyzer.s_max)
+    for rail_type, indices in pai_rows.items():
+        if rail_type in pai_surveys:
+            _update_pai_rows(coeffs_df, rail_type, pai_surveys[rail_type], indices, analyzer.s_max)
+        else:
+            print(f"⚠️ 경고: {rail_type}-PAI 설문 데이터가 없어 접근 수단 가중치를 갱신하지 않습니다.")
+
+    if cv:
+        _print_cross_validation(jobs, coeffs_df, cv)
 
     # 업데이트된 DataFrame을 CSV 파일로 저장
     try:
         # UTF-8 with BOM으로 저장하여 Excel에서 한글이 깨지지 않도록 함
-        coeffs_df.to_csv(COEFF_FILE_PATH, index=False, encoding='utf-8-sig')
+        # 앱(DataManager)과 같이 탭으로 구분하여 쓰고, 임시 파일에 쓴 뒤 교체하여 읽는 쪽이 잘린 파일을 보지 않도록 함
+        write_csv_atomic(coeffs_df, COEFF_FILE_PATH, index=False, encoding='utf-8-sig', sep='\t')
         print(f"\n🎉 모든 계수 업데이트가 완료되었습니다. 결과가 '{COEFF_FILE_PATH}'에 저장되었습니다.")
     except Exception as e:
         print(f"🚨 오류: 최종 CSV 파일 저장 중 오류 발생: {e}")
 
 
 if __name__ == "__main__":
-    update_coefficients()
+    import argparse
+    parser = argparse.ArgumentParser(description="설문 데이터(mini 폴더)로 data/coefficients.csv의 계수를 다시 산출합니다.")
+    parser.add_argument('--b-x0', choices=['mean', 'free'], default='mean',
+                        help="Model B 변곡점: mean=데이터 평균으로 고정(관리자 화면과 동일), free=함께 추정")
+    parser.add_argument('--cv', type=int, metavar='K',
+                        help="계수 산출 뒤 행마다 K-fold 교차 검증 결과(표본 외 RMSE/R², 계수 변동계수)를 출력")
+    args = parser.parse_args()
+    update_coefficients(b_x0=args.b_x0, cv=args.cv)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# Data Watcher: data 폴더를 감시해 데이터 버전을 관리합니다.
+#
+# - 앱 밖에서 데이터 파일이 바뀌면(직접 편집한 CSV, 파일 복사 등) 데이터 버전을 올려
+#   메모리 캐시(st.cache_*)와 디스크 캐시(disk_cache)가 다음 화면 갱신에서 새 파일을 읽게 합니다.
+#   앱과 coefficient_updater.py는 저장할 때 이미 버전을 올리므로, 그 경우에는 다시 올리지 않습니다.
+# - 감시자가 실행 중이면 data_version()은 파일을 읽지 않고 메모리의 값을 반환합니다.
+#   (화면 갱신마다 파일 시스템을 확인하지 않음)
+# - 캐시 폴더, 잠금 파일(.lock), 버전 파일, 임시 파일, 시나리오 DB는 무시합니다.
+# - 환경 변수 RAILWAY_WATCH=0 으로 끌 수 있고, watchdog가 없으면 기존처럼 버전 파일을 읽습니다.
+import logging
+import os
+import threading
+
+import streamlit as st
+
+import atomic_io
+from perf import increment
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog 없이 실행할 때
+    FileSystemEventHandler = object
+    Observer = None
+
+ENABLE_ENV = "RAILWAY_WATCH"
+DEBOUNCE_SECONDS = 0.5     # 연속된 파일 이벤트(쓰기 여러 번, 임시 파일 교체)를 한 번의 변경으로 묶는 시간
+DATA_EXTENSIONS = ('.csv', '.tsv', '.txt', '.xlsx', '.xls', '.parquet', '.changes')
+EVENT_TYPES = ('created', 'modified', 'deleted', 'moved')
+
+_watchers = {}  # {절대 경로: DataWatcher}
+_watchers_lock = threading.Lock()
+
+
+def is_data_file(path):
+    """데이터 버전에 영향을 주는 파일인지 (숨김/임시/잠금 파일, 하위 폴더는 제외)"""
+    name = os.path.basename(path)
+    return not name.startswith('.') and name.lower().endswith(DATA_EXTENSIONS)
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in EVENT_TYPES:
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if not path or os.path.dirname(os.path.abspath(path)) != self.watcher.data_dir:
+                continue
+            name = os.path.basename(path)
+            if name == atomic_io.VERSION_FILENAME:
+                self.watcher.refresh_version()
+            elif is_data_file(name):
+                self.watcher.data_changed(path)
+
+
+class DataWatcher:
+    """data 폴더 하나를 감시하는 watchdog 감시자와 그 폴더의 데이터 버전"""
+
+    def __init__(self, data_dir='data', debounce=DEBOUNCE_SECONDS):
+        self.data_dir = os.path.abspath(data_dir)
+        self.debounce = debounce
+        self.version = atomic_io.data_version(self.data_dir)
+        # 파일 이벤트 순서로 본 버전: 이 프로세스의 저장은 bump 리스너가 self.version을 먼저 올리지만
+        # 그 저장의 데이터 파일 이벤트는 나중에 도착하므로, 비교 기준(expected)은 이 값을 씁니다.
+        self._fs_version = self.version
+        self._lock = threading.Lock()
+        self._pending_version = None  # 아직 반영되지 않은 변경이 처음 감지되었을 때의 (파일 이벤트 순서) 버전
+        self._timer = None
+        self._observer = None
+
+    @property
+    def running(self):
+        return self._observer is not None and self._observer.is_alive()
+
+    def start(self):
+        self._observer = Observer()
+        self._observer.schedule(_Handler(self), self.data_dir, recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+        # 감시 시작 전에 바뀐 버전을 놓치지 않도록 한 번 더 읽습니다.
+        self.refresh_version()
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+    def refresh_version(self):
+        """
+        버전 파일이 바뀌었을 때 (다른 프로세스의 저장 포함)
+        데이터 파일 쓰기 → 버전 올리기 순서이므로, 그 전에 감지된 변경은 이 버전에 이미 반영된 것으로 봅니다.
+        """
+        with self._lock:
+            self._fs_version = atomic_io.data_version(self.data_dir)
+            self.version = self._fs_version
+            if self._pending_version is not None and self._fs_version > self._pending_version:
+                self._pending_version = None
+
+    def set_version(self, version):
+        """이 프로세스에서 버전을 올렸을 때 (파일 이벤트를 기다리지 않고 바로 반영)"""
+        with self._lock:
+            self.version = max(self.version, version)
+
+    def data_changed(self, path):
+        with self._lock:
+            if self._pending_version is None:
+                self._pending_version = self._fs_version
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self):
+        with self._lock:
+            expected, self._pending_version = self._pending_version, None
+        if expected is None:
+            return
+        # 저장한 쪽이 이미 버전을 올렸거나 다른 워커의 감시자가 먼저 반영했으면 None
+        version = atomic_io.bump_version(self.data_dir, expected=expected)
+        if version is not None:
+            increment('data_changes_detected')
+            logging.info(f"데이터 파일 변경 감지: 데이터 버전 {expected} -> {version}")
+        self.refresh_version()
+
+
+def _on_bump(data_dir, version):
+    watcher = _watchers.get(os.path.abspath(data_dir))
+    if watcher is not None:
+        watcher.set_version(version)
+
+
+atomic_io.add_bump_listener(_on_bump)
+
+
+def start(data_dir='data'):
+    """
+    data_dir 감시를 시작합니다. 여러 번 호출해도 폴더당 한 번만 시작합니다.
+    RAILWAY_WATCH=0 이거나 watchdog가 없으면 아무것도 하지 않고 False를 반환합니다.
+    """
+    if Observer is None or os.environ.get(ENABLE_ENV, '1').strip().lower() in ('0', 'false', 'off', 'no'):
+        return False
+    key = os.path.abspath(data_dir)
+    with _watchers_lock:
+        if key not in _watchers:
+            if not os.path.isdir(key):
+                return False
+            watcher = DataWatcher(key)
+            try:
+                watcher.start()
+            except OSError as e:  # inotify 감시 개수 한도 초과 등
+                logging.warning(f"데이터 폴더 감시를 시작하지 못했습니다: {e}")
+                return False
+            _watchers[key] = watcher
+    return True
+
+
+def data_version(data_dir='data'):
+    """
+    데이터 폴더의 현재 버전. 감시자가 실행 중이면 메모리의 값을, 아니면 버전 파일을 읽어 반환합니다.
+    캐시 키로 쓰는 곳(화면 갱신 경로)은 atomic_io.data_version 대신 이 함수를 사용합니다.
+    """
+    watcher = _watchers.get(os.path.abspath(data_dir))
+    if watcher is not None and watcher.running:
+        return watcher.version
+    return atomic_io.data_version(data_dir)
+
+
+def notify_session(data_dir='data'):
+    """
+    현재 세션이 마지막으로 본 데이터 버전과 비교해, 그 사이 데이터가 바뀌었으면 사용자 화면에 알립니다.
+    계수와 정책 DB는 버전별 캐시에서 읽으므로 이번 화면 갱신부터 새 값으로 계산됩니다.
+    """
+    version = data_version(data_dir)
+    seen = st.session_state.get('seen_data_version')
+    st.session_state.seen_data_version = version
+    if seen is not None and seen != version and st.session_state.get('view_mode') == 'user':
+        st.toast("🔄 만족도 계수 또는 추진 과제 데이터가 갱신되어 최신 값으로 계산합니다.")
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+# Disk Cache: 여러 워커 프로세스와 배치 실행이 함께 쓰는 디스크 캐시
+#
+# - 위치: 환경 변수 RAILWAY_CACHE_DIR (기본 data/cache). serve.py는 모든 워커에 같은 폴더를 지정합니다.
+# - 키: 입력 내용의 해시 + 데이터 버전/파일 서명. 입력이나 데이터가 바뀌면 키가 달라지므로 별도 무효화가 필요 없습니다.
+# - 항목은 <폴더>/<namespace>/<키 앞 2자리>/<키>.pkl 파일 하나이며, 임시 파일에 쓴 뒤 이름을 바꿔(atomic_io) 교체합니다.
+#   다른 프로세스는 항상 완전한 항목만 읽습니다.
+# - 크기 제한(RAILWAY_CACHE_MAX_MB, 기본 512MB)을 넘으면 가장 오래 사용하지 않은 항목부터 지웁니다. (LRU: 파일 수정 시각)
+# - 만든 지 RAILWAY_CACHE_TTL초(기본 7일)가 지난 항목은 사용하지 않습니다.
+# - RAILWAY_DISK_CACHE=0 이면 캐시를 쓰지 않고 매번 계산합니다.
+# - 캐시 폴더는 이 앱만 쓰는 로컬 폴더여야 합니다. (항목을 pickle로 저장합니다)
+#
+# 명령:
+#   python disk_cache.py stats | clear | evict | prefill
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import perf
+from atomic_io import atomic_write, file_lock
+
+DIR_ENV = "RAILWAY_CACHE_DIR"
+MAX_MB_ENV = "RAILWAY_CACHE_MAX_MB"
+TTL_ENV = "RAILWAY_CACHE_TTL"
+ENABLE_ENV = "RAILWAY_DISK_CACHE"
+DEFAULT_DIR = os.path.join("data", "cache")
+DEFAULT_MAX_MB = 512
+DEFAULT_TTL = 7 * 24 * 3600
+ENTRY_SUFFIX = ".pkl"
+EVICT_CHECK_INTERVAL = 60.0     # 크기 확인(폴더 전체 훑기) 최소 간격 (초)
+EVICT_CHECK_BYTES = 16 << 20    # 마지막 확인 이후 이만큼 더 쓰면 간격과 관계없이 확인
+EVICT_TARGET_RATIO = 0.9        # 제한을 넘으면 이 비율까지 줄입니다.
+
+
+def _update_hash(h, value):
+    """value의 내용을 해시에 더합니다. 타입 이름을 함께 넣어 '1'과 1 같은 값이 충돌하지 않게 합니다."""
+    h.update(type(value).__name__.encode())
+    if value is None or isinstance(value, (bool, int, float)):
+        h.update(repr(value).encode())
+    elif isinstance(value, str):
+        h.update(value.encode('utf-8'))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        h.update(bytes(value))
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            _update_hash(h, str(key))
+            _update_hash(h, value[key])
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+        h.update(str(len(items)).encode())
+        for item in items:
+            _update_hash(h, item)
+    elif isinstance(value, pd.DataFrame):
+        h.update(repr((list(value.columns), [str(t) for t in value.dtypes])).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        except TypeError:  # 목록 같은 해시할 수 없는 값이 든 셀
+            h.update(value.to_json(date_format='iso', default_handler=str).encode())
+    elif isinstance(value, pd.Series):
+        _update_hash(h, value.to_frame())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.dtype.str, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (datetime.date, datetime.datetime, pd.Timestamp)):
+        h.update(value.isoformat().encode())
+    elif type(value).__module__.startswith('altair.') and hasattr(value, 'to_json'):  # Altair 차트 (데이터 포함 명세)
+        h.update(value.to_json(sort_keys=True).encode())
+    else:
+        h.update(repr(value).encode())
+
+
+def content_hash(*parts):
+    """입력 값들의 내용 해시 (DataFrame, Altair 차트, dict/list 중첩 지원)"""
+    h = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        _update_hash(h, part)
+    return h.hexdigest()
+
+
+def file_signature(*paths):
+    """파일 크기와 수정 시각으로 만든 서명. 파일을 읽지 않고 바뀌었는지 판단할 때 캐시 키에 넣습니다."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append((path, None, None))
+    return signature
+
+
+class DiskCache:
+    """프로세스 사이에서 공유되는 크기 제한 디스크 캐시"""
+
+    def __init__(self, directory=None, max_bytes=None, ttl=None, enabled=True):
+        self.directory = os.path.abspath(directory or os.environ.get(DIR_ENV) or DEFAULT_DIR)
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.environ.get(MAX_MB_ENV, DEFAULT_MAX_MB)) * (1 << 20))
+        self.ttl = ttl if ttl is not None else float(os.environ.get(TTL_ENV, DEFAULT_TTL))
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._written_since_check = 0
+
+    def _path(self, namespace, key):
+        return os.path.join(self.directory, namespace, key[:2], key + ENTRY_SUFFIX)
+
+    def get(self, namespace, key, default=None):
+        """항목을 읽습니다. 없거나, 만료되었거나, 손상되었으면 default를 반환합니다."""
+        if not self.enabled:
+            return default
+        path = self._path(namespace, key)
+        try:
+            with open(path, 'rb') as f:
+                created, value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:  # 손상된 항목(예: 다른 버전의 클래스를 담은 pickle)은 지우고 다시 계산합니다.
+            self._remove(path)
+            return default
+        if time.time() - created > self.ttl:
+            self._remove(path)
+            return default
+        try:
+            os.utime(path)  # 마지막 사용 시각 (LRU 기준)
+        except OSError:
+            pass
+        return value
+
+    def set(self, namespace, key, value):
+        if not self.enabled:
+            return
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = pickle.dumps((time.time(), value), protocol=pickle.HIGHEST_PROTOCOL)
+
+        def _write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+        try:
+            atomic_write(path, _write, durable=False)
+        except OSError as e:
+            logging.warning(f"디스크 캐시 항목을 쓰지 못했습니다: {e}")
+            return
+        self._maybe_evict(len(payload))
+
+    def get_or_compute(self, namespace, key, compute):
+        """
+        캐시에 있으면 그 값을, 없으면 compute()의 결과를 저장하고 반환합니다.
+        조회/적중 실패 건수는 perf의 캐시 통계(namespace 이름)에 기록됩니다.
+        """
+        perf.cache_lookup(namespace)
+        missing = object()
+        value = self.get(namespace, key, missing)
+        if value is not missing:
+            return value
+        perf.cache_miss(namespace)
+        value = compute()
+        self.set(namespace, key, value)
+        return value
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # 다른 프로세스가 먼저 지웠거나 (Windows) 읽는 중인 파일
+
+    def _entries(self):
+        """[(경로, 크기, 마지막 사용 시각)]"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(ENTRY_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _maybe_evict(self, written):
+        with self._lock:
+            self._written_since_check += written
+            now = time.monotonic()
+            if now - self._last_check < EVICT_CHECK_INTERVAL and self._written_since_check < EVICT_CHECK_BYTES:
+                return
+            self._last_check = now
+            self._written_since_check = 0
+        self.evict()
+
+    def evict(self):
+        """만료된 항목과, 크기 제한을 넘는 만큼 오래 사용하지 않은 항목을 지우고 지운 수를 반환합니다."""
+        if not os.path.isdir(self.directory):
+            return 0
+        with file_lock(os.path.join(self.directory, ".evict")):  # 여러 워커가 동시에 훑지 않도록
+            entries = self._entries()
+            expired_before = time.time() - self.ttl
+            removed = 0
+            total = 0
+            live = []
+            for path, size, used in entries:
+                # 만든 시각은 항목 안에 있으므로, 사용 시각이 TTL보다 오래된 항목만 여기서 지웁니다.
+                if used < expired_before:
+                    self._remove(path)
+                    removed += 1
+                else:
+                    live.append((path, size, used))
+                    total += size
+            if total > self.max_bytes:
+                target = self.max_bytes * EVICT_TARGET_RATIO
+                for path, size, _ in sorted(live, key=lambda entry: entry[2]):
+                    if total <= target:
+                        break
+                    self._remove(path)
+                    total -= size
+                    removed += 1
+        return removed
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stats(self):
+        """{namespace: {'entries': 수, 'bytes': 크기}}"""
+        stats = {}
+        for path, size, _ in self._entries():
+            namespace = os.path.relpath(path, self.directory).split(os.sep)[0]
+            entry = stats.setdefault(namespace, {'entries': 0, 'bytes': 0})
+            entry['entries'] += 1
+            entry['bytes'] += size
+        return stats
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """환경 변수 설정으로 만든 프로세스 공용 DiskCache"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            enabled = os.environ.get(ENABLE_ENV, '1').strip().lower() not in ('0', 'false', 'off', 'no')
+            _default = DiskCache(enabled=enabled)
+        return _default
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="디스크 캐시 관리")
+    parser.add_argument('command', choices=['stats', 'clear', 'evict', 'prefill'])
+    args = parser.parse_args()
+    cache = default_cache()
+
+    if args.command == 'stats':
+        stats = cache.stats()
+        print(f"캐시 폴더: {cache.directory} (제한 {cache.max_bytes / (1 << 20):,.0f} MB)")
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+    elif args.command == 'clear':
+        cache.clear()
+        print(f"✅ 캐시를 비웠습니다: {cache.directory}")
+    elif args.command == 'evict':
+        print(f"✅ {cache.evict()}개 항목을 지웠습니다.")
+    else:
+        # 배포 직후 첫 접속이 느리지 않도록, 현재 데이터의 파싱 결과를 미리 캐시에 넣습니다.
+        from m1 import DataManager
+        dm = DataManager()
+        dm.load_policy_data_shared()
+        dm.load_coefficients_shared()
+        print(f"✅ 현재 데이터 버전의 정책 DB와 계수를 캐시에 넣었습니다: {cache.directory}")
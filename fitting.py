@@ -0,0 +1,724 @@
+# -*- coding: utf-8 -*-
+# Fitting: 만족도 모델(A/B/C) 피팅 엔진
+#
+# - 모든 모델의 야코비안(Jacobian)을 해석적으로 계산해 least_squares에 넘깁니다. (유한 차분 호출 없음)
+# - 초기값: 선형화한 식의 닫힌 해 (A, C는 로그 변환, B는 로짓 변환)
+#   -> 초기값 주변의 격자에서 오차제곱합이 가장 작은 점을 골라 시작합니다. (배열 연산 한 번)
+# - 결과에 반복 횟수(함수/야코비안 계산 수)와 수렴 여부를 함께 반환합니다.
+#
+# - 작업 묶음(batch) API: make_job으로 (철도 유형, 지표, 모델)별 피팅 작업을 만들고 fit_many로 한 번에 실행합니다.
+#   관리자 화면(m6)과 계수 갱신 스크립트(coefficient_updater.py)가 같은 함수를 쓰므로
+#   같은 입력이면 같은 계수가 나옵니다. 단위 변환(경제적 접근성: 원 -> 만원)도 작업에 명시됩니다.
+# - 교차 검증: cross_validate_many가 작업마다 k개 폴드(또는 그룹 단위 폴드)를 만들어
+#   모든 폴드를 fit_many 한 번으로 피팅하고, 폴드별 표본 외(out-of-sample) RMSE/R²와 계수 안정성을 계산합니다.
+#
+# 모델 (S_max = 만족도 최댓값)
+#   A       S = S_max * (1 - exp(-c * X))
+#   A_shift S = S_max * (1 - exp(-c * (X - X0)))
+#   B       S = S_max / (1 + exp(a * (X - X0)))     (X0 고정)
+#   B_free  S = S_max / (1 + exp(a * (X - X0)))     (a, X0 추정)
+#   C       S = S_max * exp(-c * X)
+#   TCI     S = S_max * Σ_j P_j * g_j,  g_j = 1 (d_j = 0) 또는 1 - exp(-c_j / d_j)   (m2.calculate_tci_score)
+#           응답자가 이용한 환승 수단 j의 거리 d_j로 모든 수단의 P_j, c_j를 함께 추정 (P_j >= 0, Σ P_j <= 1)
+#   PAI     X = alpha * Σ_j w_j * x_j  (x_j: 접근 수단 j 이용 가능 여부)을 물리적 접근성 모델(A/B/C)에 넣은 값
+#           가중치는 합이 100인 비율로, 크기는 alpha로 나타냅니다. (m2.calculate_pai)
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares, minimize, nnls
+
+from perf import increment, timed
+from tci_kernel import tci_arrays, tci_terms
+
+S_MAX = 10.0
+MODEL_PARAMS = {
+    'A': ('c',),
+    'A_shift': ('c', 'x0'),
+    'B': ('a',),
+    'B_free': ('a', 'x0'),
+    'C': ('c',),
+}
+DEFAULT_GUESSES = {'A': 0.01, 'B': 0.5, 'C': 0.001}  # 선형화 초기값을 구할 수 없을 때
+EXP_LIMIT = 700.0        # exp 오버플로우 방지
+CLIP_RATIO = 0.05        # 선형화할 때 0점/만점 응답을 S_max의 5%~95%로 잘라 로그/로짓이 발산하지 않게 함
+GRID_SAMPLE = 2000       # 격자 탐색에 쓰는 최대 데이터 수 (전체 데이터는 최적화 단계에서 사용)
+GRID_RATE_STEPS = 25     # 기울기(c, a) 후보 수: 초기값의 1/30 ~ 30배 (로그 간격)
+GRID_X0_STEPS = 15       # X0 후보 수: 데이터 범위 (선형 간격)
+MAX_NFEV = 200
+
+# 원 단위 비용을 만원 단위로 바꿔 피팅하는 (지표, 철도 유형)
+UNIT_SCALES = {('EAI', '고속철도'): 10000.0, ('EAI', '일반철도'): 10000.0}
+# 계수 파일의 model_type -> 피팅 모델. Model B의 변곡점은 데이터 평균으로 고정('mean')하거나 추정('free')합니다.
+B_X0_MODES = {'mean': 'B', 'free': 'B_free'}
+PROCESS_POOL_MIN_ROWS = 200_000  # 작업 전체 데이터 수가 이 이상이면 (CPU가 2개 이상일 때) 프로세스 풀, 아니면 순서대로
+
+
+def _rate_and_x0(model, params, x0):
+    rate = params[0]
+    if model in ('A_shift', 'B_free'):
+        x0 = params[1]
+    elif model in ('A', 'C'):
+        x0 = 0.0
+    return rate, x0
+
+
+def predict(model, params, X, s_max=S_MAX, x0=None):
+    """모델 값. params의 각 원소는 스칼라 또는 (후보 수, 1) 배열일 수 있습니다. (격자 탐색에서 한 번에 계산)"""
+    rate, x0 = _rate_and_x0(model, params, x0)
+    d = X - x0
+    if model in ('B', 'B_free'):
+        return s_max / (1 + np.exp(np.clip(rate * d, -EXP_LIMIT, EXP_LIMIT)))
+    e = np.exp(np.clip(-rate * d, -EXP_LIMIT, EXP_LIMIT))
+    return s_max * e if model == 'C' else s_max * (1 - e)
+
+
+def jacobian(model, params, X, s_max=S_MAX, x0=None):
+    """모델 값의 계수별 편미분 (데이터 수 x 계수 수)"""
+    rate, x0 = _rate_and_x0(model, params, x0)
+    d = X - x0
+    if model in ('B', 'B_free'):
+        p = 1 / (1 + np.exp(np.clip(rate * d, -EXP_LIMIT, EXP_LIMIT)))
+        slope = s_max * p * (1 - p)          # -dS/du, u = a * (X - X0)
+        columns = [-slope * d]                # dS/da
+        if model == 'B_free':
+            columns.append(slope * rate)      # dS/dX0
+    else:
+        e = np.exp(np.clip(-rate * d, -EXP_LIMIT, EXP_LIMIT))
+        sign = -1.0 if model == 'C' else 1.0
+        columns = [sign * s_max * d * e]      # dS/dc
+        if model == 'A_shift':
+            columns.append(-s_max * rate * e) # dS/dX0
+    return np.column_stack(columns)
+
+
+def slope(model, params, X, s_max=S_MAX, x0=None):
+    """모델 값의 X에 대한 미분 dS/dX (지표 값을 다시 계수로 나타낸 모델의 야코비안에 사용)"""
+    rate, x0 = _rate_and_x0(model, params, x0)
+    d = X - x0
+    if model in ('B', 'B_free'):
+        p = 1 / (1 + np.exp(np.clip(rate * d, -EXP_LIMIT, EXP_LIMIT)))
+        return -s_max * p * (1 - p) * rate
+    e = np.exp(np.clip(-rate * d, -EXP_LIMIT, EXP_LIMIT))
+    return (-1.0 if model == 'C' else 1.0) * s_max * rate * e
+
+
+def inverse(model, params, S, s_max=S_MAX, x0=None):
+    """만족도에 해당하는 지표 값 (0점/만점은 S_max의 5%~95%로 잘라 계산)"""
+    rate, x0 = _rate_and_x0(model, params, x0)
+    ratio = np.clip(np.asarray(S, dtype=float) / s_max, CLIP_RATIO, 1 - CLIP_RATIO)
+    if model in ('B', 'B_free'):
+        return x0 + np.log(1 / ratio - 1) / rate
+    return x0 + (-np.log(ratio) if model == 'C' else -np.log(1 - ratio)) / rate
+
+
+def _linear_fit(x, y, through_origin):
+    """최소제곱 직선 (기울기, 절편). 구할 수 없으면 None"""
+    if through_origin:
+        denom = np.dot(x, x)
+        return (np.dot(x, y) / denom, 0.0) if denom > 0 else None
+    if len(x) < 2 or np.ptp(x) == 0:
+        return None
+    slope, intercept = np.polyfit(x, y, 1)
+    return slope, intercept
+
+
+def initial_estimate(model, X, S, s_max=S_MAX, x0=None):
+    """
+    선형화한 식의 닫힌 해로 구한 초기값
+    - A: -ln(1 - S/S_max) = c * (X - X0)
+    - C: -ln(S/S_max) = c * X
+    - B: ln(S_max/S - 1) = a * (X - X0)
+    """
+    ratio = np.clip(S / s_max, CLIP_RATIO, 1 - CLIP_RATIO)
+    default_x0 = float(np.median(X))
+    if model in ('A', 'A_shift'):
+        y = -np.log(1 - ratio)
+    elif model == 'C':
+        y = -np.log(ratio)
+    else:
+        y = np.log(1 / ratio - 1)
+
+    if model in ('A_shift', 'B_free'):
+        line = _linear_fit(X, y, through_origin=False)
+        if line is None or line[0] <= 0:
+            return np.array([DEFAULT_GUESSES[model[0]], default_x0])
+        slope, intercept = line
+        return np.array([slope, -intercept / slope])
+
+    line = _linear_fit(X - (x0 if model == 'B' else 0.0), y, through_origin=True)
+    if line is None or not np.isfinite(line[0]) or line[0] <= 0:
+        return np.array([DEFAULT_GUESSES[model]])
+    return np.array([line[0]])
+
+
+def grid_search(model, X, S, start, lower, upper, s_max=S_MAX, x0=None):
+    """초기값 주변 격자에서 오차제곱합이 가장 작은 계수 (데이터가 많으면 일부만 사용)"""
+    if len(X) > GRID_SAMPLE:
+        index = np.linspace(0, len(X) - 1, GRID_SAMPLE).astype(int)
+        X, S = X[index], S[index]
+    rates = start[0] * np.logspace(-np.log10(30), np.log10(30), GRID_RATE_STEPS)
+    if len(start) == 1:
+        grid = [rates[:, None]]
+    else:
+        x0s = np.unique(np.append(np.linspace(X.min(), X.max(), GRID_X0_STEPS), start[1]))
+        rate_grid, x0_grid = np.meshgrid(rates, x0s, indexing='ij')
+        grid = [rate_grid.reshape(-1, 1), x0_grid.reshape(-1, 1)]
+    grid = [np.clip(values, lo, hi) for values, lo, hi in zip(grid, lower, upper)]
+    sse = np.sum((predict(model, grid, X[None, :], s_max, x0) - S[None, :]) ** 2, axis=1)
+    best = int(np.nanargmin(sse)) if np.isfinite(sse).any() else None
+    candidate = start if best is None else np.array([values[best, 0] for values in grid])
+    start_sse = np.sum((predict(model, start, X, s_max, x0) - S) ** 2)
+    return candidate if best is None or sse[best] < start_sse else start
+
+
+def _interior(values, lower, upper):
+    """trf 방법은 시작점이 경계 안쪽에 있어야 하므로 살짝 안쪽으로 옮깁니다."""
+    span = np.where(np.isfinite(upper - lower), upper - lower, 1.0)
+    margin = np.maximum(1e-10, 1e-8 * span)
+    return np.minimum(np.maximum(values, lower + margin), upper - margin)
+
+
+@timed("fitting.fit")
+def fit(model, X, S, s_max=S_MAX, x0=None, bounds=None):
+    """
+    만족도 모델 하나를 피팅합니다.
+    - model: MODEL_PARAMS의 키. 'B'는 x0(고정 변곡점)가 필요합니다.
+    - bounds: (하한 목록, 상한 목록). 기본값은 기울기 >= 0, X0 제한 없음
+    반환: {'model', 'params': {이름: 값}, 'values': 배열, 'converged', 'message', 'nfev', 'njev', 'initial'}
+    수렴하지 않거나 계산할 수 없는 입력이면 'params'는 None이고 'message'에 이유가 담깁니다.
+    """
+    if model not in MODEL_PARAMS:
+        raise ValueError(f"알 수 없는 모델 타입: {model}")
+    if model == 'B' and x0 is None:
+        raise ValueError("Model B(X0 고정)에는 x0 값이 필요합니다.")
+    increment('fits_run')
+    X = np.asarray(X, dtype=float)
+    S = np.asarray(S, dtype=float)
+    names = MODEL_PARAMS[model]
+    if bounds is None:
+        bounds = ([0.0] + [-np.inf] * (len(names) - 1), [np.inf] * len(names))
+    lower, upper = np.asarray(bounds[0], dtype=float), np.asarray(bounds[1], dtype=float)
+
+    result = {'model': model, 'params': None, 'values': None, 'converged': False, 'message': '', 'nfev': 0, 'njev': 0, 'initial': None}
+    if len(X) < len(names) or not (np.isfinite(X).all() and np.isfinite(S).all()):
+        increment('fit_failures')
+        result['message'] = "데이터가 부족하거나 숫자가 아닌 값이 있습니다."
+        return result
+
+    start = _interior(initial_estimate(model, X, S, s_max, x0), lower, upper)
+    start = _interior(grid_search(model, X, S, start, lower, upper, s_max, x0), lower, upper)
+    result['initial'] = dict(zip(names, start.tolist()))
+    try:
+        solution = least_squares(
+            lambda p: predict(model, p, X, s_max, x0) - S,
+            start,
+            jac=lambda p: jacobian(model, p, X, s_max, x0),
+            bounds=(lower, upper),
+            method='trf',
+            x_scale='jac',
+            max_nfev=MAX_NFEV,
+        )
+    except ValueError as e:
+        increment('fit_failures')
+        result['message'] = f"모델 피팅 값 오류: {e}"
+        return result
+
+    result.update(nfev=int(solution.nfev), njev=int(solution.njev or 0), message=solution.message)
+    if not solution.success or not np.isfinite(solution.x).all():
+        increment('fit_failures')
+        result['message'] = f"모델 피팅 실패(수렴하지 않음): {solution.message}"
+        return result
+    result.update(converged=True, params=dict(zip(names, solution.x.tolist())), values=solution.x)
+    return result
+
+
+def fit_statistics(X_data, S_data, s_pred, n_params):
+    """
+    적합도 통계: SSE, SST, R², RMSE, AIC/BIC(정규 오차 가정), 잔차 진단
+    - 잔차 평균: 0에서 멀면 전체적으로 과대/과소 추정
+    - Durbin-Watson: X 순서로 정렬한 잔차의 자기상관. 2에서 크게 낮으면 곡선 모양이 데이터와 맞지 않음
+    """
+    n = len(S_data)
+    residuals = S_data - s_pred
+    sse = float(np.sum(residuals ** 2))
+    sst = float(np.sum((S_data - np.mean(S_data)) ** 2))
+    r_squared = 1 - (sse / sst) if sst > 0 else 0
+    log_term = n * math.log(max(sse, 1e-300) / n)
+    ordered = residuals[np.argsort(X_data, kind='stable')]
+    durbin_watson = float(np.sum(np.diff(ordered) ** 2) / sse) if sse > 0 else float('nan')
+    return {
+        "SSE": sse, "SST": sst, "R-squared": r_squared,
+        "RMSE": math.sqrt(sse / n),
+        "AIC": log_term + 2 * n_params,
+        "BIC": log_term + n_params * math.log(n),
+        "Residual mean": float(np.mean(residuals)),
+        "Durbin-Watson": durbin_watson,
+        "n": n, "k": n_params,
+    }
+
+
+def unit_scale(kpi_abbr, rail_type):
+    """피팅 전에 성과지표 값을 나눌 단위 (경제적 접근성 고속/일반철도: 10,000 = 만원 단위)"""
+    return UNIT_SCALES.get((kpi_abbr, rail_type), 1.0)
+
+
+def make_job(kpi_abbr, rail_type, model_type, X, S, key=None, b_x0='mean', s_max=S_MAX):
+    """
+    피팅 작업 하나를 만듭니다.
+    - model_type: 계수 파일의 모델 ('A', 'B', 'C') 또는 피팅 모델 이름 ('B_free' 등)
+    - b_x0: Model B의 변곡점 처리 ('mean': 데이터 평균으로 고정, 'free': 함께 추정)
+    - 단위 변환은 작업의 'scale'에 기록되며, X는 scale로 나눈 값으로 피팅합니다. (수치 안정성)
+      fit_job이 반환하는 params는 원래 단위로 되돌린 값이고, 'values'만 scale 단위입니다.
+    """
+    if model_type == 'B':
+        model = B_X0_MODES[b_x0]
+    elif model_type in MODEL_PARAMS:
+        model = model_type
+    else:
+        raise ValueError(f"알 수 없는 모델 타입: {model_type}")
+    scale = unit_scale(kpi_abbr, rail_type)
+    X = np.asarray(X, dtype=float) / scale
+    return {
+        'key': key, 'kpi': kpi_abbr, 'rail_type': rail_type, 'model': model, 'scale': scale, 's_max': s_max,
+        'X': X, 'S': np.asarray(S, dtype=float),
+        'x0': float(np.mean(X)) if model == 'B' and len(X) else None,
+    }
+
+
+def fit_job(job):
+    """
+    make_job으로 만든 작업 하나를 피팅합니다. (프로세스 풀에서도 호출할 수 있도록 모듈 함수)
+    반환: {'key', 'kpi', 'rail_type', 'candidate', 'model_type', 'scale', 'params', 'stats', 'error', ('values')}
+    - params: 계수 파일 이름 기준 ({'c': ...} 또는 {'a': ..., '<지표>_0': ...}), 원래 단위, 실패하면 None
+    - stats: fit_statistics + 'Iterations', 'Function evaluations', 실패하면 None
+    - values: predict에 scale로 나눈 X와 함께 넘길 계수 배열 (성공한 경우만)
+    """
+    model, X, S, x0 = job['model'], job['X'], job['S'], job['x0']
+    result = {
+        'key': job['key'], 'kpi': job['kpi'], 'rail_type': job['rail_type'],
+        'candidate': model, 'model_type': model[0], 'scale': job['scale'],
+        'params': None, 'stats': None, 'error': None,
+    }
+    fitted = fit(model, X, S, s_max=job['s_max'], x0=x0)
+    if fitted['params'] is None:
+        result['error'] = fitted['message']
+        return result
+
+    params = dict(fitted['params'])
+    if model == 'B':
+        params['x0'] = x0
+    # 계수 파일과 만족도 계산(m2)은 원래 단위의 값을 쓰므로 산출 계수를 원래 단위로 되돌립니다.
+    # rate × (X/scale - x0) = (rate/scale) × (X - x0·scale)
+    params = {name: value * job['scale'] if name == 'x0' else value / job['scale'] for name, value in params.items()}
+    # 계수 파일에서는 변곡점을 '<지표 약어>_0'으로 저장합니다. (예: TAI_0)
+    result['params'] = {(f"{job['kpi']}_0" if name == 'x0' else name): value for name, value in params.items()}
+    s_pred = predict(model, fitted['values'], X, job['s_max'], x0)
+    result['stats'] = fit_statistics(X, S, s_pred, n_params=len(fitted['values']))
+    result['stats'].update({'Iterations': fitted['njev'], 'Function evaluations': fitted['nfev']})
+    result['values'] = fitted['values']  # 예측용 계수 배열 (predict에 그대로 전달)
+    return result
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool():
+    """프로세스 풀은 처음 필요할 때 한 번 만들어 재사용합니다. (spawn: 서버 스레드 상태를 복제하지 않음)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context('spawn'))
+        return _process_pool
+
+
+def _reset_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def fit_many(jobs, use_processes=None):
+    """
+    여러 피팅 작업을 실행하고 작업 순서대로 결과를 반환합니다.
+    - 피팅은 GIL을 잡고 있는 파이썬 콜백(목적 함수/야코비안)이 대부분이라 스레드로는 빨라지지 않으므로,
+      작은 작업은 순서대로 실행합니다. (후보 4개면 단일 피팅의 약 4배)
+    - use_processes: None이면 CPU가 2개 이상이고 작업 전체 데이터 수가 PROCESS_POOL_MIN_ROWS 이상일 때만
+      프로세스 풀에 나눠 실행합니다. 피팅은 결정적이므로 어느 쪽으로 실행해도 결과는 같습니다.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    if use_processes is None:
+        use_processes = (len(jobs) > 1 and (os.cpu_count() or 1) > 1
+                         and sum(len(job['X']) for job in jobs) >= PROCESS_POOL_MIN_ROWS)
+    if use_processes:
+        try:
+            results = list(_get_process_pool().map(fit_job, jobs))
+        except BrokenProcessPool as e:
+            # 자식 프로세스를 시작하지 못하는 환경(임베디드 실행 등)에서는 이 프로세스에서 순서대로 피팅합니다.
+            logging.warning(f"프로세스 풀을 사용할 수 없어 순서대로 피팅합니다: {e}")
+            _reset_process_pool()
+        else:
+            # 자식 프로세스의 카운터는 이 프로세스에 보이지 않으므로 여기서 더합니다.
+            increment('fits_run', len(results))
+            increment('fit_failures', sum(result['params'] is None for result in results))
+            return results
+    return [fit_job(job) for job in jobs]
+
+
+def cv_folds(n, k=5, groups=None, seed=0):
+    """
+    교차 검증 폴드의 검증용 인덱스 목록
+    - groups가 없으면 무작위 k-fold
+    - groups가 있으면 같은 그룹(예: 응답자 ID)이 학습/검증에 나뉘지 않도록 그룹 단위로 폴드를 나눕니다.
+      그룹 수가 k 이하이면 그룹 하나씩 빼는 leave-one-group-out이 됩니다.
+    """
+    rng = np.random.default_rng(seed)
+    if groups is None:
+        if n < 2:
+            raise ValueError("교차 검증에는 데이터가 2개 이상 필요합니다.")
+        k = max(2, min(k, n))
+        return [np.sort(fold) for fold in np.array_split(rng.permutation(n), k)]
+    codes, uniques = pd.factorize(pd.Series(groups).astype(str))
+    if len(uniques) < 2:
+        raise ValueError("그룹 단위 교차 검증에는 그룹이 2개 이상 필요합니다.")
+    k = max(2, min(k, len(uniques)))
+    group_fold = np.empty(len(uniques), dtype=int)
+    group_fold[rng.permutation(len(uniques))] = np.arange(len(uniques)) % k
+    row_fold = group_fold[codes]
+    return [np.flatnonzero(row_fold == fold) for fold in range(k)]
+
+
+def _subset_job(job, index, key):
+    """작업의 일부 행만 사용하는 작업 (Model B의 고정 변곡점은 학습 데이터의 평균으로 다시 계산)"""
+    sub = dict(job, key=key, X=job['X'][index], S=job['S'][index])
+    if job['model'] == 'B':
+        sub['x0'] = float(np.mean(sub['X'])) if len(index) else None
+    return sub
+
+
+def _out_of_sample(job, train_job, result, test_index):
+    """학습 폴드로 피팅한 계수로 검증 폴드를 예측한 RMSE/R² (R²는 검증 데이터 평균 기준)"""
+    X, S = job['X'][test_index], job['S'][test_index]
+    residuals = S - predict(job['model'], result['values'], X, job['s_max'], train_job['x0'])
+    sse = float(np.sum(residuals ** 2))
+    sst = float(np.sum((S - np.mean(S)) ** 2))
+    return {'RMSE': math.sqrt(sse / len(S)), 'R-squared': 1 - sse / sst if sst > 0 else float('nan')}
+
+
+def cross_validate_many(jobs, k=5, groups=None, seed=0, use_processes=None):
+    """
+    작업마다 k-fold 교차 검증을 실행합니다. 모든 작업의 모든 폴드를 fit_many 한 번으로 피팅합니다.
+    - groups: 행별 그룹 값 (모든 작업의 행 순서와 같아야 함, 예: 같은 설문 데이터의 후보 모델들)
+    반환(작업 순서): {'key', 'candidate', 'folds': DataFrame, 'summary': dict, 'parameters': DataFrame}
+    - folds: 폴드별 학습/검증 수, 표본 외 RMSE/R², 계수
+    - summary: RMSE/R²의 평균과 표준편차, 실패한 폴드 수
+    - parameters: 계수별 평균, 표준편차, 변동계수(표준편차/|평균|, 작을수록 안정)
+    """
+    jobs = list(jobs)
+    plans = []
+    fold_jobs = []  # 작업 순서, 폴드 순서대로
+    for job_index, job in enumerate(jobs):
+        folds = cv_folds(len(job['X']), k, groups, seed)
+        plans.append(folds)
+        for fold_index, test_index in enumerate(folds):
+            train_index = np.setdiff1d(np.arange(len(job['X'])), test_index, assume_unique=True)
+            fold_jobs.append(_subset_job(job, train_index, (job_index, fold_index)))
+    fold_results = iter(zip(fold_jobs, fit_many(fold_jobs, use_processes=use_processes)))
+
+    reports = []
+    for job, folds in zip(jobs, plans):
+        rows = []
+        for fold_index, test_index in enumerate(folds):
+            train_job, result = next(fold_results)
+            row = {'fold': fold_index + 1, 'n_train': len(job['X']) - len(test_index), 'n_test': len(test_index)}
+            if result['params'] is None:
+                row.update({'RMSE': np.nan, 'R-squared': np.nan, 'error': result['error']})
+            else:
+                row.update(_out_of_sample(job, train_job, result, test_index))
+                row.update(result['params'])
+                row['error'] = None
+            rows.append(row)
+        folds_df = pd.DataFrame(rows)
+        param_names = [name for name in folds_df.columns if name not in ('fold', 'n_train', 'n_test', 'RMSE', 'R-squared', 'error')]
+        parameters = pd.DataFrame([
+            {
+                'parameter': name,
+                'mean': folds_df[name].mean(),
+                'std': folds_df[name].std(ddof=1),
+                'cv': folds_df[name].std(ddof=1) / abs(folds_df[name].mean()) if folds_df[name].mean() else np.nan,
+            }
+            for name in param_names
+        ])
+        reports.append({
+            'key': job['key'], 'candidate': job['model'],
+            'folds': folds_df,
+            'summary': {
+                'k': len(folds),
+                'RMSE mean': float(folds_df['RMSE'].mean()), 'RMSE std': float(folds_df['RMSE'].std(ddof=1)),
+                'R-squared mean': float(folds_df['R-squared'].mean()), 'R-squared std': float(folds_df['R-squared'].std(ddof=1)),
+                'failed folds': int(folds_df['error'].notna().sum()),
+            },
+            'parameters': parameters,
+        })
+    return reports
+
+
+def cross_validate(job, k=5, groups=None, seed=0, use_processes=None):
+    """작업 하나의 교차 검증 (cross_validate_many 참고)"""
+    return cross_validate_many([job], k, groups, seed, use_processes)[0]
+
+
+# --- 환승시설 편의성(TCI): 수단별 P_j, c_j 동시 추정 ---
+TCI_MODES = ('대중교통', '도보', '승용차', '택시/배웅', 'PM')  # m1.DataManager.TCI_ALL_MODES와 같은 순서
+TCI_LOG_C_BOUNDS = (-10.0, 15.0)  # log(c) 범위 (c ≈ 4.5e-5 ~ 3.3e6, 거리 단위 m)
+TCI_MAX_ITER = 200
+
+
+def tci_design(survey_df, modes=TCI_MODES):
+    """
+    TCI 설문 데이터를 (거리 행렬 D, 만족도 S)로 바꿉니다. D는 (응답자 수, 수단 수)이며 이용하지 않은 수단은 NaN입니다.
+    - 넓은 형식: 'Satisfaction' + 수단별 거리 열('대중교통' 또는 'D_대중교통' ...). 빈 칸은 이용하지 않은 수단
+    - 긴 형식: 'respond_ID', 'Mode', 'Distance', 'Satisfaction' (응답자·수단별 한 행, 만족도는 응답자별 첫 값)
+    거리 열이 하나도 없거나 형식을 알 수 없으면 ValueError
+    """
+    if {'Mode', 'Distance'}.issubset(survey_df.columns):
+        if 'respond_ID' not in survey_df.columns:
+            raise ValueError("긴 형식(Mode, Distance)의 TCI 데이터에는 respond_ID 열이 필요합니다.")
+        long_df = survey_df.assign(Distance=pd.to_numeric(survey_df['Distance'], errors='coerce'))
+        wide = long_df.pivot_table(index='respond_ID', columns='Mode', values='Distance', aggfunc='first')
+        satisfaction = pd.to_numeric(long_df.groupby('respond_ID')['Satisfaction'].first(), errors='coerce')
+        wide = wide.reindex(columns=list(modes)).reindex(satisfaction.index)
+    else:
+        columns = {mode: next((col for col in (mode, f"D_{mode}") if col in survey_df.columns), None) for mode in modes}
+        if not any(columns.values()) or 'Satisfaction' not in survey_df.columns:
+            raise ValueError(f"TCI 데이터에는 Satisfaction 열과 수단별 거리 열({', '.join(modes)})이 필요합니다.")
+        wide = pd.DataFrame({
+            mode: pd.to_numeric(survey_df[col], errors='coerce') if col else np.nan
+            for mode, col in columns.items()
+        }, index=survey_df.index)
+        satisfaction = pd.to_numeric(survey_df['Satisfaction'], errors='coerce')
+    D = wide.to_numpy(dtype=float)
+    S = satisfaction.to_numpy(dtype=float)
+    keep = np.isfinite(S) & np.isfinite(D).any(axis=1)
+    return D[keep], S[keep]
+
+
+def tci_predict(P, c, D, s_max=S_MAX):
+    """응답자별 TCI 만족도 (m2.calculate_tci_score를 행렬로 계산, 0~10으로 자름)"""
+    G, _ = tci_terms(c, D)
+    return np.clip(s_max * (G @ np.asarray(P, dtype=float)), 0.0, 10.0)
+
+
+def _tci_initial(D, S, arrays, fitted, s_max):
+    """
+    초기값: c_j는 이용자 거리 중앙값에서 g = 0.5가 되는 값(c = ln2 × 중앙값),
+    P_j는 그 c로 고정한 선형 문제(S/S_max ≈ G·P, P >= 0)의 NNLS 해 (합이 1을 넘으면 비율을 유지해 줄임)
+    """
+    c0 = np.ones(D.shape[1])
+    for j in np.flatnonzero(fitted):
+        distances = D[:, j][np.isfinite(D[:, j]) & (D[:, j] > 0)]
+        if len(distances):
+            c0[j] = math.log(2) * float(np.median(distances))
+    G, _ = tci_terms(c0, arrays=arrays)
+    P0 = np.zeros(D.shape[1])
+    P0[fitted], _ = nnls(G[:, fitted], S / s_max)
+    if P0.sum() > 1:
+        P0 /= P0.sum()
+    return P0, c0
+
+
+@timed("fitting.fit_tci")
+def fit_tci(D, S, modes=TCI_MODES, s_max=S_MAX):
+    """
+    환승시설 편의성(TCI)의 수단별 P_j, c_j를 함께 추정합니다.
+    - 목적 함수: 평균 오차제곱 (해석적 기울기), 변수: P_j와 log(c_j)
+    - 제약: P_j >= 0, Σ P_j <= 1 (모든 수단을 거리 0으로 이용하면 S_max), SLSQP
+    - 아무도 이용하지 않은 수단은 추정하지 않습니다. (params에서 빠짐)
+    반환: {'model': 'TCI', 'modes', 'params': {'P_<수단>', 'c_<수단>'}, 'P', 'c', 'converged', 'message', 'nfev', 'njev', 'initial', 'stats'}
+    """
+    increment('fits_run')
+    D = np.asarray(D, dtype=float)
+    S = np.asarray(S, dtype=float)
+    modes = list(modes)
+    result = {'model': 'TCI', 'modes': modes, 'params': None, 'P': None, 'c': None, 'converged': False,
+              'message': '', 'nfev': 0, 'njev': 0, 'initial': None, 'stats': None}
+    if D.ndim != 2 or D.shape[1] != len(modes) or len(S) != len(D) or not np.isfinite(S).all():
+        raise ValueError("거리 행렬(응답자 × 수단)과 만족도의 크기가 맞지 않습니다.")
+    arrays = tci_arrays(D)
+    fitted = arrays[0].any(axis=0)
+    m = int(fitted.sum())
+    if m == 0 or len(S) < 2 * m:
+        increment('fit_failures')
+        result['message'] = "데이터가 부족합니다. (추정할 계수 수의 응답자 이상 필요)"
+        return result
+
+    P0, c0 = _tci_initial(D, S, arrays, fitted, s_max)
+    result['initial'] = {'P': P0.tolist(), 'c': c0.tolist()}
+    used, zero, U = arrays[0][:, fitted], arrays[1][:, fitted], arrays[2][:, fitted]
+    sub_arrays = (used, zero, U)
+    n = len(S)
+
+    def objective(theta):
+        P, c = theta[:m], np.exp(theta[m:])
+        G, E = tci_terms(c, arrays=sub_arrays)
+        residuals = S - s_max * (G @ P)
+        grad_P = -(s_max / n) * (G.T @ residuals)
+        # d g / d c = (1/d) exp(-c/d) (거리 > 0), d c / d log c = c
+        grad_log_c = -(s_max / n) * P * c * ((U * E).T @ residuals)
+        return 0.5 * float(residuals @ residuals) / n, np.concatenate([grad_P, grad_log_c])
+
+    solution = minimize(
+        objective,
+        np.concatenate([P0[fitted], np.log(c0[fitted])]),
+        jac=True,
+        method='SLSQP',
+        bounds=[(0.0, 1.0)] * m + [TCI_LOG_C_BOUNDS] * m,
+        constraints=[{'type': 'ineq', 'fun': lambda theta: 1.0 - np.sum(theta[:m]),
+                      'jac': lambda theta: np.concatenate([-np.ones(m), np.zeros(m)])}],
+        options={'maxiter': TCI_MAX_ITER, 'ftol': 1e-12},
+    )
+    result.update(nfev=int(solution.nfev), njev=int(solution.njev or 0), message=solution.message)
+    if not solution.success or not np.isfinite(solution.x).all():
+        increment('fit_failures')
+        result['message'] = f"TCI 피팅 실패(수렴하지 않음): {solution.message}"
+        return result
+
+    P = np.zeros(len(modes))
+    c = np.full(len(modes), np.nan)
+    P[fitted] = solution.x[:m]
+    c[fitted] = np.exp(solution.x[m:])
+    params = {}
+    for j in np.flatnonzero(fitted):
+        params[f"P_{modes[j]}"] = float(P[j])
+        params[f"c_{modes[j]}"] = float(c[j])
+    s_pred = s_max * (tci_terms(c[fitted], arrays=sub_arrays)[0] @ P[fitted])
+    # Durbin-Watson은 예측값 순서로 정렬한 잔차로 계산합니다. (단일 X가 없음)
+    stats = fit_statistics(s_pred, S, s_pred, n_params=2 * m)
+    stats.update({'Iterations': int(solution.nit), 'Function evaluations': int(solution.nfev), 'Sum P': float(P.sum())})
+    result.update(converged=True, params=params, P=P, c=c, stats=stats)
+    return result
+
+
+# --- 물리적 접근성(PAI): 접근 수단 가중치 w_j와 alpha 추정 ---
+PAI_MODES = ('도보', '마을/시내버스', '광역버스', '지하철/광역철도', '승용차', '자전거', '택시', '공유PM')  # m1.DataManager.PAI_ALL_MODES
+PAI_WEIGHT_TOTAL = 100.0  # 가중치 합 (기존 계수와 같은 백분율)
+_TRUE_TEXTS = {'1', 'y', 'yes', 'o', 'true', 't', '예', '있음', '가능', 'v'}
+
+
+def _as_flag(column):
+    """0/1, True/False, Y/N, O/X, 예/아니오 값을 0/1로 (빈 칸은 0)"""
+    numeric = pd.to_numeric(column, errors='coerce')
+    if numeric.notna().sum() >= column.notna().sum():
+        return (numeric.fillna(0).to_numpy(dtype=float) != 0).astype(float)
+    return column.astype(str).str.strip().str.lower().isin(_TRUE_TEXTS).to_numpy(dtype=float)
+
+
+def pai_design(survey_df, modes=PAI_MODES):
+    """
+    PAI 설문 데이터를 (이용 가능 여부 행렬 A, 만족도 S, 수단 목록)으로 바꿉니다.
+    'Satisfaction'과 수단별 열(m3_3의 physical_access_df와 같은 이름)을 사용하며, 파일에 없는 수단은 빠집니다.
+    수단 열이 하나도 없으면 ValueError
+    """
+    present = [mode for mode in modes if mode in survey_df.columns]
+    if not present or 'Satisfaction' not in survey_df.columns:
+        raise ValueError(f"PAI 가중치 추정에는 Satisfaction 열과 접근 수단 열({', '.join(modes)})이 필요합니다.")
+    A = np.column_stack([_as_flag(survey_df[mode]) for mode in present])
+    S = pd.to_numeric(survey_df['Satisfaction'], errors='coerce').to_numpy(dtype=float)
+    keep = np.isfinite(S)
+    return A[keep], S[keep], present
+
+
+def _pai_patterns(A, S):
+    """
+    응답자를 수단 조합(최대 2^수단 수)별로 묶습니다. 조합 안에서 예측값이 같으므로
+    조합별 평균 만족도를 응답자 수로 가중하면 전체 응답자의 오차제곱합과 같은 해를 얻습니다.
+    반환: (조합 행렬, 응답자 수, 평균 만족도, 응답자별 조합 번호)
+    """
+    codes = A.astype(np.int64) @ (1 << np.arange(A.shape[1], dtype=np.int64))
+    unique_codes, row_pattern = np.unique(codes, return_inverse=True)
+    counts = np.bincount(row_pattern).astype(float)
+    means = np.bincount(row_pattern, weights=S) / counts
+    patterns = ((unique_codes[:, None] >> np.arange(A.shape[1])) & 1).astype(float)
+    return patterns, counts, means, row_pattern
+
+
+@timed("fitting.fit_pai")
+def fit_pai(A, S, modes, model, values, s_max=S_MAX, x0=None):
+    """
+    물리적 접근성의 접근 수단 가중치와 alpha를 추정합니다. 만족도 모델(model, values, x0)은 현재 계수로 고정합니다.
+    (alpha·w와 모델 기울기는 곱으로만 나타나므로 함께 추정할 수 없음)
+    1) 조합별 평균 만족도를 모델의 역함수로 지표 값으로 바꾸고, β_j = alpha·w_j >= 0을 가중 NNLS로 구합니다.
+    2) 그 값에서 시작해 만족도 오차제곱합을 최소화합니다. (least_squares, 해석적 야코비안, β >= 0)
+    반환: {'params': {'w_<수단>', 'alpha'}, 'weights', 'alpha', 'stats', 'converged', 'message', 'nfev', 'njev', 'patterns'}
+    """
+    increment('fits_run')
+    A = np.asarray(A, dtype=float)
+    S = np.asarray(S, dtype=float)
+    modes = list(modes)
+    result = {'params': None, 'weights': None, 'alpha': None, 'stats': None, 'converged': False,
+              'message': '', 'nfev': 0, 'njev': 0, 'patterns': 0}
+    if A.ndim != 2 or A.shape[1] != len(modes) or len(S) != len(A) or not np.isfinite(S).all():
+        raise ValueError("이용 가능 여부 행렬(응답자 × 수단)과 만족도의 크기가 맞지 않습니다.")
+    patterns, counts, means, row_pattern = _pai_patterns(A, S)
+    result['patterns'] = len(patterns)
+    if len(S) <= len(modes) or len(patterns) < 2:
+        increment('fit_failures')
+        result['message'] = "데이터가 부족하거나 수단 조합이 한 가지뿐입니다."
+        return result
+
+    root = np.sqrt(counts)
+    target = inverse(model, values, means, s_max, x0)
+    start, _ = nnls(patterns * root[:, None], target * root)
+
+    def residuals(beta):
+        return root * (predict(model, values, patterns @ beta, s_max, x0) - means)
+
+    def residual_jacobian(beta):
+        return (root * slope(model, values, patterns @ beta, s_max, x0))[:, None] * patterns
+
+    solution = least_squares(residuals, _interior(start, np.zeros(len(modes)), np.full(len(modes), np.inf)),
+                             jac=residual_jacobian, bounds=(0.0, np.inf), method='trf', x_scale='jac', max_nfev=MAX_NFEV)
+    result.update(nfev=int(solution.nfev), njev=int(solution.njev or 0), message=solution.message)
+    beta = solution.x
+    if not solution.success or not np.isfinite(beta).all() or beta.sum() <= 0:
+        increment('fit_failures')
+        result['message'] = f"PAI 가중치 피팅 실패: {solution.message}"
+        return result
+
+    alpha = float(beta.sum() / PAI_WEIGHT_TOTAL)
+    weights = beta / alpha
+    pai_values = patterns[row_pattern] @ beta
+    stats = fit_statistics(pai_values, S, predict(model, values, pai_values, s_max, x0), n_params=len(modes))
+    stats.update({'Iterations': result['njev'], 'Function evaluations': result['nfev'], 'Patterns': len(patterns)})
+    params = {f"w_{mode}": float(weight) for mode, weight in zip(modes, weights)}
+    params['alpha'] = alpha
+    result.update(converged=True, params=params, weights=dict(zip(modes, weights.tolist())), alpha=alpha, stats=stats)
+    return result
+
+
+def keep_absent_pai_weights(result, previous_weights, previous_alpha):
+    """
+    설문 파일에 열이 없어 추정하지 않은 수단의 기존 기여(alpha × w)를 유지하도록 fit_pai 결과를 합칩니다.
+    추정한 수단의 alpha × w_j는 그대로 두고, 전체 가중치 합이 PAI_WEIGHT_TOTAL이 되도록 alpha를 다시 정합니다.
+    (모든 수단 조합의 PAI 값이 바뀌지 않습니다.) 반환: (새 params, 유지한 수단 목록)
+    """
+    beta = {mode: result['alpha'] * weight for mode, weight in result['weights'].items()}
+    kept = [mode for mode in previous_weights if mode not in beta]
+    beta.update({mode: previous_alpha * previous_weights[mode] for mode in kept})
+    alpha = sum(beta.values()) / PAI_WEIGHT_TOTAL
+    if not kept or alpha <= 0:
+        return dict(result['params']), []
+    params = {f"w_{mode}": float(value / alpha) for mode, value in beta.items()}
+    params['alpha'] = float(alpha)
+    return params, kept
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Health Check: Streamlit 서버가 요청을 받을 준비가 될 때까지 health 엔드포인트를 확인합니다.
+# launcher.py와 run_local.py가 고정 대기(sleep) 대신 사용합니다.
+import os
+import time
+import urllib.error
+import urllib.request
+
+HEALTH_PATH = "/_stcore/health"
+TIMEOUT_ENV = "RAILWAY_STARTUP_TIMEOUT"
+DEFAULT_TIMEOUT = 90.0
+
+
+class ServerStartError(RuntimeError):
+    """제한 시간 안에 서버가 준비되지 않았거나 서버 프로세스가 먼저 종료되었습니다."""
+
+
+def startup_timeout():
+    """환경 변수 RAILWAY_STARTUP_TIMEOUT(초)에 설정된 대기 한도 (기본 90초)"""
+    try:
+        return float(os.environ.get(TIMEOUT_ENV, DEFAULT_TIMEOUT))
+    except ValueError:
+        return DEFAULT_TIMEOUT
+
+
+def health_url(port, host="127.0.0.1"):
+    return f"http://{host}:{port}{HEALTH_PATH}"
+
+
+def wait_for_server(port, host="127.0.0.1", timeout=None, exit_code=None, initial_delay=0.05, max_delay=1.0):
+    """
+    서버가 준비될 때까지 health 엔드포인트를 점점 긴 간격(initial_delay부터 두 배씩, 최대 max_delay)으로 확인합니다.
+    - exit_code: 서버 프로세스의 종료 코드를 반환하는 함수 (실행 중이면 None, 예: Popen.poll)
+                 프로세스가 먼저 종료되면 제한 시간을 기다리지 않고 바로 실패합니다.
+    준비되면 걸린 시간(초)을 반환하고, 실패하면 진단 내용을 담은 ServerStartError를 발생시킵니다.
+    """
+    timeout = startup_timeout() if timeout is None else timeout
+    started = time.monotonic()
+    delay, attempts, last_error = initial_delay, 0, None
+
+    while True:
+        attempts += 1
+        try:
+            with urllib.request.urlopen(health_url(port, host), timeout=min(max_delay, 2.0)) as response:
+                if response.status == 200:
+                    return time.monotonic() - started
+                last_error = f"HTTP {response.status}"
+        except urllib.error.HTTPError as e:
+            last_error = f"HTTP {e.code}"
+        except (urllib.error.URLError, OSError) as e:
+            last_error = str(getattr(e, 'reason', e))
+
+        elapsed = time.monotonic() - started
+        code = exit_code() if exit_code is not None else None
+        if code is not None:
+            raise ServerStartError(
+                f"서버 프로세스가 준비되기 전에 종료되었습니다. (종료 코드 {code}, {elapsed:.1f}초 경과, 확인 {attempts}회)"
+            )
+        if elapsed >= timeout:
+            raise ServerStartError(
+                f"{timeout:g}초 안에 서버가 준비되지 않았습니다. ({health_url(port, host)}, 확인 {attempts}회, 마지막 응답: {last_error})"
+            )
+        time.sleep(min(delay, max(0.0, timeout - elapsed)))
+        delay = min(delay * 2, max_delay)
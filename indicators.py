@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Indicators: 사용자 입력값(val1~val3)을 성과지표 값으로 바꾸는 배열 계산 엔진
+#
+# - 성과지표마다 배열을 받아 배열을 반환하는 함수가 하나씩 있으며, 화면(단일 값)과
+#   시나리오 비교/역사 목록 같은 일괄 계산이 같은 식을 사용합니다.
+# - 분모가 0 이하이면 화면과 같이 0, 입력이 비어 있으면(NaN) NaN을 반환합니다.
+# - 물리적 접근성(PAI)과 환승시설 편의성(TCI)은 수단 선택/거리 입력으로 계산하므로
+#   m2.calculate_pai, m2.calculate_tci_score_array를 사용합니다.
+import numpy as np
+import pandas as pd
+
+
+def _array(values):
+    """None과 숫자가 섞인 입력도 float 배열로 바꿉니다. (None → NaN)"""
+    values = np.asarray(values, dtype=object if values is None else None)
+    if values.dtype == object:
+        values = np.where(values == None, np.nan, values)  # noqa: E711
+    return values.astype(float)
+
+
+def safe_ratio(numerator, denominator, scale=1.0):
+    """numerator / denominator × scale (분모가 0 이하이면 0, 분모가 NaN이면 NaN)"""
+    numerator, denominator = _array(numerator), _array(denominator)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = numerator / denominator * scale
+    return np.where(denominator > 0, ratio, np.where(np.isnan(denominator), np.nan, 0.0))
+
+
+def operating_speed(distance_km, hours):
+    """표정속도(km/h) = 운행 거리 / 소요 시간"""
+    return safe_ratio(distance_km, hours)
+
+
+def train_comfort(passengers, capacity):
+    """열차이용 쾌적성(%) = 재차 인원 / 정원 × 100"""
+    return safe_ratio(passengers, capacity, 100.0)
+
+
+def facility_comfort(persons, area):
+    """역사 시설/환승시설 쾌적성(인/㎡) = 이용 인원 / 면적"""
+    return safe_ratio(persons, area)
+
+
+def eai_cost(access_cost, rail_cost, parking_cost):
+    """경제적 접근성(원) = 접근 비용 + 철도 운임 + 주차 비용 (빈 입력은 0원)"""
+    return (np.nan_to_num(_array(access_cost)) + np.nan_to_num(_array(rail_cost))
+            + np.nan_to_num(_array(parking_cost)))
+
+
+def passthrough(value):
+    """입력값이 곧 성과지표 값인 지표 (시간적 접근성, 운행횟수, 열차운행 정시성)"""
+    return _array(value)
+
+
+# 성과지표 → (계산 함수, 사용하는 입력 수)
+INDICATORS = {
+    "시간적 접근성": (passthrough, 1),
+    "경제적 접근성": (eai_cost, 3),
+    "운행횟수": (passthrough, 1),
+    "표정속도": (operating_speed, 2),
+    "열차운행 정시성": (passthrough, 1),
+    "열차이용 쾌적성": (train_comfort, 2),
+    "역사 시설 쾌적성": (facility_comfort, 2),
+    "환승시설 쾌적성": (facility_comfort, 2),
+}
+
+
+def indicator_values(kpi, val1, val2=None, val3=None):
+    """한 성과지표의 입력 배열로 성과지표 값 배열을 계산합니다. (목록에 없는 지표는 val1을 그대로 사용)"""
+    function, count = INDICATORS.get(kpi, (passthrough, 1))
+    return function(*(val1, val2, val3)[:count])
+
+
+def indicator_value(kpi, val1, val2=None, val3=None):
+    """화면용 단일 값 (계산할 수 없으면 0.0)"""
+    value = float(indicator_values(kpi, val1, val2, val3))
+    return value if np.isfinite(value) else 0.0
+
+
+def kpi_values(kpis, val1, val2, val3):
+    """
+    행마다 성과지표가 다른 입력 배열을 성과지표별로 한 번씩 배열 계산합니다.
+    INDICATORS에 없는 지표(PAI, TCI 등)는 NaN입니다.
+    """
+    # 문자열 비교를 지표 수만큼 반복하지 않도록 지표 이름을 한 번만 정수 코드로 바꿉니다.
+    codes, names = pd.factorize(np.asarray(kpis, dtype=object))
+    val1, val2, val3 = (np.broadcast_to(_array(v), codes.shape) for v in (val1, val2, val3))
+    values = np.full(codes.shape, np.nan)
+    for code, kpi in enumerate(names):
+        if kpi not in INDICATORS:
+            continue
+        index = np.flatnonzero(codes == code)
+        values[index] = indicator_values(kpi, val1[index], val2[index], val3[index])
+    return values
+
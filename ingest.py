@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Ingest: CSV 계열 입력(정책 DB, 만족도 계수, 시나리오, 설문조사)을 읽는 단일 수집 계층
+#
+# 파일 앞부분(SNIFF_BYTES)만 보고 BOM, 인코딩(utf-8/cp949/utf-16), 구분자(쉼표/탭/세미콜론/파이프)를 판별한 뒤
+# 한 번만 디코딩합니다. 큰 입력은 pyarrow의 멀티스레드 CSV 리더로 읽습니다.
+# (예전처럼 utf-8로 끝까지 파싱하다 실패하면 cp949로 다시 파싱하는 이중 파싱을 하지 않습니다)
+import codecs
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+SNIFF_BYTES = 64 * 1024
+ARROW_MIN_BYTES = 4 * 1024 * 1024  # 이 크기 이상이면 pyarrow CSV 리더를 사용합니다.
+DELIMITER_CANDIDATES = [',', '\t', ';', '|']
+
+_BOMS = [
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+]
+
+
+class SniffResult:
+    """입력 앞부분으로 판별한 형식 정보입니다."""
+
+    def __init__(self, encoding, bom_length, delimiter):
+        self.encoding = encoding
+        self.bom_length = bom_length
+        self.delimiter = delimiter
+
+    def __repr__(self):
+        return f"SniffResult(encoding={self.encoding!r}, bom_length={self.bom_length}, delimiter={self.delimiter!r})"
+
+
+def _read_bytes(source):
+    """파일 경로, bytes, 업로드 파일(getvalue/read)을 bytes로 읽습니다."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _detect_encoding(prefix):
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding, len(bom)
+    try:
+        # 앞부분만 잘라 읽었으므로 마지막 글자가 잘려 있을 수 있어 final=False로 검사합니다.
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        return 'utf-8', 0
+    except UnicodeDecodeError:
+        return 'cp949', 0
+
+
+def _detect_delimiter(first_line):
+    """첫 줄(헤더)에서 따옴표 밖에 가장 많이 나타나는 구분자를 고릅니다."""
+    counts = dict.fromkeys(DELIMITER_CANDIDATES, 0)
+    in_quotes = False
+    for char in first_line:
+        if char == '"':
+            in_quotes = not in_quotes
+        elif not in_quotes and char in counts:
+            counts[char] += 1
+    delimiter = max(DELIMITER_CANDIDATES, key=lambda d: counts[d])
+    return delimiter if counts[delimiter] > 0 else ','
+
+
+def sniff(prefix):
+    """입력의 앞부분(bytes)으로 인코딩, BOM 길이, 구분자를 판별합니다."""
+    encoding, bom_length = _detect_encoding(prefix)
+    text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(prefix[bom_length:], final=False)
+    first_line = next((line for line in text.splitlines() if line.strip()), '')
+    return SniffResult(encoding, bom_length, _detect_delimiter(first_line))
+
+
+def decode_text(source):
+    """입력 전체를 판별된 인코딩으로 한 번 디코딩하여 (텍스트, SniffResult)를 반환합니다."""
+    raw = _read_bytes(source)
+    info = sniff(raw[:SNIFF_BYTES])
+    try:
+        text = raw[info.bom_length:].decode(info.encoding)
+    except UnicodeDecodeError:
+        # 앞부분은 utf-8처럼 보였지만 뒤쪽에 cp949 문자가 있는 드문 경우입니다.
+        info.encoding = 'cp949'
+        text = raw[info.bom_length:].decode(info.encoding)
+    return text, info
+
+
+def _read_with_arrow(raw, info, sep):
+    read_options = pa_csv.ReadOptions(use_threads=True, encoding=info.encoding)
+    parse_options = pa_csv.ParseOptions(delimiter=sep, newlines_in_values=True)
+    table = pa_csv.read_csv(pa.py_buffer(raw[info.bom_length:]), read_options=read_options, parse_options=parse_options)
+    return table.to_pandas()
+
+
+def read_table(source, sep=None):
+    """
+    CSV/TSV 입력을 DataFrame으로 읽습니다.
+    - source: 파일 경로, bytes 또는 업로드 파일
+    - sep: 구분자 (지정하지 않으면 헤더로 판별)
+    파일 경로가 존재하지 않으면 None을 반환합니다.
+    """
+    if isinstance(source, (str, os.PathLike)) and not os.path.exists(source):
+        return None
+    raw = _read_bytes(source)
+    info = sniff(raw[:SNIFF_BYTES])
+    sep = sep or info.delimiter
+
+    if len(raw) >= ARROW_MIN_BYTES:
+        try:
+            return _read_with_arrow(raw, info, sep)
+        except (pa.ArrowInvalid, UnicodeDecodeError):
+            pass  # 행마다 컬럼 수가 다른 등 pyarrow가 처리하지 못한 입력은 pandas로 읽습니다.
+
+    text, _ = decode_text(raw)
+    return pd.read_csv(io.StringIO(text), sep=sep)
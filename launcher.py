@@ -3,13 +3,26 @@ import subprocess
 import sys
 import ctypes
 import webbrowser
-import time
+
+from health_check import ServerStartError, wait_for_server
+
+PORT = 8501
+LOG_TAIL_LINES = 15
+
+def read_log_tail(log_path, lines=LOG_TAIL_LINES):
+    """서버 로그의 마지막 몇 줄 (오류 안내창에 표시)"""
+    try:
+        with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+            return ''.join(f.readlines()[-lines:]).strip()
+    except OSError:
+        return ""
 
 def main():
     # 1. 경로 설정
     base_path = os.path.dirname(os.path.abspath(sys.argv[0]))
     python_exe = os.path.join(base_path, "python_embed", "python.exe")
     script_file = os.path.join(base_path, "m3.py")
+    log_path = os.path.join(base_path, "launcher.log")
 
     # 2. 안전장치 (파일 확인)
     if not os.path.exists(python_exe):
@@ -23,32 +36,50 @@ def main():
     # --server.port 8501 : 포트를 8501로 고정 (브라우저가 주소를 알기 위해)
     # --server.headless true : Streamlit 자체의 브라우저 띄우기 기능은 끕니다 (우리가 직접 띄울 거니까)
     cmd = [
-        python_exe, 
-        "-m", "streamlit", 
-        "run", script_file, 
-        "--server.port", "8501",
+        python_exe,
+        "-m", "streamlit",
+        "run", script_file,
+        "--server.port", str(PORT),
         "--server.headless", "true",
         "--global.developmentMode", "false"
     ]
 
     # 4. [핵심 변경] 비동기 실행 (Popen)
     # subprocess.CREATE_NO_WINDOW : 하위 프로세스(Streamlit)의 검은 창을 숨김
+    # 창이 없으므로 서버 출력은 launcher.log에 남겨, 시작에 실패하면 안내창에 보여줍니다.
+    log_file = open(log_path, 'w', encoding='utf-8')
     process = subprocess.Popen(
-        cmd, 
-        cwd=base_path, 
+        cmd,
+        cwd=base_path,
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
         creationflags=subprocess.CREATE_NO_WINDOW
     )
 
-    # 5. 서버가 켜질 때까지 잠시 대기 (2초)
-    # 컴퓨터 속도에 따라 다르지만 보통 2~3초면 켜집니다.
-    time.sleep(2)
+    # 5. 서버가 준비될 때까지 health 엔드포인트 확인 (고정 대기 없음)
+    # 준비되는 즉시 브라우저를 열고, 서버가 먼저 죽거나 제한 시간을 넘기면 바로 알립니다.
+    try:
+        elapsed = wait_for_server(PORT, exit_code=process.poll)
+    except ServerStartError as e:
+        if process.poll() is None:
+            process.terminate()
+        log_file.close()
+        message = f"프로그램을 시작하지 못했습니다.\n\n{e}"
+        log_tail = read_log_tail(log_path)
+        if log_tail:
+            message += f"\n\n--- 서버 로그 (launcher.log) ---\n{log_tail}"
+        ctypes.windll.user32.MessageBoxW(0, message, "오류", 16)
+        return
+    log_file.write(f"[launcher] 서버 준비 완료: {elapsed:.2f}초\n")
+    log_file.flush()
 
     # 6. 브라우저 강제 오픈
-    webbrowser.open("http://localhost:8501")
+    webbrowser.open(f"http://localhost:{PORT}")
 
     # 7. 프로그램 유지
     # 사용자가 브라우저를 닫고 서버를 끌 때까지 런처도 꺼지면 안 됨
     process.wait()
+    log_file.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,6 +3,12 @@
 import pandas as pd
 import os
 import streamlit as st
+from data_watcher import data_version
+from change_log import ChangeLog, editor_changes
+from disk_cache import content_hash, default_cache, file_signature
+from ingest import read_table
+from perf import cache_lookup, cache_miss, timed
+from storage import FORMAT_EXTENSIONS, configured_format, read_parquet, write_parquet
 
 # --- [복구된 함수] 이 함수가 없어서 에러가 났습니다! ---
 def resource_path(relative_path):
@@ -11,6 +17,14 @@ def resource_path(relative_path):
     """
     return relative_path
 
+
+def coefficient_family(kpi, param1_name):
+    """계수 행의 종류: PAI 접근 수단 가중치(w_<수단>, alpha) 행은 'weights', 그 밖의 행은 'curve'"""
+    name = str(param1_name)
+    if kpi == 'PAI' and (name.startswith('w_') or name == 'alpha'):
+        return 'weights'
+    return 'curve'
+
 class DataManager:
 
     KPI_ABBREVIATIONS = {
@@ -27,70 +41,135 @@ class DataManager:
     }
     
     TCI_ALL_MODES = ['대중교통', '도보', '승용차', '택시/배웅', 'PM']
+    PAI_ALL_MODES = ['도보', '마을/시내버스', '광역버스', '지하철/광역철도', '승용차', '자전거', '택시', '공유PM']
     
     ABBREVIATIONS_TO_FULL_NAMES = {v: k for k, v in KPI_ABBREVIATIONS.items()}
 
     def __init__(self):
+        self.data_dir = "data"
+
         # 1. 원본 파일 경로
         self.original_policy_path = "data/policy_db.csv"
         self.original_coeffs_path = "data/coefficients.csv"
 
-        # 2. 수정 파일 경로
-        self.modified_policy_path = "data/policy_db_modified.csv"
-        self.modified_coeffs_path = "data/coefficients_modified.csv"
+        # 2. 수정 파일 경로 (저장 형식에 따라 .csv 또는 .parquet)
+        self.data_format = configured_format()
+        extension = FORMAT_EXTENSIONS[self.data_format]
+        self.modified_policy_path = f"data/policy_db_modified{extension}"
+        self.modified_coeffs_path = f"data/coefficients_modified{extension}"
 
         # data 폴더가 혹시 없으면 생성
         if not os.path.exists('data'):
             os.makedirs('data')
 
-    def _load_csv_with_encoding_fallback(self, filepath):
-        if not os.path.exists(filepath):
-            return None 
+    def _load_table(self, filepath):
+        """CSV/TSV 파일을 읽습니다. 인코딩과 구분자는 ingest에서 파일 앞부분으로 판별합니다."""
+        return read_table(filepath)
 
-        try:
-            df = pd.read_csv(filepath, encoding='utf-8')
-        except UnicodeDecodeError:
-            df = pd.read_csv(filepath, encoding='cp949')
+    def _policy_log(self):
+        if self.data_format == 'parquet':
+            return ChangeLog(self.modified_policy_path, read_parquet, lambda df, path: write_parquet(df, path, 'policy'))
+        return ChangeLog(
+            self.modified_policy_path,
+            self._load_table,
+            lambda df, path: df.to_csv(path, index=False, encoding='utf-8')
+        )
+
+    def _coeffs_log(self):
+        if self.data_format == 'parquet':
+            return ChangeLog(self.modified_coeffs_path, read_parquet, lambda df, path: write_parquet(df, path, 'coefficients'))
+        # 계수 파일은 탭으로 구분된 형식(TSV)으로 읽고 씁니다.
+        return ChangeLog(
+            self.modified_coeffs_path,
+            self._load_table,
+            lambda df, path: df.to_csv(path, index=False, encoding='utf-8', sep='\t')
+        )
+
+    def _load_original_policy(self):
+        df = self._load_table(self.original_policy_path)
+        return self._normalize_policy_df(df) if df is not None else None
+
+    def _load_original_coeffs(self):
+        return self._load_table(self.original_coeffs_path)
+
+    def _load_snapshot(self, log, read_original):
+        """수정 파일이 있으면 변경 로그를 적용한 스냅샷을, 없으면 원본 파일을 읽습니다. (index = 행 ID)"""
+        df = log.read_snapshot()
+        if df is None:
+            df = read_original()
+            if df is None:
+                return None
+            df = df.reset_index(drop=True)
+            df.attrs['generation'] = 'original'
         return df
 
-    def _load_tsv_with_encoding_fallback(self, filepath):
-        if not os.path.exists(filepath):
-            return None
+    def _save_changes(self, log, read_original, updates, added, deleted, generation):
+        if not os.path.exists(log.base_path):
+            # 첫 저장: 원본을 수정 파일로 복사한 뒤 변경분을 기록합니다. (행 ID는 원본 행 번호와 같습니다)
+            original_df = read_original()
+            if original_df is None:
+                raise ValueError("원본 데이터 파일을 찾을 수 없습니다.")
+            log.write_full(original_df)
+            generation = None
+        return log.append(updates, added, deleted, generation=generation)
 
-        try:
-            df = pd.read_csv(filepath, encoding='utf-8', sep='\t')
-        except UnicodeDecodeError:
-            df = pd.read_csv(filepath, encoding='cp949', sep='\t')
+    @staticmethod
+    def _normalize_policy_df(df):
+        """'124개월'과 같은 추진 기간을 개월 수(정수)로 바꿉니다."""
+        if not pd.api.types.is_integer_dtype(df['duration_months'].dtype):
+            df['duration_months'] = df['duration_months'].astype(str).str.replace('개월', '')
+            df['duration_months'] = pd.to_numeric(df['duration_months'], errors='coerce').fillna(0).astype(int)
         return df
 
+    @timed("m1.load_policy_data")
     def load_policy_data(self):
-        if os.path.exists(self.modified_policy_path):
-            df = self._load_csv_with_encoding_fallback(self.modified_policy_path)
-        else:
-            df = self._load_csv_with_encoding_fallback(self.original_policy_path)
-        
+        df = self._load_snapshot(self._policy_log(), self._load_original_policy)
+
         if df is None:
             # 파일이 없어도 앱이 죽지 않도록 빈 데이터프레임 반환
             return pd.DataFrame(columns=['category', 'name', 'cost', 'process', 'duration_months', 'related_kpi'])
 
-        df['duration_months'] = df['duration_months'].astype(str).str.replace('개월', '')
-        df['duration_months'] = pd.to_numeric(df['duration_months'], errors='coerce').fillna(0).astype(int)
-        return df
+        return self._normalize_policy_df(df)
+
+    def _shared_cache_key(self, kind, original_path, modified_path):
+        """디스크 캐시 키: 데이터 버전 + 원본/수정/변경 로그 파일의 크기와 수정 시각"""
+        return content_hash(kind, self.data_format, data_version(self.data_dir),
+                            file_signature(original_path, modified_path, f"{modified_path}.changes"))
+
+    def load_policy_data_shared(self):
+        """
+        load_policy_data()의 결과를 디스크 캐시에서 읽습니다. 다른 워커나 이전 실행이 같은 파일을 이미 읽었다면
+        CSV/Parquet 파싱과 변경 로그 적용을 건너뜁니다.
+        """
+        key = self._shared_cache_key('policy', self.original_policy_path, self.modified_policy_path)
+        return default_cache().get_or_compute('disk_policy', key, self.load_policy_data)
 
     def save_policy_data(self, df):
-        df.to_csv(self.modified_policy_path, index=False, encoding='utf-8')
+        """정책 DB 전체를 저장합니다. (일괄 교체용)"""
+        self._policy_log().write_full(df)
+
+    @timed("m1.save_policy_changes")
+    def save_policy_changes(self, input_df, edit_state):
+        """
+        data_editor의 편집 상태에서 변경된 행만 변경 로그에 추가합니다.
+        input_df는 load_policy_data()로 읽은 DataFrame이어야 합니다. (index = 행 ID)
+        """
+        updates, added, deleted = editor_changes(input_df, edit_state)
+        return self._save_changes(
+            self._policy_log(), self._load_original_policy,
+            updates, added, deleted, input_df.attrs.get('generation')
+        )
 
+    @timed("m1.load_coefficients_df")
     def load_coefficients_df(self):
-        if os.path.exists(self.modified_coeffs_path):
-            df = self._load_tsv_with_encoding_fallback(self.modified_coeffs_path)
-        else:
-            df = self._load_tsv_with_encoding_fallback(self.original_coeffs_path)
-        
+        df = self._load_snapshot(self._coeffs_log(), self._load_original_coeffs)
+
         if df is None:
             return pd.DataFrame() 
 
         return df
 
+    @timed("m1.load_coefficients")
     def load_coefficients(self):
         df = self.load_coefficients_df()
         
@@ -134,6 +213,9 @@ class DataManager:
                 elif str(param1_name).startswith('c_'):
                     mode = param1_name[2:]
                     tci_coeffs[rail_type]['c'][mode] = float(param1_value)
+                # 계수 산출(m6)은 수단별로 P_<수단>, c_<수단>을 한 행에 저장합니다.
+                if str(param2_name).startswith('c_') and pd.notna(param2_value):
+                    tci_coeffs[rail_type]['c'][param2_name[2:]] = float(param2_value)
 
             if rail_type not in coeffs['coefficients']:
                 coeffs['coefficients'][rail_type] = {}
@@ -148,29 +230,97 @@ class DataManager:
                 if not (kpi == 'TCI' and (str(param1_name).startswith('P_') or str(param1_name).startswith('c_'))):
                     params_dict[param1_name] = float(param1_value)
             if pd.notna(param2_name) and pd.notna(param2_value):
-                params_dict[param2_name] = float(param2_value)
-
-        # 하드코딩된 PAI 가중치 (백업용)
-        if not pai_coeffs['weights']:
-             pai_coeffs['weights'] = {
-                '고속철도': {'도보': 10.28, '택시': 26.64, '승용차': 20.56, '자전거': 0.47, '공유PM': 0.47, '마을/시내버스': 18.22, '광역버스': 4.21, '지하철/광역철도': 19.16},
-                '일반철도': {'도보': 5.97, '택시': 30.59, '승용차': 23.13, '자전거': 2.24, '공유PM': 1.49, '마을/시내버스': 27.61, '광역버스': 5.22, '지하철/광역철도': 3.73},
-                '광역철도': {'도보': 39.06, '택시': 9.67, '승용차': 6.81, '자전거': 5.38, '공유PM': 3.58, '마을/시내버스': 23.66, '광역버스': 3.58, '지하철/광역철도': 8.24}
-            }
-        if not pai_coeffs['alpha']:
-            pai_coeffs['alpha'] = {'고속철도': 1.0, '일반철도': 1.0, '광역철도': 1.0}
+                if not (kpi == 'TCI' and str(param2_name).startswith('c_')):
+                    params_dict[param2_name] = float(param2_value)
+
+        # 하드코딩된 PAI 가중치 (백업용): 설문으로 추정한 가중치(w_<수단>, alpha 행)가 없는 철도 유형에만 사용
+        default_weights = {
+            '고속철도': {'도보': 10.28, '택시': 26.64, '승용차': 20.56, '자전거': 0.47, '공유PM': 0.47, '마을/시내버스': 18.22, '광역버스': 4.21, '지하철/광역철도': 19.16},
+            '일반철도': {'도보': 5.97, '택시': 30.59, '승용차': 23.13, '자전거': 2.24, '공유PM': 1.49, '마을/시내버스': 27.61, '광역버스': 5.22, '지하철/광역철도': 3.73},
+            '광역철도': {'도보': 39.06, '택시': 9.67, '승용차': 6.81, '자전거': 5.38, '공유PM': 3.58, '마을/시내버스': 23.66, '광역버스': 3.58, '지하철/광역철도': 8.24}
+        }
+        for rail_type, weights in default_weights.items():
+            pai_coeffs['weights'].setdefault(rail_type, weights)
+            pai_coeffs['alpha'].setdefault(rail_type, 1.0)
                 
         return coeffs, pai_coeffs, tci_coeffs
         
+    def load_coefficients_cached(self):
+        """
+        load_coefficients()의 결과를 데이터 버전별로 캐시하여 반환합니다.
+        계수 파일이 저장될 때만 다시 읽으므로 화면이 갱신될 때마다 파일을 파싱하지 않습니다.
+        """
+        cache_lookup('coefficients')
+        return _load_coefficients_for_version(self.data_dir, data_version(self.data_dir))
+
+    def load_coefficients_shared(self):
+        """load_coefficients()의 결과를 디스크 캐시에서 읽습니다. (load_policy_data_shared와 같은 방식)"""
+        key = self._shared_cache_key('coefficients', self.original_coeffs_path, self.modified_coeffs_path)
+        return default_cache().get_or_compute('disk_coefficients', key, self.load_coefficients)
+
     def save_coefficients(self, df):
-        df.to_csv(self.modified_coeffs_path, index=False, encoding='utf-8')
+        """만족도 계수 전체를 저장합니다. (일괄 교체용)"""
+        self._coeffs_log().write_full(df)
+
+    @timed("m1.replace_coefficient_rows")
+    def replace_coefficient_rows(self, new_coeffs_df):
+        """
+        new_coeffs_df에 포함된 (철도 유형, 성과지표, 계수 종류)의 기존 계수를 새 계수로 교체합니다.
+        예: '고속철도'의 'TC' 계수를 업데이트할 때 '일반철도'의 'TC' 계수는 유지됩니다.
+        PAI의 만족도 곡선(c, a)과 접근 수단 가중치(w_<수단>, alpha)는 서로 다른 종류이므로 한쪽만 저장해도 다른 쪽은 유지됩니다.
+        읽기부터 쓰기까지 잠금을 유지하므로 동시에 저장된 다른 변경분을 덮어쓰지 않습니다.
+        """
+        def _keys(df):
+            return zip(df['rail_type'], df['kpi'], map(coefficient_family, df['kpi'], df['param1_name']))
+
+        def _replace(existing_df):
+            new_keys = set(_keys(new_coeffs_df))
+            rows_to_drop = [key in new_keys for key in _keys(existing_df)]
+            kept_df = existing_df[[not drop for drop in rows_to_drop]]
+            return pd.concat([kept_df, new_coeffs_df], ignore_index=True)
+
+        return self._coeffs_log().rewrite(_replace, self._load_original_coeffs)
+
+    @timed("m1.save_coefficient_changes")
+    def save_coefficient_changes(self, input_df, edit_state, transform=None):
+        """
+        data_editor의 편집 상태에서 변경된 행만 변경 로그에 추가합니다.
+        transform: 화면용 컬럼 값을 저장용 컬럼 값으로 바꾸는 함수 (예: '성과지표' -> 'kpi')
+        """
+        updates, added, deleted = editor_changes(input_df, edit_state, transform)
+        return self._save_changes(
+            self._coeffs_log(), self._load_original_coeffs,
+            updates, added, deleted, input_df.attrs.get('generation')
+        )
+
+    def restore_policy_data(self):
+        try:
+            self._policy_log().remove()
+            st.toast("✅ 추진 과제 데이터가 초기 상태로 복원되었습니다.")
+        except Exception as e:
+            st.error(f"🚨 복원 오류: {e}")
+
+    def restore_coefficients_data(self):
+        try:
+            self._coeffs_log().remove()
+            st.toast("✅ 만족도 계수 데이터가 초기 상태로 복원되었습니다.")
+        except Exception as e:
+            st.error(f"🚨 복원 오류: {e}")
 
     def restore_all_data(self):
         try:
-            if os.path.exists(self.modified_policy_path):
-                os.remove(self.modified_policy_path)
-            if os.path.exists(self.modified_coeffs_path):
-                os.remove(self.modified_coeffs_path)
+            self._policy_log().remove()
+            self._coeffs_log().remove()
             st.toast("✅ 모든 데이터가 초기 상태로 복원되었습니다.")
         except Exception as e:
-            st.error(f"🚨 복원 오류: {e}")
\ No newline at end of file
+            st.error(f"🚨 복원 오류: {e}")
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _load_coefficients_for_version(data_dir, version):
+    """
+    데이터 버전이 바뀔 때만 계수를 다시 가져옵니다. (data_dir, version이 캐시 키입니다)
+    다른 워커가 이미 읽은 버전이면 디스크 캐시에서 가져옵니다.
+    """
+    cache_miss('coefficients')
+    return DataManager().load_coefficients_shared()
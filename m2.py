@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 # M2: 지표 예측 및 만족도 계산 모듈
 import math
+import numpy as np
 import pandas as pd
 from m1 import DataManager # DataManager 임포트
+import indicators
+from tci_kernel import tci_terms
+from perf import increment, timed
 
 def calculate_physical_tai(access_time, rail_type=None):
     """
@@ -44,15 +48,8 @@ def calculate_physical_eai(COST_access, COST_rail, COST_parking):
     """
     '경제적 접근성(EAI)'을 위해 사용자가 입력한 비용을 모두 더합니다.
     """
-    # 입력값이 None이면 0으로 처리
-    c1 = float(COST_access) if COST_access is not None else 0.0
-    c2 = float(COST_rail) if COST_rail is not None else 0.0
-    c3 = float(COST_parking) if COST_parking is not None else 0.0
-
-    # [수정] 가중치(omega) 삭제 -> 단순 총 비용 합계 반환
-    total_cost = c1 + c2 + c3
-    
-    return total_cost
+    # 입력값이 None이면 0으로 처리 (가중치 없이 단순 총 비용 합계)
+    return float(indicators.eai_cost(COST_access, COST_rail, COST_parking))
 
 
 def calculate_pai(selected_modes, weights, alpha):
@@ -66,35 +63,74 @@ def calculate_pai(selected_modes, weights, alpha):
     return alpha * pai_value
 
 
+def _tci_coefficient_arrays(rail_type_coeffs, modes):
+    """수단 순서대로 P_j, c_j 배열 (계수가 없는 수단은 NaN)"""
+    P_coeffs = rail_type_coeffs.get('P', {})
+    C_coeffs = rail_type_coeffs.get('c', {})
+    P = np.array([np.nan if P_coeffs.get(mode) is None else P_coeffs[mode] for mode in modes], dtype=float)
+    c = np.array([np.nan if C_coeffs.get(mode) is None else C_coeffs[mode] for mode in modes], dtype=float)
+    return P, c
+
+
+@timed("m2.calculate_tci_score_array")
+def calculate_tci_score_array(distances, rail_type_coeffs, S_max, modes=DataManager.TCI_ALL_MODES):
+    """
+    calculate_tci_score의 배열 버전입니다. (시나리오 수, 수단 수) 거리 행렬을 한 번에 계산합니다.
+    - 열 순서는 modes, NaN은 선택하지 않은 수단, 거리 0은 P_j 전체 (마스크로 처리)
+    - P_j 또는 c_j가 없는 수단은 계산에서 빠집니다.
+    """
+    D = np.atleast_2d(np.asarray(distances, dtype=float))
+    if not isinstance(rail_type_coeffs, dict) or 'c' not in rail_type_coeffs or 'P' not in rail_type_coeffs:
+        return np.zeros(len(D))
+    increment('scoring_calls', len(D))
+    P, c = _tci_coefficient_arrays(rail_type_coeffs, modes)
+    has_coeffs = np.isfinite(P) & np.isfinite(c)
+    G, _ = tci_terms(np.where(has_coeffs, c, 0.0), np.where(has_coeffs[None, :], D, np.nan))
+    final_scores = S_max * (G @ np.where(has_coeffs, P, 0.0))
+    return np.clip(final_scores, 0.0, 10.0)
+
+
+@timed("m2.calculate_tci_score")
 def calculate_tci_score(distances, rail_type_coeffs, S_max):
     """
     '환승시설 편의성(TCI)'의 최종 만족도 점수를 사용자 제공 공식으로 직접 계산합니다.
+    S = S_max × Σ P_j × (1 - exp(-c_j / d_j)), 거리 0이면 P_j (calculate_tci_score_array로 계산)
     """
-    sum_terms = 0
-    
     if not isinstance(rail_type_coeffs, dict) or 'c' not in rail_type_coeffs or 'P' not in rail_type_coeffs:
         return 0.0
+    modes = list(distances)
+    row = [np.nan if distances[mode] is None else distances[mode] for mode in modes]
+    return float(calculate_tci_score_array([row], rail_type_coeffs, S_max, modes)[0])
 
-    C_coeffs = rail_type_coeffs.get('c', {})
-    P_coeffs = rail_type_coeffs.get('P', {})
 
-    for mode, distance in distances.items():
-        c_j = C_coeffs.get(mode)
-        P_j = P_coeffs.get(mode)
+def tci_distance_curves(base_distances, rail_type_coeffs, S_max, modes, max_distance, steps=101):
+    """
+    수단별로 그 수단의 거리만 0 ~ max_distance로 바꾸고 나머지는 base_distances로 둔 만족도 곡선
+    (선택하지 않은 수단도 선택한 것으로 가정), 반환: DataFrame(환승 수단, 거리(m), 만족도)
+    """
+    all_modes = list(DataManager.TCI_ALL_MODES)
+    base = np.array([base_distances.get(mode, np.nan) for mode in all_modes], dtype=float)
+    grid = np.linspace(0.0, max_distance, steps)
+    D = np.tile(base, (len(modes) * steps, 1))
+    for i, mode in enumerate(modes):
+        D[i * steps:(i + 1) * steps, all_modes.index(mode)] = grid
+    scores = calculate_tci_score_array(D, rail_type_coeffs, S_max, all_modes)
+    return pd.DataFrame({'환승 수단': np.repeat(modes, steps), '거리(m)': np.tile(grid, len(modes)), '만족도': scores})
 
-        if c_j is not None and P_j is not None and distance is not None:
-            if distance == 0:
-                mode_satisfaction_term = P_j * 1
-            else:
-                exp_component = math.exp(-c_j * (1 / distance))
-                mode_satisfaction_term = P_j * (1 - exp_component)
-            
-            sum_terms += mode_satisfaction_term
 
-    final_score = S_max * sum_terms
-    final_score = min(10.0, max(0.0, final_score)) 
-    
-    return final_score
+def tci_distance_surface(base_distances, rail_type_coeffs, S_max, mode_x, mode_y, max_distance, steps=41):
+    """
+    두 수단의 거리를 0 ~ max_distance 격자로 바꾼 만족도 지도 (steps × steps개 설계안을 한 번에 계산)
+    반환: DataFrame(mode_x 거리, mode_y 거리, 만족도)
+    """
+    all_modes = list(DataManager.TCI_ALL_MODES)
+    base = np.array([base_distances.get(mode, np.nan) for mode in all_modes], dtype=float)
+    grid_x, grid_y = np.meshgrid(np.linspace(0.0, max_distance, steps), np.linspace(0.0, max_distance, steps))
+    D = np.tile(base, (grid_x.size, 1))
+    D[:, all_modes.index(mode_x)] = grid_x.ravel()
+    D[:, all_modes.index(mode_y)] = grid_y.ravel()
+    scores = calculate_tci_score_array(D, rail_type_coeffs, S_max, all_modes)
+    return pd.DataFrame({mode_x: grid_x.ravel(), mode_y: grid_y.ravel(), '만족도': scores})
 
 
 class SatisfactionCalculator:
@@ -168,6 +204,7 @@ class SatisfactionCalculator:
     # [삭제됨] Model C 관련 함수 제거 완료
 
     def calculate_satisfaction(self, rail_type, metric_name, value):
+        increment('scoring_calls')
         kpi_config = self._get_kpi_config(rail_type, metric_name)
         model_type = kpi_config.get('model_type', 'A') 
         params = kpi_config.get('params', {})
@@ -184,6 +221,7 @@ class SatisfactionCalculator:
         return round(score, 2)
 
     def reverse_calculate_value(self, rail_type, metric_name, score):
+        increment('scoring_calls')
         score = max(0.0, min(self.S_max, score))
         kpi_config = self._get_kpi_config(rail_type, metric_name)
         model_type = kpi_config.get('model_type', 'A') 
@@ -199,6 +237,61 @@ class SatisfactionCalculator:
             
         return round(value, 2)
 
+    # --- 배열 단위 계산 (시나리오 일괄 비교 등) ---
+    def _model_b_params(self, params):
+        a = params.get("a")
+        x0 = next((v for k, v in params.items() if k.endswith('_0') or k == 'X_0'), None)
+        if a is None or x0 is None:
+            raise ValueError(f"Model B에 필요한 'a' 또는 'X_0' 형태의 계수가 없습니다. 전달된 파라미터: {params}")
+        return a, x0
+
+    @timed("m2.calculate_satisfaction_array")
+    def calculate_satisfaction_array(self, rail_type, metric_name, values):
+        """calculate_satisfaction의 배열 버전입니다. NaN 입력은 NaN으로 반환됩니다."""
+        kpi_config = self._get_kpi_config(rail_type, metric_name)
+        params = kpi_config.get('params', {})
+        values = np.asarray(values, dtype=float)
+        increment('scoring_calls', values.size)
+
+        if kpi_config.get('model_type', 'A') == 'B':
+            a, x0 = self._model_b_params(params)
+            # 스칼라 버전의 OverflowError(→ 0점)와 같도록 지수를 제한합니다.
+            exponent = np.clip(a * (values - x0), None, 700)
+            scores = self.S_max / (1 + np.exp(exponent))
+        else:
+            c = params.get("c")
+            if c is None:
+                raise ValueError("Model A에 필요한 'c' 계수가 없습니다.")
+            scores = self.S_max * (1 - np.exp(-c * values))
+        return np.round(scores, 2)
+
+    @timed("m2.reverse_calculate_value_array")
+    def reverse_calculate_value_array(self, rail_type, metric_name, scores):
+        """reverse_calculate_value의 배열 버전입니다. NaN 입력은 NaN으로 반환됩니다."""
+        kpi_config = self._get_kpi_config(rail_type, metric_name)
+        params = kpi_config.get('params', {})
+        raw = np.asarray(scores, dtype=float)
+        increment('scoring_calls', raw.size)
+        scores = np.clip(raw, 0.0, self.S_max)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if kpi_config.get('model_type', 'A') == 'B':
+                a, x0 = self._model_b_params(params)
+                ratio = np.maximum(self.S_max / scores, 1.000001)
+                values = np.log(ratio - 1) / a + x0
+                values = np.where(scores <= 0, np.inf, values)
+                values = np.where(scores >= self.S_max, 0.0, values)
+            else:
+                c = params.get("c")
+                if c is None:
+                    raise ValueError("Model A에 필요한 'c' 계수가 없습니다.")
+                ratio = np.minimum(scores / self.S_max, 0.999999)
+                values = -np.log(1 - ratio) / c
+                values = np.where(scores >= self.S_max, np.inf, values)
+        values = np.where(np.isnan(raw), np.nan, values)
+        return np.round(values, 2)
+
+    @timed("m2.generate_sensitivity_table")
     def generate_sensitivity_table(self, rail_type, metric_name, current_value):
         # ... 기존 코드와 동일 ...
         ratios = [-0.2, -0.1, 0.0, 0.1, 0.2]
@@ -16,12 +16,25 @@ st.set_page_config(
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# 지표 exporter (RAILWAY_METRICS_PORT / RAILWAY_METRICS_FILE 설정 시, 프로세스당 한 번 시작)
+from metrics import start_from_env as start_metrics_exporter
+start_metrics_exporter()
+
+# 무거운 모듈/데이터 예열 (백그라운드 스레드, 프로세스당 한 번)
+from warmup import start as start_warmup
+start_warmup()
+
+# data 폴더 감시 (외부 변경 시 데이터 버전을 올려 캐시 무효화, 프로세스당 한 번)
+from data_watcher import notify_session, start as start_data_watcher
+start_data_watcher()
+
 # 페이지 설정 이후에 모듈 임포트 진행
 try:
     from m3_1 import initialize_session_state
     from m3_2 import draw_landing_page
     from m3_3 import draw_user_view
     from m3_4 import draw_admin_view
+    from perf import span
 except ImportError as e:
     st.error(f"모듈을 불러오는 중 오류가 발생했습니다. 파일 이름을 확인해주세요: {e}")
     st.stop()
@@ -37,14 +50,16 @@ def main():
     """
     # 세션 상태에서 뷰 모드를 안전하게 가져옴
     view_mode = st.session_state.get('view_mode', 'landing')
+    notify_session()
 
     try:
-        if view_mode == 'user':
-            draw_user_view()
-        elif view_mode == 'admin':
-            draw_admin_view()
-        else: # 'landing' or default
-            draw_landing_page()
+        with span(f"rerun.{view_mode}"):
+            if view_mode == 'user':
+                draw_user_view()
+            elif view_mode == 'admin':
+                draw_admin_view()
+            else: # 'landing' or default
+                draw_landing_page()
     except Exception as e:
         st.error(f"화면을 그리는 중 예상치 못한 오류가 발생했습니다: {e}")
         logging.error(f"Render Error: {e}")
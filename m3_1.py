@@ -4,6 +4,7 @@
 import streamlit as st
 import pandas as pd
 from m1 import DataManager
+from policy_store import PolicyOverlay
 
 # --- 상수 정의 ---
 SELECT_PLACEHOLDER = "- 선택 -"
@@ -22,8 +23,8 @@ def initialize_session_state():
         'view_mode': 'landing',  # 'landing', 'user', 'admin'
         'logged_in': False,
 
-        # 데이터
-        'policy_db': st.session_state.m1.load_policy_data(),
+        # 데이터 (정책 DB 본체는 policy_store에서 세션 간 공유, 세션에는 변경분만 보관)
+        'policy_overlay': PolicyOverlay(),
 
         # 시뮬레이터 입력 값
         'predict_score': None,
@@ -86,8 +87,6 @@ def reset_user_inputs():
     사용자 시뮬레이션 관련 입력을 모두 초기화합니다.
     페이지 뷰나 로그인 상태는 유지합니다.
     """
-    m1 = DataManager()
-    
     keys_to_reset = [
         'predict_score', 'current_score', 'target_kpi', 'rail_type',
         'line_name', 'start_station_input', 'end_station_input',
@@ -125,6 +124,21 @@ def reset_user_inputs():
     st.session_state.tci_distance_df = pd.DataFrame({mode: [0] for mode in tci_transfer_modes}, dtype=float)
     st.session_state.future_tci_distance_df = pd.DataFrame({mode: [0] for mode in tci_transfer_modes}, dtype=float)
 
-    st.session_state.policy_db = m1.load_policy_data()
+    st.session_state.policy_overlay = PolicyOverlay()
+
+    st.toast("모든 사용자 입력이 초기화되었습니다.")
+
 
-    st.toast("모든 사용자 입력이 초기화되었습니다.")
\ No newline at end of file
+def load_scenario_into_session(values, scenario_name):
+    """
+    저장된 시나리오 값을 세션 상태에 적용합니다.
+    위젯 값이 바뀌므로 위젯이 그려지기 전(on_change/on_click 콜백)에서 호출해야 합니다.
+    """
+    reset_user_inputs()
+    for key, value in values.items():
+        if key == 'active_policy_names':
+            if value:
+                st.session_state['loaded_active_names'] = list(value)
+        else:
+            st.session_state[key] = value
+    st.session_state.loaded_scenario_name = scenario_name
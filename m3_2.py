@@ -6,6 +6,8 @@ import base64
 import os
 
 # --- Helper to load local image as base64 ---
+# 이미지 파일은 바뀌지 않으므로 한 번만 인코딩하여 모든 세션이 공유합니다.
+@st.cache_resource(show_spinner=False)
 def get_base64_of_bin_file(bin_file):
     with open(bin_file, 'rb') as f:
         data = f.read()
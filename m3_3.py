@@ -6,7 +6,6 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 import re
-import io
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 import os
@@ -15,18 +14,59 @@ import numpy as np
 import vl_convert as vlc
 
 # 모듈 임포트
+import indicators
 from m1 import DataManager, resource_path
-from m2 import SatisfactionCalculator, calculate_physical_tai, calculate_physical_eai, calculate_pai, calculate_tci_score
+from m2 import SatisfactionCalculator, calculate_physical_tai, calculate_pai, calculate_tci_score, tci_distance_curves, tci_distance_surface
 from m4 import ProjectRecommender
 from m5 import PdfGenerator
-from m3_1 import reset_user_inputs, SELECT_PLACEHOLDER
+from m3_1 import reset_user_inputs, load_scenario_into_session, SELECT_PLACEHOLDER
+from policy_store import get_shared_policy_db
+from scenario_store import SCENARIO_KEYS, parse_scenario_csv, scenario_to_csv_bytes
+from m3_5 import draw_scenario_library, draw_scenario_comparison, get_scenario_store
+from perf import inflight, span
+from pai_combinations import access_modes, combination_table, reachable, score_of, suggest_additions
+
+def draw_tci_what_if(distances, rail_type_coeffs, s_max):
+    """환승 거리 What-if: 수단별 거리에 따른 만족도 곡선과 두 수단의 거리 조합별 만족도 지도"""
+    with st.expander("🗺️ 환승 거리 What-if 분석"):
+        if not rail_type_coeffs.get('P') or not rail_type_coeffs.get('c'):
+            st.caption("이 철도 유형의 수단별 환승 계수(P_j, c_j)가 없습니다. 관리자 페이지에서 설문 데이터로 계수를 산출하면 사용할 수 있습니다.")
+            return
+        modes = [mode for mode in DataManager.TCI_ALL_MODES if mode in rail_type_coeffs['P'] and mode in rail_type_coeffs['c']]
+        max_col, x_col, y_col = st.columns(3)
+        max_distance = max_col.slider("최대 거리(m)", min_value=100, max_value=2000, value=500, step=50, key="tci_what_if_max")
+        mode_x = x_col.selectbox("가로축 수단", modes, key="tci_what_if_x")
+        mode_y = y_col.selectbox("세로축 수단", [mode for mode in modes if mode != mode_x], key="tci_what_if_y")
+
+        with span("user_view.tci_what_if"):
+            curves = tci_distance_curves(distances, rail_type_coeffs, s_max, modes, max_distance)
+            surface = tci_distance_surface(distances, rail_type_coeffs, s_max, mode_x, mode_y, max_distance) if mode_y else None
+        st.write("**수단별 거리에 따른 만족도** (다른 수단은 현재 입력값 유지)")
+        st.altair_chart(alt.Chart(curves).mark_line().encode(
+            x=alt.X('거리(m):Q'), y=alt.Y('만족도:Q', scale=alt.Scale(domain=[0, 10])), color=alt.Color('환승 수단:N'),
+            tooltip=['환승 수단', '거리(m)', alt.Tooltip('만족도', format='.2f')]
+        ), use_container_width=True)
+        if surface is not None:
+            st.write(f"**{mode_x} × {mode_y} 거리 조합별 만족도** ({len(surface):,}개 설계안)")
+            step = max_distance / 40
+            heatmap = alt.Chart(surface).mark_rect().encode(
+                x=alt.X(f'{mode_x}:Q', bin=alt.Bin(step=step), title=f'{mode_x} 거리(m)'),
+                y=alt.Y(f'{mode_y}:Q', bin=alt.Bin(step=step), title=f'{mode_y} 거리(m)'),
+                color=alt.Color('만족도:Q', scale=alt.Scale(scheme='viridis', domain=[0, 10])),
+                tooltip=[alt.Tooltip(mode_x, format='.0f'), alt.Tooltip(mode_y, format='.0f'), alt.Tooltip('만족도', format='.2f')]
+            )
+            current = pd.DataFrame({mode_x: [distances.get(mode_x, 0.0)], mode_y: [distances.get(mode_y, 0.0)]})
+            marker = alt.Chart(current).mark_point(color='red', size=120, shape='cross').encode(x=f'{mode_x}:Q', y=f'{mode_y}:Q')
+            st.altair_chart(heatmap + marker, use_container_width=True)
+
 
 def draw_user_view():
     """일반 사용자용 시뮬레이터 페이지를 그립니다."""
 
     # --- 모델 및 데이터 로더 초기화 ---
     m1_instance = DataManager()
-    config, pai_coeffs, tci_coeffs = m1_instance.load_coefficients()
+    with span("user_view.load_coefficients"):
+        config, pai_coeffs, tci_coeffs = m1_instance.load_coefficients_cached()
     m2 = SatisfactionCalculator(config)
     m4 = ProjectRecommender()
     m5 = PdfGenerator()
@@ -39,6 +79,14 @@ def draw_user_view():
     def handle_manual_predict_score_change():
         st.session_state.predict_score_is_manual = True
 
+    def apply_pai_suggestion(modes):
+        # 제안된 수단 조합을 장래 접근 수단 표에 반영합니다. (편집기 상태를 지워 새 값으로 다시 그림)
+        st.session_state.future_physical_access_df = pd.DataFrame(
+            {mode: [mode in modes] for mode in st.session_state.future_physical_access_df.columns}
+        )
+        st.session_state.pop('future_pai_editor', None)
+        reset_manual_flag()
+
     def copy_current_to_future():
         if st.session_state.use_current_elements_for_future:
             # 기존 값 복사
@@ -60,11 +108,7 @@ def draw_user_view():
 
             # PAI/TCI 데이터프레임 초기화
             rail_type = st.session_state.get('rail_type', SELECT_PLACEHOLDER)
-            all_modes = ['도보', '마을/시내버스', '광역버스', '지하철/광역철도', '승용차', '자전거', '택시', '공유PM']
-            if rail_type == '광역철도':
-                pai_access_modes = [mode for mode in all_modes if mode != '지하철/광역철도']
-            else:
-                pai_access_modes = all_modes
+            pai_access_modes = access_modes(rail_type)
             
             st.session_state.future_physical_access_df = pd.DataFrame(
                 {mode: [False] for mode in pai_access_modes}
@@ -111,39 +155,20 @@ def draw_user_view():
     def sanitize_filename(name):
         return re.sub(r'[\\/*?:\"<>|]', "_", name) if name else ""
 
-    def convert_value(value):
-        if value in ['None', 'nan', ''] or pd.isna(value):
-            return None
-        try:
-            float_val = float(value)
-            return int(float_val) if float_val.is_integer() else float_val
-        except (ValueError, TypeError):
-            if str(value).lower() == 'true': return True
-            if str(value).lower() == 'false': return False
-            return value
-
-    def get_scenario_as_csv_string():
-        keys_to_save = ['target_kpi', 'rail_type', 'line_name', 'station_name_input', 'start_station_input', 'end_station_input', 'line_section_input', 'line_length_input', 'input_val_1', 'input_val_2', 'input_minute', 'future_input_val_1', 'future_input_val_2', 'future_input_minute', 'target_year_input', 'target_month_input', 'future_goal_score_input', 'predict_score', 'goal_input_method', 'use_current_elements_for_future']
-        state_to_save = {key: st.session_state.get(key) for key in keys_to_save}
+    def get_current_scenario_values():
+        values = {key: st.session_state.get(key) for key in SCENARIO_KEYS}
         if 'edited_policies_df' in st.session_state and 'active' in st.session_state.edited_policies_df.columns:
             active_projects = st.session_state.edited_policies_df[st.session_state.edited_policies_df['active']]
-            state_to_save['active_policy_names'] = ','.join(active_projects['name'].tolist())
-        df_to_save = pd.DataFrame(state_to_save.items(), columns=['key', 'value'])
-        output = io.BytesIO()
-        df_to_save.to_csv(output, index=False, encoding='utf-8-sig')
-        return output.getvalue()
+            values['active_policy_names'] = active_projects['name'].tolist()
+        return values
+
+    def get_scenario_as_csv_string():
+        return scenario_to_csv_bytes(get_current_scenario_values())
 
     def load_state_from_uploaded_file(uploaded_file):
         if uploaded_file is None: return
         try:
-            df = pd.read_csv(uploaded_file).fillna('')
-            for _, row in df.iterrows():
-                key, value = row['key'], row['value']
-                if key == 'active_policy_names' and value:
-                    st.session_state['loaded_active_names'] = str(value).split(',')
-                else:
-                    st.session_state[key] = convert_value(value)
-            st.session_state.loaded_scenario_name = uploaded_file.name
+            load_scenario_into_session(parse_scenario_csv(uploaded_file.getvalue()), uploaded_file.name)
             st.toast(f"✅ 시나리오 '{uploaded_file.name}'를 불러왔습니다.")
         except Exception as e:
             st.error(f"🚨 파일 처리 중 오류 발생: {e}")
@@ -151,9 +176,11 @@ def draw_user_view():
     def process_uploaded_scenario():
         uploaded_files = st.session_state.get("scenario_multi_uploader")
         if uploaded_files:
-            last_file = uploaded_files[-1]
-            reset_user_inputs()
-            load_state_from_uploaded_file(last_file)
+            # 업로드된 모든 파일은 라이브러리에 보관하고, 마지막 파일을 화면에 적용합니다.
+            result = get_scenario_store().import_csv_files([(f.name, f.getvalue()) for f in uploaded_files])
+            if result['imported']:
+                st.toast(f"📚 시나리오 {result['imported']}건을 라이브러리에 저장했습니다.")
+            load_state_from_uploaded_file(uploaded_files[-1])
 
     # --- 사용 안내 팝업 ---
     @st.dialog("프로그램 사용 안내")
@@ -276,7 +303,7 @@ def draw_user_view():
     # ==============================================================================
     top_col1, top_col2 = st.columns(2)
 
-    with top_col1:
+    with top_col1, span("user_view.current_status"):
         with st.container(border=True):
             st.markdown('<div class="header-box blue-box">1. 현재 철도 현황</div>', unsafe_allow_html=True)
             st.write("가. 분석할 **성과지표**와 **철도 유형**을 선택하고, 분석할 **철도 노선 정보**를 입력해주세요.")
@@ -338,11 +365,7 @@ def draw_user_view():
                 unit = "점"
                 st.write("역으로 접근 가능한 교통수단을 선택해주세요.(중복 가능)")
                 
-                all_modes = ['도보', '마을/시내버스', '광역버스', '지하철/광역철도', '승용차', '자전거', '택시', '공유PM']
-                if rail_type == '광역철도':
-                    pai_access_modes = [mode for mode in all_modes if mode != '지하철/광역철도']
-                else:
-                    pai_access_modes = all_modes
+                pai_access_modes = access_modes(rail_type)
 
                 current_df = st.session_state.physical_access_df
                 new_data = {mode: [current_df.get(mode, [False])[0]] for mode in pai_access_modes}
@@ -408,6 +431,8 @@ def draw_user_view():
                 # 선택된 모드만 필터링하여 distances 딕셔너리 생성
                 distances = {row['Mode']: row['Distance'] for idx, row in edited_tci_df.iterrows() if row['Selected']}
                 st.session_state.current_tci_distances = distances
+                if rail_type != SELECT_PLACEHOLDER:
+                    draw_tci_what_if(distances, tci_coeffs.get(rail_type, {}), tci_coeffs.get('S_max', 10.0))
             elif target_kpi == "역사 시설 쾌적성":
                 c1, c2, _ = st.columns(3)
                 unit = "명/㎡"
@@ -460,19 +485,6 @@ def draw_user_view():
                     else:
                         current_val, current_score = 0.0, 0.0
                         st.session_state.current_selected_modes = [] # Clear the PAI specific selected modes
-                elif target_kpi == "시간적 접근성":
-                    current_val = val1  # [핵심] 5분이면 그냥 5를 가집니다.
-                    current_val_safe = current_val if current_val is not None else 0.0
-                    # 이제 만족도 계산기에 '5'가 들어갑니다 -> 정상 계산됨
-                    current_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, current_val_safe)
-                elif target_kpi == "경제적 접근성":
-                    current_val = calculate_physical_eai(val1, val2, val3)
-                    current_val_safe = current_val if current_val is not None else 0.0
-                    current_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, current_val_safe)
-                elif target_kpi == "표정속도":
-                    current_val = (val1 / val2) if val2 > 0 else 0
-                    current_val_safe = current_val if current_val is not None else 0.0
-                    current_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, current_val_safe)
                 elif target_kpi == "환승시설 편의성":
                     tci_distances = st.session_state.get('current_tci_distances', {}) 
                     if any(d > 0 for d in tci_distances.values()):
@@ -482,18 +494,10 @@ def draw_user_view():
                         current_val = current_score
                     else:
                         current_val, current_score = 0.0, 0.0                
-                elif target_kpi in ["열차이용 쾌적성"]:
-                    current_val = (val1 / val2) * 100 if val2 > 0 else 0
-                    current_val_safe = current_val if current_val is not None else 0.0
-                    current_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, current_val_safe)
-                elif target_kpi in ["역사 시설 쾌적성", "환승시설 쾌적성"]:
-                    current_val = (val1 / val2) if val2 > 0 else 0
-                    current_val_safe = current_val if current_val is not None else 0.0
-                    current_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, current_val_safe)
-                else: # Default case for other KPIs
-                    current_val = val1
-                    current_val_safe = current_val if current_val is not None else 0.0
-                    current_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, current_val_safe)
+                else:
+                    # 입력값 → 성과지표 값 변환은 indicators 엔진의 식을 사용합니다.
+                    current_val = indicators.indicator_value(target_kpi, val1, val2, val3)
+                    current_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, current_val)
                     st.session_state.current_score = current_score
 
             if current_val > 0 and target_kpi != "환승시설 편의성":
@@ -511,7 +515,7 @@ def draw_user_view():
     # PART 2: 미래 철도 상황
     # ==============================================================================
 
-    with top_col2:
+    with top_col2, span("user_view.future_status"):
         with st.container(border=True):
             st.markdown('<div class="header-box green-box">2. 미래 철도 상황</div>', unsafe_allow_html=True)
             kpi_display_name = f"'{target_kpi}'" if target_kpi != SELECT_PLACEHOLDER else "성과지표"
@@ -531,11 +535,7 @@ def draw_user_view():
             
             if target_kpi == "물리적 접근성":
                 st.write("장래에 역으로 접근 가능한 교통수단을 선택해주세요.(중복 가능)")
-                all_modes = ['도보', '마을/시내버스', '광역버스', '지하철/광역철도', '승용차', '자전거', '택시', '공유PM']
-                if rail_type == '광역철도':
-                    pai_access_modes = [mode for mode in all_modes if mode != '지하철/광역철도']
-                else:
-                    pai_access_modes = all_modes
+                pai_access_modes = access_modes(rail_type)
                 
                 future_df = st.session_state.future_physical_access_df
                 new_data = {mode: [future_df.get(mode, [False])[0]] for mode in pai_access_modes}
@@ -549,6 +549,27 @@ def draw_user_view():
                     key="future_pai_editor",
                     disabled=is_disabled
                 )
+
+                goal_score = st.session_state.get('future_goal_score_input')
+                if rail_type != SELECT_PLACEHOLDER and not is_disabled:
+                    with st.expander("💡 목표 만족도에 필요한 접근 수단 제안", expanded=goal_score is not None):
+                        if goal_score is None:
+                            st.caption("아래 '다'에서 목표 만족도를 입력하면 현재 접근 수단에 더할 최소한의 수단 조합을 제안합니다.")
+                        else:
+                            pai_table = combination_table(rail_type)
+                            current_modes = st.session_state.get('current_selected_modes', [])
+                            suggestions = suggest_additions(pai_table, current_modes, goal_score)
+                            if score_of(pai_table, current_modes)[1] >= goal_score:
+                                st.success(f"현재 접근 수단으로 이미 목표 만족도 {goal_score:.1f}점 이상입니다.")
+                            elif not suggestions:
+                                _, best_score = reachable(pai_table, current_modes, goal_score)
+                                st.warning(f"모든 접근 수단을 더해도 목표 만족도 {goal_score:.1f}점에 닿지 않습니다. (최고 {best_score:.2f}점)")
+                            else:
+                                st.caption(f"현재 접근 수단에 더해 목표 만족도 {goal_score:.1f}점에 닿는 최소 조합입니다. (추가 수가 적은 순, 같으면 만족도 상승 폭 순)")
+                                for i, suggestion in enumerate(suggestions):
+                                    text_col, button_col = st.columns([0.8, 0.2])
+                                    text_col.write(f"**+ {', '.join(suggestion['add'])}** → 만족도 {suggestion['score']:.2f}점 (+{suggestion['gain']:.2f}, PAI {suggestion['value']:.2f})")
+                                    button_col.button("적용", key=f"apply_pai_suggestion_{i}", on_click=apply_pai_suggestion, args=(suggestion['modes'],), use_container_width=True)
             elif target_kpi == "시간적 접근성":
                 c1_future, _, _ = st.columns(3)
                 c1_future.number_input("철도역 접근 소요시간(분)", step=10, placeholder="예: 15", key='future_input_val_1', on_change=reset_manual_flag, disabled=is_disabled)
@@ -646,21 +667,6 @@ def draw_user_view():
                         calculated_predict_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, future_kpi_val_safe)
                     else:
                         future_kpi_val, calculated_predict_score = 0.0, 0.0
-                elif target_kpi == "시간적 접근성":
-                    st.session_state.future_selected_modes = [] 
-                    future_kpi_val = future_val1  # [핵심] 입력된 미래 시간(분)을 그대로 사용
-                    future_kpi_val_safe = future_kpi_val if future_kpi_val is not None else 0.0
-                    calculated_predict_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, future_kpi_val_safe)
-                elif target_kpi == "경제적 접근성":
-                    st.session_state.future_selected_modes = [] 
-                    future_kpi_val = calculate_physical_eai(future_val1, future_val2, future_val3)
-                    future_kpi_val_safe = future_kpi_val if future_kpi_val is not None else 0.0
-                    calculated_predict_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, future_kpi_val_safe)
-                elif target_kpi == "표정속도":
-                    st.session_state.future_selected_modes = [] # Clear PAI-specific modes
-                    future_kpi_val = (future_val1 / future_val2) if future_val2 > 0 else 0
-                    future_kpi_val_safe = future_kpi_val if future_kpi_val is not None else 0.0
-                    calculated_predict_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, future_kpi_val_safe)
                 elif target_kpi == "환승시설 편의성":
                     tci_distances = st.session_state.get('future_tci_distances', {})
                     if any(d > 0 for d in tci_distances.values()):
@@ -670,21 +676,10 @@ def draw_user_view():
                         future_kpi_val = calculated_predict_score 
                     else:
                         future_kpi_val, calculated_predict_score = 0.0, 0.0
-                elif target_kpi in ["열차이용 쾌적성"]:
-                    st.session_state.future_selected_modes = [] # Clear PAI-specific modes
-                    future_kpi_val = (future_val1 / future_val2) * 100 if future_val2 > 0 else 0
-                    future_kpi_val_safe = future_kpi_val if future_kpi_val is not None else 0.0
-                    calculated_predict_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, future_kpi_val_safe)
-                elif target_kpi in ["역사 시설 쾌적성", "환승시설 쾌적성"]:
-                    st.session_state.future_selected_modes = [] # Clear PAI-specific modes
-                    future_kpi_val = (future_val1 / future_val2) if future_val2 > 0 else 0
-                    future_kpi_val_safe = future_kpi_val if future_kpi_val is not None else 0.0
-                    calculated_predict_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, future_kpi_val_safe)
-                else: # Default case for other KPIs
+                else:
                     st.session_state.future_selected_modes = [] # Clear PAI-specific modes
-                    future_kpi_val = future_val1
-                    future_kpi_val_safe = future_kpi_val if future_kpi_val is not None else 0.0
-                    calculated_predict_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, future_kpi_val_safe)
+                    future_kpi_val = indicators.indicator_value(target_kpi, future_val1, future_val2, future_val3)
+                    calculated_predict_score = m2.calculate_satisfaction(rail_type, abbreviated_kpi, future_kpi_val)
             if not st.session_state.predict_score_is_manual:
                 st.session_state.predict_score = calculated_predict_score
 
@@ -736,7 +731,7 @@ def draw_user_view():
 #==============================================================
 #3. 성과지표 변화 추이 및 만족도 결과 요약
 #==============================================================
-    with st.container(border=True):
+    with st.container(border=True), span("user_view.summary"):
         st.markdown(f'<div class="header-box green-box">3. {target_kpi} 변화 추이 및 만족도 결과 요약</div>', unsafe_allow_html=True)
         
         if inputs_are_valid and part2_inputs_are_valid and is_fail:
@@ -791,7 +786,8 @@ def draw_user_view():
             line_chart = base_chart.properties(title=f"{target_kpi} 변화 예측", height=300)
             line_chart_pdf = base_chart.properties(title=f"{target_kpi} 변화 예측", width=500, height=250)
             
-            st.altair_chart(line_chart, use_container_width=True)
+            with span("user_view.line_chart"):
+                st.altair_chart(line_chart, use_container_width=True)
             
         with bottom_summary_col:
             st.write("나. 결과 요약")
@@ -802,32 +798,37 @@ def draw_user_view():
 #4. 추진과제 분석 결과 및 정책 수행 제언
 #==============================================================
     st.divider()
-    with st.container(border=True):
+    with st.container(border=True), span("user_view.policies"):
         st.markdown('<div class="header-box purple-box">4. 추진과제 분석 결과 및 정책 수행 제언</div>', unsafe_allow_html=True)
         table_data = pd.DataFrame()
         active_policies = pd.DataFrame()
+        policy_db = get_shared_policy_db()
+        policy_overlay = st.session_state.policy_overlay
         if inputs_are_valid and part2_inputs_are_valid and is_fail:
             target_date = datetime(target_year, target_month, 1) + relativedelta(months=1) - relativedelta(days=1)
-            policy_df = st.session_state['policy_db']
-            if 'related_kpi' in policy_df.columns:
-                table_data = policy_df[policy_df['related_kpi'].str.contains(target_kpi, na=False)].copy()
+            # 공유 정책 DB는 읽기 전용이므로, 표시할 행에만 세션 변경분을 적용한 사본을 만듭니다.
+            if 'related_kpi' in policy_db.columns:
+                base_table = policy_db[policy_db['related_kpi'].str.contains(target_kpi, na=False)]
             else:
-                table_data = policy_df.copy()
+                base_table = policy_db
             
             st.write(f"가. '{target_kpi}' 개선을 위해 다음 정책들을 수행해야 합니다.")
             
-            if not table_data.empty:
+            if not base_table.empty:
                 if 'loaded_active_names' in st.session_state and st.session_state.loaded_active_names:
-                    table_data['active'] = table_data['name'].isin(st.session_state.loaded_active_names)
+                    policy_overlay.set_active_by_names(base_table, st.session_state.loaded_active_names)
                     del st.session_state.loaded_active_names
-                elif 'active' not in table_data.columns:
-                    table_data['active'] = False
+                table_data = policy_overlay.apply(base_table)
                 start_dates = [(target_date - relativedelta(months=int(row['duration_months']))).strftime('%Y년 %m월') for _, row in table_data.iterrows()]
                 table_data['start_date_calc'] = start_dates
                 table_data['duration_months_display'] = table_data['duration_months'].astype(str) + " 개월"
 
-        st.session_state.edited_policies_df = st.data_editor(table_data, column_config={"active": st.column_config.CheckboxColumn("활성화", default=False), "category": "분야", "name": "추진 과제명", "cost": "추진 사업비", "process": "추진 절차", "duration_months_display": st.column_config.TextColumn("추진 기간", disabled=True), "start_date_calc": st.column_config.TextColumn("추진 시작 시기", disabled=True)}, hide_index=True, use_container_width=True, column_order=['active', 'category', 'name', 'cost', 'process', 'duration_months_display', 'start_date_calc'])
+        with span("user_view.policy_editor", rows=len(table_data)):
+            st.session_state.edited_policies_df = st.data_editor(table_data, column_config={"active": st.column_config.CheckboxColumn("활성화", default=False), "category": "분야", "name": "추진 과제명", "cost": "추진 사업비", "process": "추진 절차", "duration_months_display": st.column_config.TextColumn("추진 기간", disabled=True), "start_date_calc": st.column_config.TextColumn("추진 시작 시기", disabled=True)}, hide_index=True, use_container_width=True, column_order=['active', 'category', 'name', 'cost', 'process', 'duration_months_display', 'start_date_calc'])
         
+        if not table_data.empty:
+            policy_overlay.record_editor_result(policy_db, st.session_state.edited_policies_df)
+
         if 'active' in st.session_state.edited_policies_df.columns:
             active_policies = st.session_state.edited_policies_df[st.session_state.edited_policies_df['active']]
 
@@ -835,7 +836,7 @@ def draw_user_view():
         
         timeline_df = pd.DataFrame()
         if not active_policies.empty:
-            source_for_chart = st.session_state.policy_db.loc[active_policies.index]
+            source_for_chart = policy_overlay.apply(policy_db.loc[active_policies.index])
             timeline_df = m4.create_timeline_data(source_for_chart, target_year, target_month)
         
         project_end_date = timeline_df['End'].max() if not timeline_df.empty else datetime(target_year, target_month, 1)
@@ -871,7 +872,8 @@ def draw_user_view():
         else:
             final_chart = final_chart.properties(width=650, height=100)
 
-        st.altair_chart(final_chart, use_container_width=True)
+        with span("user_view.timeline_chart", projects=len(timeline_df)):
+            st.altair_chart(final_chart, use_container_width=True)
         st.caption("🔴 빨간 점선: 현재 시점 ┃ 🔵 파란 점선: 목표 시점")
         
         if inputs_are_valid and part2_inputs_are_valid and is_fail:
@@ -942,7 +944,7 @@ def draw_user_view():
         
     st.divider()
     _, right_container = st.columns([1, 1])
-    with right_container:
+    with right_container, span("user_view.scenario_io"):
         st.write("시나리오 저장 및 불러오기")
         save_col, manage_col = st.columns(2)
         with save_col:
@@ -1052,7 +1054,7 @@ def draw_user_view():
                         'future_selected_modes': st.session_state.get('future_selected_modes', []),
                     }
                     
-                    with st.spinner('PDF 보고서를 생성하는 중입니다...'):
+                    with st.spinner('PDF 보고서를 생성하는 중입니다...'), inflight("pdf_export"), span("user_view.pdf_report", kpi=target_kpi, policies=len(active_policies)):
                         pdf_bytes = m5.generate_report(report_data)
                     
                     kpi_safe = sanitize_filename(st.session_state.get('target_kpi', '선택안함'))
@@ -1071,4 +1073,9 @@ def draw_user_view():
 
         with manage_col:
             st.write("시나리오 불러오기")
-            st.file_uploader("업로드 즉시 적용됩니다", type=['csv'], accept_multiple_files=True, key="scenario_multi_uploader", on_change=process_uploaded_scenario, label_visibility="collapsed")
\ No newline at end of file
+            st.file_uploader("업로드 즉시 적용됩니다", type=['csv'], accept_multiple_files=True, key="scenario_multi_uploader", on_change=process_uploaded_scenario, label_visibility="collapsed")
+
+    with span("user_view.scenario_library"):
+        draw_scenario_library(get_current_scenario_values(), os.path.splitext(file_name)[0])
+    with span("user_view.scenario_comparison"):
+        draw_scenario_comparison()
@@ -3,9 +3,11 @@
 
 import streamlit as st
 from m1 import DataManager, resource_path
-from m6 import SurveyAnalyzer
-import pandas as pd
+from m6 import MODEL_LABELS, SurveyAnalyzer
+from storage import to_editable
+from ingest import read_table
 from m3_1 import SELECT_PLACEHOLDER
+from m3_6 import draw_performance_dashboard
 
 def draw_admin_view():
     """관리자 페이지를 그립니다."""
@@ -52,8 +54,10 @@ def draw_admin_dashboard():
                 restore_function()
                 if 'policy_df_editor' in st.session_state and ('추진 과제' in target_name or '전체' in target_name):
                     del st.session_state.policy_df_editor
+                    st.session_state.policy_editor_version = st.session_state.get('policy_editor_version', 0) + 1
                 if 'coeffs_df_editor' in st.session_state and ('만족도 계수' in target_name or '전체' in target_name):
                     del st.session_state.coeffs_df_editor
+                    st.session_state.coeffs_editor_version = st.session_state.get('coeffs_editor_version', 0) + 1
                 st.rerun()
         with col2:
             if st.button("아니오, 취소합니다", use_container_width=True):
@@ -75,18 +79,20 @@ def draw_admin_dashboard():
         st.write("· [선택] respond_ID : 응답자 ID")
         st.write("· [필수] KPI : 성과지표, 응답자가 만족도 점수 분류를 위해, 설문조사지에서 제시한 성과지표")
         st.write("· [필수] Satisfaction : 만족도, 응답자가 응답한 만족도로 **10점 만점** 기준")
+        st.write("· [환승시설 편의성] KPI 대신 수단별 환승 거리(m) 열 : 대중교통, 도보, 승용차, 택시/배웅, PM (이용하지 않은 수단은 빈 칸)")
+        st.write("· [물리적 접근성 가중치] KPI 대신 접근 수단별 이용 가능 여부 열 : 도보, 마을/시내버스, 광역버스, 지하철/광역철도, 승용차, 자전거, 택시, 공유PM (1/0 또는 O/X)")
         st.write("\n엑셀에서 저장할 때는 CSV UTF-8(쉼표로 분리)(*.csv) 양식으로 저장해주세요.")
         with open(resource_path("data/docs/설문결과 분석 양식.csv"), "rb") as fp:
             st.download_button("양식 파일 다운로드", fp, "설문결과 분석 양식.csv", "text/csv", use_container_width=True)
 
     st.info("이곳에서 시스템의 주요 데이터를 관리할 수 있습니다. 데이터를 수정한 후에는 반드시 '저장' 버튼을 눌러주세요.")
 
-    tab2, tab3, tab4 = st.tabs(["추진 과제 관리", "설문조사 결과 입력 및 만족도 계수 산출", "만족도 계수 관리"])
+    tab2, tab3, tab4, tab5 = st.tabs(["추진 과제 관리", "설문조사 결과 입력 및 만족도 계수 산출", "만족도 계수 관리", "성능 모니터링"])
 
     with tab2:
         st.header("추진 과제 관리 (policy_db.csv)")
         if 'policy_df_editor' not in st.session_state:
-            st.session_state.policy_df_editor = m1_instance.load_policy_data()
+            st.session_state.policy_df_editor = to_editable(m1_instance.load_policy_data())
         
         policy_column_config = {
             "category": st.column_config.TextColumn("분야"),
@@ -96,17 +102,25 @@ def draw_admin_dashboard():
             "duration_months": st.column_config.NumberColumn("추진 기간 (개월)"),
             "related_kpi": st.column_config.TextColumn("관련 성과지표")
         }
-        edited_policy_df = st.data_editor(
+        # 저장 후에는 새 스냅샷으로 편집기를 다시 만들도록 버전을 키에 포함합니다.
+        policy_editor_key = f"policy_data_editor_{st.session_state.get('policy_editor_version', 0)}"
+        st.data_editor(
             st.session_state.policy_df_editor, 
             num_rows="dynamic", 
             use_container_width=True,
-            column_config=policy_column_config
+            column_config=policy_column_config,
+            key=policy_editor_key
         )
         
         if st.button("💾 추진 과제 변경사항 저장", key="save_policy", use_container_width=True): 
-            m1_instance.save_policy_data(edited_policy_df)
-            st.session_state.policy_df_editor = edited_policy_df
-            st.toast("✅ 추진 과제 데이터가 성공적으로 저장되었습니다.")
+            try:
+                m1_instance.save_policy_changes(st.session_state.policy_df_editor, st.session_state.get(policy_editor_key))
+                st.session_state.policy_df_editor = to_editable(m1_instance.load_policy_data())
+                st.session_state.policy_editor_version = st.session_state.get('policy_editor_version', 0) + 1
+                st.toast("✅ 추진 과제 데이터가 성공적으로 저장되었습니다.")
+                st.rerun()
+            except ValueError as e:
+                st.error(f"🚨 {e}")
         
         st.divider()
         _, restore_policy_col, restore_all_col_1 = st.columns([0.7, 0.15, 0.15])
@@ -133,7 +147,7 @@ def draw_admin_dashboard():
 
         rail_type_col, kpi_col, model_col = st.columns(3)
         with rail_type_col:
-            selected_rail_type = st.selectbox("철도 유형 선택", [SELECT_PLACEHOLDER] + list(m1_instance.load_coefficients()[0]['coefficients'].keys()), key="selected_survey_rail_type")
+            selected_rail_type = st.selectbox("철도 유형 선택", [SELECT_PLACEHOLDER] + list(m1_instance.load_coefficients_cached()[0]['coefficients'].keys()), key="selected_survey_rail_type")
         with kpi_col:
             selected_kpi_name_kor = st.selectbox(
                 "성과지표 선택",
@@ -145,7 +159,8 @@ def draw_admin_dashboard():
             model_options = {
                 'A': 'A: 한계효용체감',
                 'B': 'B: S자형 로지스틱',
-                'C': 'C: 역 지수 함수'
+                'C': 'C: 역 지수 함수',
+                'auto': '자동 선택 (A/B 비교)'
             }
             st.selectbox(
                 "만족도 모델 선택",
@@ -158,11 +173,17 @@ def draw_admin_dashboard():
 
         if uploaded_file:
             try:
-                survey_df = pd.read_csv(uploaded_file, encoding='utf-8')
+                survey_df = read_table(uploaded_file)
                 st.subheader("업로드된 설문조사 데이터 미리보기")
                 st.dataframe(survey_df)
 
-                required_cols = ['KPI', 'Satisfaction']
+                # 환승시설 편의성(TCI)은 KPI 열 대신 수단별 거리 열(또는 Mode, Distance 열)을 사용합니다.
+                # 물리적 접근성(PAI)은 KPI 열 대신 접근 수단 열이 있으면 수단 가중치와 alpha를 추정합니다.
+                uses_mode_columns = selected_kpi_name_kor == "환승시설 편의성" or (
+                    selected_kpi_name_kor == "물리적 접근성" and 'KPI' not in survey_df.columns
+                    and any(mode in survey_df.columns for mode in m1_instance.PAI_ALL_MODES)
+                )
+                required_cols = ['Satisfaction'] if uses_mode_columns else ['KPI', 'Satisfaction']
                 if not all(col in survey_df.columns for col in required_cols):
                     st.error(f"업로드된 파일에 필수 컬럼이 누락되었습니다. 필요 컬럼: {', '.join(required_cols)}")
                     st.stop()
@@ -185,6 +206,34 @@ def draw_admin_dashboard():
                                 st.rerun()
                             else:
                                 st.warning("계수를 산출하지 못했습니다. 데이터와 선택값을 확인해주세요.")
+
+                # 수단별 열로 추정하는 TCI 계수와 PAI 가중치는 단일 KPI 열이 없으므로 교차 검증 대상이 아닙니다.
+                if not uses_mode_columns:
+                    with st.expander("교차 검증 (표본 외 예측 오차와 계수 안정성)"):
+                        st.caption("데이터를 k개로 나눠 한 부분을 빼고 피팅한 계수로 뺀 부분을 예측합니다. 그룹 열을 고르면 같은 응답자의 응답이 학습/검증에 나뉘지 않습니다.")
+                        k_col, group_col = st.columns(2)
+                        cv_k = k_col.number_input("폴드 수 (k)", min_value=2, max_value=20, value=5, step=1, key="cv_k")
+                        group_options = [None] + [col for col in survey_df.columns if col not in required_cols]
+                        cv_group = group_col.selectbox("그룹 열 (선택)", group_options, format_func=lambda col: "사용 안 함" if col is None else col, key="cv_group")
+                        if st.button("교차 검증 실행", key="cross_validate_btn"):
+                            if selected_rail_type == SELECT_PLACEHOLDER or selected_kpi_name_kor == SELECT_PLACEHOLDER:
+                                st.error("철도 유형과 성과지표를 모두 선택해야 합니다.")
+                            else:
+                                with st.spinner("교차 검증 중..."):
+                                    try:
+                                        st.session_state.cv_result = analyzer.cross_validate(
+                                            selected_rail_type, selected_kpi_name_kor, calc_df,
+                                            model_type=st.session_state.selected_model_type, k=int(cv_k), group_column=cv_group
+                                        )
+                                    except ValueError as e:
+                                        st.error(str(e))
+                        if st.session_state.get('cv_result'):
+                            cv_summary, cv_reports = st.session_state.cv_result
+                            st.dataframe(cv_summary, hide_index=True, use_container_width=True)
+                            st.caption("계수 변동계수(폴드 간 표준편차/평균)가 작을수록 계수가 데이터 구성에 덜 민감합니다.")
+                            for report in cv_reports:
+                                st.write(f"**{MODEL_LABELS.get(report['candidate'], report['candidate'])}: 폴드별 결과**")
+                                st.dataframe(report['folds'], hide_index=True, use_container_width=True)
             except Exception as e:
                 st.error(f"파일 처리 중 오류 발생: {e}")
         
@@ -199,25 +248,20 @@ def draw_admin_dashboard():
                 col1.metric("SSE", f"{stats['SSE']:.4f}")
                 col2.metric("SST", f"{stats['SST']:.4f}")
                 col3.metric("R-squared", f"{stats['R-squared']:.4f}")
+                if 'Iterations' in stats:
+                    st.caption(f"피팅 반복 {stats['Iterations']}회 (함수 계산 {stats['Function evaluations']}회)에서 수렴했습니다.")
+
+                if stats.get('comparison') is not None:
+                    st.subheader("모델 비교 (BIC 낮은 순)")
+                    st.caption("AIC/BIC는 낮을수록 좋으며, ΔBIC가 2 미만이면 두 모델의 차이가 크지 않습니다. Durbin-Watson이 2보다 크게 낮으면 곡선 모양이 데이터와 맞지 않는다는 신호입니다.")
+                    st.dataframe(stats['comparison'], hide_index=True, use_container_width=True)
             
             st.warning("경고: 기존 만족도 계수는 새로 산출된 계수로 덮어쓰여집니다.")
             
             if st.button("산출된 계수 저장", key="save_calculated_coeffs_btn", use_container_width=True):
                 try:
-                    existing_coeffs_df = m1_instance.load_coefficients_df()
-                    new_coeffs_to_update = st.session_state.calculated_coeffs_df
-                    
-                    # rail_type과 kpi를 모두 고려하여 기존 계수를 올바르게 제거
-                    # 예: '고속철도'의 'TC' 계수를 업데이트할 때 '일반철도'의 'TC' 계수는 유지됩니다.
-                    rows_to_drop = (existing_coeffs_df['rail_type'].isin(new_coeffs_to_update['rail_type'])) & \
-                                   (existing_coeffs_df['kpi'].isin(new_coeffs_to_update['kpi']))
-                    
-                    updated_coeffs_df = existing_coeffs_df[~rows_to_drop].copy()
-                    
-                    # drop(columns=['model_type'], errors='ignore') 추가: 해당 컬럼이 없을 때 오류 방지
-                    updated_coeffs_df = pd.concat([updated_coeffs_df, new_coeffs_to_update.drop(columns=['model_type'], errors='ignore')], ignore_index=True)
-                    
-                    m1_instance.save_coefficients(updated_coeffs_df)
+                    # 산출된 모델 유형(model_type)까지 함께 저장해야 Model B/C 계수가 올바르게 적용됩니다.
+                    m1_instance.replace_coefficient_rows(st.session_state.calculated_coeffs_df)
                     st.success("새롭게 산출된 계수가 성공적으로 저장되었습니다.")
                     del st.session_state.calculated_coeffs_df
                     if 'calculated_stats' in st.session_state:
@@ -234,6 +278,7 @@ def draw_admin_dashboard():
             if st.button("🔄 데이터 새로고침", key="refresh_coeffs", use_container_width=True):
                 if 'coeffs_df_editor' in st.session_state:
                     del st.session_state.coeffs_df_editor
+                    st.session_state.coeffs_editor_version = st.session_state.get('coeffs_editor_version', 0) + 1
                     st.toast("✅ 계수 데이터를 파일에서 새로고침했습니다.")
                 else:
                     st.toast("ℹ️ 아직 불러온 데이터가 없습니다.")
@@ -241,7 +286,7 @@ def draw_admin_dashboard():
 
 
         if 'coeffs_df_editor' not in st.session_state:
-            df = m1_instance.load_coefficients_df()
+            df = to_editable(m1_instance.load_coefficients_df())
             df['성과지표'] = df['kpi'].map(m1_instance.ABBREVIATIONS_TO_FULL_NAMES)
             st.session_state.coeffs_df_editor = df
         
@@ -255,22 +300,31 @@ def draw_admin_dashboard():
             "param2_value": st.column_config.NumberColumn("계수 2 값"),
         }
 
-        edited_coeffs_df = st.data_editor(
+        coeffs_editor_key = f"coeffs_data_editor_{st.session_state.get('coeffs_editor_version', 0)}"
+        st.data_editor(
             st.session_state.coeffs_df_editor, 
             num_rows="dynamic", 
             use_container_width=True,
             column_config=coeffs_column_config,
-            column_order=["rail_type", "성과지표", "param1_name", "param1_value", "param2_name", "param2_value"]
+            column_order=["rail_type", "성과지표", "param1_name", "param1_value", "param2_name", "param2_value"],
+            key=coeffs_editor_key
         )
 
+        def to_saved_columns(cells):
+            """화면의 '성과지표' 값을 저장용 'kpi' 약어로 바꿉니다."""
+            if '성과지표' in cells:
+                cells['kpi'] = m1_instance.KPI_ABBREVIATIONS.get(cells.pop('성과지표'))
+            return cells
+
         if st.button("💾 만족도 계수 변경사항 저장", key="save_coeffs", use_container_width=True):
-            df_to_save = edited_coeffs_df.copy()
-            df_to_save['kpi'] = df_to_save['성과지표'].map(m1_instance.KPI_ABBREVIATIONS)
-            df_to_save = df_to_save.drop(columns=['성과지표'])
-            df_to_save = df_to_save[['rail_type', 'kpi', 'param1_name', 'param1_value', 'param2_name', 'param2_value']]
-            m1_instance.save_coefficients(df_to_save)
-            st.session_state.coeffs_df_editor = edited_coeffs_df
-            st.toast("✅ 만족도 계수 데이터가 성공적으로 저장되었습니다.")
+            try:
+                m1_instance.save_coefficient_changes(st.session_state.coeffs_df_editor, st.session_state.get(coeffs_editor_key), to_saved_columns)
+                del st.session_state.coeffs_df_editor
+                st.session_state.coeffs_editor_version = st.session_state.get('coeffs_editor_version', 0) + 1
+                st.toast("✅ 만족도 계수 데이터가 성공적으로 저장되었습니다.")
+                st.rerun()
+            except ValueError as e:
+                st.error(f"🚨 {e}")
         
         st.divider()
         _, restore_coeffs_col, restore_all_col_2 = st.columns([0.7, 0.15, 0.15])
@@ -280,3 +334,6 @@ def draw_admin_dashboard():
         with restore_all_col_2:
             if st.button("전체 초기 복원", key="restore_all_tab4", use_container_width=True, type="primary", help="추진과제, 만족도 계수 등 수정된 모든 데이터를 초기화합니다."):
                 confirm_restore_dialog(m1_instance.restore_all_data, "전체")
+
+    with tab5:
+        draw_performance_dashboard()
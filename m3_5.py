@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# M3-5: Scenario Library View (시나리오 라이브러리)
+
+import time
+import altair as alt
+import streamlit as st
+from m1 import DataManager
+from policy_store import get_shared_policy_db
+from scenario_compare import compare_scenarios
+from scenario_store import ScenarioStore, parse_scenario_csv
+from m3_1 import load_scenario_into_session, SELECT_PLACEHOLDER
+
+LIBRARY_PAGE_SIZE = 20
+MAX_COMPARE_SCENARIOS = 1000
+COMPARE_CHART_ROWS = 30
+
+
+@st.cache_resource(show_spinner=False)
+def get_scenario_store():
+    """프로세스당 하나의 시나리오 라이브러리를 공유합니다."""
+    return ScenarioStore()
+
+
+def _reset_library_page():
+    st.session_state.library_page = 0
+
+
+def _move_library_page(step):
+    st.session_state.library_page = max(0, st.session_state.get('library_page', 0) + step)
+
+
+def _load_from_library(scenario_id):
+    name, values = get_scenario_store().load(scenario_id)
+    if values is None:
+        st.toast("⚠️ 선택한 시나리오를 찾을 수 없습니다.")
+        return
+    load_scenario_into_session(values, name)
+    st.toast(f"✅ 라이브러리에서 '{name}' 시나리오를 불러왔습니다.")
+
+
+def draw_scenario_library(current_values, default_name):
+    """저장된 시나리오를 검색하고 불러오는 라이브러리 화면을 그립니다."""
+    store = get_scenario_store()
+
+    with st.expander("📚 시나리오 라이브러리", expanded=False):
+        save_name_col, save_button_col = st.columns([0.75, 0.25])
+        with save_name_col:
+            scenario_name = st.text_input("저장할 시나리오 이름", placeholder=default_name, key='library_save_name')
+        with save_button_col:
+            st.markdown("<div style='height: 28px;'></div>", unsafe_allow_html=True)
+            if st.button("💾 라이브러리에 저장", use_container_width=True, key='library_save_button'):
+                store.save(current_values, scenario_name or default_name)
+                st.toast("✅ 현재 시나리오를 라이브러리에 저장했습니다.")
+
+        st.write("시나리오 검색")
+        line_col, type_col, kpi_col, year_from_col, year_to_col = st.columns([2, 1, 1.5, 1, 1])
+        with line_col:
+            line_name = st.text_input("노선명", key='library_line_name', on_change=_reset_library_page)
+        with type_col:
+            rail_type = st.selectbox("철도 유형", [SELECT_PLACEHOLDER, "고속철도", "일반철도", "광역철도"], key='library_rail_type', on_change=_reset_library_page)
+        with kpi_col:
+            kpi_options = [SELECT_PLACEHOLDER] + store.distinct_values('target_kpi')
+            target_kpi = st.selectbox("성과지표", kpi_options, key='library_target_kpi', on_change=_reset_library_page)
+        with year_from_col:
+            year_from = st.number_input("목표연도(부터)", step=1, value=None, key='library_year_from', on_change=_reset_library_page)
+        with year_to_col:
+            year_to = st.number_input("목표연도(까지)", step=1, value=None, key='library_year_to', on_change=_reset_library_page)
+
+        page = st.session_state.get('library_page', 0)
+        started = time.perf_counter()
+        results_df, total = store.search(
+            line_name=line_name or None,
+            rail_type=rail_type if rail_type != SELECT_PLACEHOLDER else None,
+            target_kpi=target_kpi if target_kpi != SELECT_PLACEHOLDER else None,
+            year_from=year_from, year_to=year_to,
+            page=page, page_size=LIBRARY_PAGE_SIZE
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        last_page = max(0, (total - 1) // LIBRARY_PAGE_SIZE)
+
+        st.caption(f"검색 결과 {total:,}건 · {page + 1}/{last_page + 1} 페이지 · 검색 시간 {elapsed_ms:.1f} ms")
+        display_df = results_df.rename(columns={
+            'id': 'ID', 'name': '시나리오', 'line_name': '노선명', 'rail_type': '철도 유형',
+            'target_kpi': '성과지표', 'target_year': '목표 연도', 'target_month': '목표 월',
+            'predict_score': '예상 만족도', 'future_goal_score': '목표 만족도', 'created_at': '저장 시각'
+        })
+        st.dataframe(display_df, hide_index=True, use_container_width=True)
+
+        prev_col, select_col, load_col, next_col = st.columns([0.15, 0.45, 0.25, 0.15])
+        with prev_col:
+            st.button("◀ 이전", on_click=_move_library_page, args=(-1,), disabled=page <= 0, use_container_width=True, key='library_prev')
+        with select_col:
+            names = {int(i): name for i, name in zip(results_df['id'], results_df['name'])}
+            # 검색 조건이나 페이지가 바뀌어 이전 선택이 목록에 없으면 첫 항목을 선택합니다.
+            if st.session_state.get('library_selected_id') not in names:
+                st.session_state.library_selected_id = next(iter(names), None)
+            selected_id = st.selectbox(
+                "불러올 시나리오", options=list(names.keys()),
+                format_func=lambda i: f"[{i}] {names.get(i, '')}",
+                key='library_selected_id', label_visibility='collapsed'
+            )
+        with load_col:
+            st.button("📂 불러오기", on_click=_load_from_library, args=(selected_id,), disabled=selected_id is None, use_container_width=True, key='library_load')
+        with next_col:
+            st.button("다음 ▶", on_click=_move_library_page, args=(1,), disabled=page >= last_page, use_container_width=True, key='library_next')
+
+
+def _library_filters():
+    """라이브러리 검색 위젯의 현재 조건을 ScenarioStore.search 인자로 변환합니다."""
+    rail_type = st.session_state.get('library_rail_type', SELECT_PLACEHOLDER)
+    target_kpi = st.session_state.get('library_target_kpi', SELECT_PLACEHOLDER)
+    return {
+        'line_name': st.session_state.get('library_line_name') or None,
+        'rail_type': rail_type if rail_type != SELECT_PLACEHOLDER else None,
+        'target_kpi': target_kpi if target_kpi != SELECT_PLACEHOLDER else None,
+        'year_from': st.session_state.get('library_year_from'),
+        'year_to': st.session_state.get('library_year_to'),
+    }
+
+
+def draw_scenario_comparison():
+    """여러 시나리오의 예측/목표 만족도 차이를 한 번에 비교하는 화면을 그립니다."""
+    with st.expander("📊 시나리오 비교", expanded=False):
+        source = st.radio("비교 대상", ["라이브러리 검색 결과", "파일 업로드"], horizontal=True, key='compare_source')
+
+        uploaded_files = []
+        if source == "라이브러리 검색 결과":
+            st.caption(f"시나리오 라이브러리의 현재 검색 조건에 맞는 시나리오를 최대 {MAX_COMPARE_SCENARIOS:,}건까지 비교합니다.")
+        else:
+            uploaded_files = st.file_uploader("비교할 시나리오 파일 (여러 개 선택 가능)", type=['csv'], accept_multiple_files=True, key='compare_uploader')
+
+        if st.button("📊 비교 실행", use_container_width=True, key='compare_run'):
+            scenarios = []
+            if source == "라이브러리 검색 결과":
+                store = get_scenario_store()
+                found_df, _ = store.search(**_library_filters(), page_size=MAX_COMPARE_SCENARIOS)
+                scenarios = [(name, values) for _, name, values in store.load_many(found_df['id'])]
+            else:
+                for uploaded_file in uploaded_files or []:
+                    try:
+                        scenarios.append((uploaded_file.name, parse_scenario_csv(uploaded_file.getvalue())))
+                    except Exception as e:
+                        st.warning(f"'{uploaded_file.name}' 파일을 읽지 못했습니다: {e}")
+
+            started = time.perf_counter()
+            config, _, _ = DataManager().load_coefficients_cached()
+            st.session_state.comparison_df = compare_scenarios(scenarios, config, get_shared_policy_db())
+            st.session_state.comparison_elapsed_ms = (time.perf_counter() - started) * 1000
+
+        comparison_df = st.session_state.get('comparison_df')
+        if comparison_df is None:
+            return
+        if comparison_df.empty:
+            st.info("비교할 시나리오가 없습니다.")
+            return
+
+        fail_count = int(comparison_df['is_fail'].sum())
+        st.caption(f"{len(comparison_df):,}건 비교 · 목표 미달 {fail_count:,}건 · 계산 시간 {st.session_state.get('comparison_elapsed_ms', 0):.1f} ms")
+
+        display_df = comparison_df.rename(columns={
+            'rank': '순위', 'name': '시나리오', 'line_name': '노선명', 'rail_type': '철도 유형', 'target_kpi': '성과지표',
+            'target_year': '목표 연도', 'target_month': '목표 월', 'current_val': '현재 지표', 'current_score': '현재 만족도',
+            'predict_val': '예측 지표', 'predict_score': '예측 만족도', 'goal_val': '목표 지표', 'goal_score': '목표 만족도',
+            'score_gap': '만족도 부족분', 'value_gap': '지표 차이', 'is_fail': '목표 미달', 'feasible_policies': '추진 가능 과제 수'
+        })
+        st.dataframe(display_df, hide_index=True, use_container_width=True)
+
+        chart_df = comparison_df.dropna(subset=['score_gap']).head(COMPARE_CHART_ROWS).copy()
+        chart_df['label'] = chart_df['rank'].astype(str) + ". " + chart_df['name'].astype(str)
+        chart_df['결과'] = chart_df['is_fail'].map({True: '목표 미달', False: '목표 달성'})
+        delta_chart = alt.Chart(chart_df).mark_bar().encode(
+            x=alt.X('score_gap', title='목표 대비 만족도 부족분 (목표 - 예측, 점)'),
+            y=alt.Y('label', title='시나리오', sort=None, axis=alt.Axis(labelLimit=0)),
+            color=alt.Color('결과', scale=alt.Scale(domain=['목표 미달', '목표 달성'], range=['#c5221f', '#137333'])),
+            tooltip=['name', 'target_kpi', 'rail_type', 'predict_score', 'goal_score', 'score_gap', 'feasible_policies']
+        ).properties(title=f"시나리오별 만족도 차이 (상위 {len(chart_df)}건)", height=alt.Step(20))
+        st.altair_chart(delta_chart, use_container_width=True)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# M3-6: Performance Dashboard (관리자 성능 모니터링 탭)
+
+from datetime import datetime
+import pandas as pd
+import streamlit as st
+import perf
+import warmup
+from disk_cache import default_cache
+from policy_store import session_memory_report
+
+SECTION_PREFIXES = {
+    'rerun.': "화면 전체 (rerun)",
+    'user_view.': "사용자 화면 구간",
+}
+CACHE_LABELS = {
+    'data': "추진 과제 데이터", 'coefficients': "만족도 계수", 'charts': "차트", 'pdf': "PDF 보고서",
+    'disk_policy': "추진 과제 데이터 (디스크)", 'disk_coefficients': "만족도 계수 (디스크)",
+    'pai_combinations': "접근 수단 조합 표",
+}
+
+
+def _format_bytes(num_bytes):
+    if num_bytes is None:
+        return "-"
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if num_bytes < 1024 or unit == 'GB':
+            return f"{num_bytes:,.0f} {unit}" if unit == 'B' else f"{num_bytes:,.1f} {unit}"
+        num_bytes /= 1024
+
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%H:%M:%S') if timestamp else "-"
+
+
+def _latency_table(summary, prefix):
+    rows = []
+    for name, stats in summary.items():
+        if not name.startswith(prefix):
+            continue
+        rows.append({
+            "구간": name[len(prefix):],
+            "건수": stats['count'],
+            "평균 (ms)": round(stats['mean_ms'], 1),
+            "p50 (ms)": round(stats['p50_ms'], 1),
+            "p95 (ms)": round(stats['p95_ms'], 1),
+            "최대 (ms)": round(stats['max_ms'], 1),
+        })
+    return pd.DataFrame(rows).sort_values("p95 (ms)", ascending=False) if rows else pd.DataFrame()
+
+
+def _call_table(summary):
+    """화면 구간이 아닌 계산/입출력 호출 (m1, m2, m4, m5, m6 등)"""
+    return _latency_table({name: s for name, s in summary.items() if not name.startswith(tuple(SECTION_PREFIXES))}, '')
+
+
+def _cache_table():
+    rows = []
+    for cache, stats in perf.cache_stats().items():
+        rows.append({
+            "캐시": CACHE_LABELS.get(cache, cache),
+            "조회": stats['lookups'],
+            "적중 실패": stats['misses'],
+            "적중률": f"{stats['hit_rate']:.1%}" if stats['hit_rate'] is not None else "-",
+        })
+    return pd.DataFrame(rows)
+
+
+def _session_table(sessions, current_session_id):
+    rows = []
+    last_seen = dict(perf.sessions())
+    for session_id, run_count, session_state in sessions:
+        overlay = session_state.filtered_state.get('policy_overlay')
+        rows.append({
+            "세션": session_id[:8] + (" (현재)" if session_id == current_session_id else ""),
+            "실행 횟수": run_count,
+            "마지막 측정": _format_time(last_seen.get(session_id)),
+            "세션 상태 크기": _format_bytes(perf.session_state_bytes(session_state)),
+            "정책 변경분": _format_bytes(overlay.memory_usage() if overlay is not None else 0),
+        })
+    return pd.DataFrame(rows)
+
+
+def _slow_table():
+    rows = []
+    for record in perf.slow_operations():
+        attrs = dict(record['attrs'])
+        inputs = attrs.pop('inputs', '')
+        details = ', '.join(f"{key}={value}" for key, value in attrs.items())
+        rows.append({
+            "시각": _format_time(record['ts']),
+            "작업": record['name'],
+            "소요시간 (ms)": round(record['duration_ms'], 1),
+            "입력": ', '.join(text for text in (inputs, details) if text),
+            "세션": record['session'][:8],
+        })
+    return pd.DataFrame(rows)
+
+
+def draw_performance_dashboard():
+    """관리자 페이지의 성능 모니터링 탭을 그립니다."""
+    st.header("성능 모니터링")
+    st.write("이 서버 프로세스에서 측정된 화면 구간별 소요시간, 캐시 적중률, 세션별 메모리를 확인합니다.")
+
+    control_col, reset_col, export_col = st.columns([0.5, 0.25, 0.25])
+    with control_col:
+        enabled = st.toggle(
+            "소요시간 측정", value=perf.is_enabled(),
+            help=f"서버 시작 시 기본값은 환경 변수 {perf.ENABLE_ENV}로 정합니다. 여기서 바꾸면 서버의 모든 세션에 적용됩니다."
+        )
+        # 키 없이 현재 설정을 기본값으로 쓰므로, 다른 관리자가 바꾼 설정을 되돌리지 않습니다.
+        if enabled != perf.is_enabled():
+            perf.set_enabled(enabled)
+    with reset_col:
+        if st.button("측정 기록 초기화", key="perf_reset", use_container_width=True):
+            perf.reset()
+            st.toast("✅ 측정 기록을 초기화했습니다.")
+    with export_col:
+        st.download_button(
+            "추적 기록 다운로드 (JSONL)", perf.to_jsonl(), f"perf_trace_{datetime.now():%Y%m%d_%H%M%S}.jsonl",
+            "application/jsonl", key="perf_export", use_container_width=True
+        )
+
+    if not perf.is_enabled():
+        st.info("소요시간 측정이 꺼져 있습니다. 측정을 켜면 이후의 화면 실행부터 집계됩니다. (캐시, 세션, 메모리 정보는 항상 표시됩니다)")
+
+    sessions = perf.active_sessions()
+    memory_report = session_memory_report()
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("활성 세션", len(sessions) if sessions else len(perf.sessions()))
+    metric_cols[1].metric("프로세스 메모리", _format_bytes(perf.process_memory_bytes()))
+    metric_cols[2].metric("공유 추진 과제 DB", _format_bytes(memory_report['shared_bytes']))
+    metric_cols[3].metric("PDF 내보내기 대기/진행", perf.gauges().get('pdf_export', 0))
+
+    summary = perf.process_summary()
+    st.subheader("화면 실행 소요시간")
+    for prefix, label in SECTION_PREFIXES.items():
+        table = _latency_table(summary, prefix)
+        st.write(f"**{label}**")
+        if table.empty:
+            st.caption("측정된 기록이 없습니다.")
+        else:
+            st.dataframe(table, hide_index=True, use_container_width=True)
+    call_table = _call_table(summary)
+    if not call_table.empty:
+        st.write("**계산 및 입출력 호출**")
+        st.dataframe(call_table, hide_index=True, use_container_width=True)
+
+    cache_col, session_col = st.columns(2)
+    with cache_col:
+        st.subheader("캐시 적중률")
+        st.dataframe(_cache_table(), hide_index=True, use_container_width=True)
+        cache = default_cache()
+        if cache.enabled:
+            disk_stats = cache.stats()
+            entries = sum(entry['entries'] for entry in disk_stats.values())
+            used = sum(entry['bytes'] for entry in disk_stats.values())
+            st.caption(f"디스크 캐시 (모든 워커 공유): {entries:,}개 항목, {_format_bytes(used)} / {_format_bytes(cache.max_bytes)}")
+        else:
+            st.caption("디스크 캐시가 꺼져 있습니다. (RAILWAY_DISK_CACHE=0)")
+    with session_col:
+        st.subheader("세션별 메모리")
+        if sessions:
+            st.dataframe(_session_table(sessions, perf.current_session_id()), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Streamlit 서버의 세션 정보를 확인할 수 없습니다.")
+
+    warmup_results = warmup.results()
+    if warmup_results:
+        st.subheader("서버 예열")
+        st.dataframe(pd.DataFrame([
+            {"단계": name, "결과": "성공" if r['ok'] else "실패", "소요시간 (초)": round(r['seconds'], 2), "오류": r['error'] or ""}
+            for name, r in warmup_results.items()
+        ]), hide_index=True, use_container_width=True)
+
+    st.subheader(f"느린 작업 ({perf.slow_threshold_ms():,.0f}ms 이상, 최근 {perf.SLOW_SPANS}건)")
+    slow_df = _slow_table()
+    if slow_df.empty:
+        st.caption("기준 시간을 넘은 작업이 없습니다.")
+    else:
+        st.dataframe(slow_df, hide_index=True, use_container_width=True)
@@ -3,8 +3,10 @@
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 from datetime import datetime
+from perf import timed
 
 class ProjectRecommender:
+    @timed("m4.create_timeline_data")
     def create_timeline_data(self, policy_df, target_year, target_month):
         """
         목표 연도/월을 기준으로 각 정책의 시작일을 역산합니다.
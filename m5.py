@@ -5,26 +5,44 @@ import io
 import logging
 import re
 from datetime import datetime
+from disk_cache import content_hash, default_cache, file_signature
+from perf import cache_lookup, cache_miss, increment, timed
 
 class PdfGenerator:
+    @timed("m5.chart_to_svg")
     def _chart_to_base64_svg(self, chart) -> str:
         """Converts an Altair chart to a base64 encoded SVG string."""
-        import altair as alt
         if chart is None:
             return None
+        # 같은 차트 명세(데이터 포함)는 한 번만 렌더링합니다. 실패한 결과(None)는 저장하지 않습니다.
+        key = content_hash(chart)
+        cache = default_cache()
+        cache_lookup("charts")
+        svg = cache.get("charts", key)
+        if svg is not None:
+            return svg
+        cache_miss("charts")
         try:
             svg_io = io.StringIO()
             chart.save(svg_io, format='svg')
             svg_bytes = svg_io.getvalue().encode('utf-8')
-            return base64.b64encode(svg_bytes).decode('utf-8')
+            svg = base64.b64encode(svg_bytes).decode('utf-8')
+            cache.set("charts", key, svg)
+            return svg
         except Exception as e:
             logging.error(f"Altair 차트를 SVG로 변환하는 데 실패했습니다: {e}", exc_info=True)
             return None
 
+    @timed("m5.generate_report")
     def generate_report(self, report_data: dict) -> bytes:
         """
         Generates a PDF report from the provided data, mimicking the web UI layout.
+        같은 입력의 보고서는 디스크 캐시(모든 워커 공유)에서 가져옵니다. 보고서 양식(이 파일)이 바뀌면 다시 만듭니다.
         """
+        key = content_hash(report_data, file_signature(__file__))
+        return default_cache().get_or_compute("pdf", key, lambda: self._render_report(report_data))
+
+    def _render_report(self, report_data: dict) -> bytes:
         import pandas as pd
         from weasyprint import CSS, HTML
         
@@ -294,4 +312,6 @@ class PdfGenerator:
         </html>
         """
         
-        return HTML(string=html_template).write_pdf()
\ No newline at end of file
+        pdf_bytes = HTML(string=html_template).write_pdf()
+        increment('reports_generated')
+        return pdf_bytes
\ No newline at end of file
@@ -2,12 +2,53 @@
 # M6: 설문조사 결과 기반 계수 산출 모듈
 
 import pandas as pd
-import numpy as np
-from scipy.optimize import curve_fit
 import streamlit as st
 from m1 import DataManager
+from atomic_io import write_text_atomic
+from perf import timed
+import fitting
 import os
-import math
+
+# 자동 선택('auto')에서 비교하는 후보 모델
+# Model C는 만족도 계산(m2.SatisfactionCalculator)에 아직 없어 A로 계산되므로 자동 선택 후보에서 뺍니다.
+MODEL_CANDIDATES = ('A', 'B', 'B_free')
+MODEL_LABELS = {
+    'A': 'A: 한계효용체감',
+    'B': 'B: S자형 로지스틱 (X0=평균)',
+    'B_free': 'B: S자형 로지스틱 (X0 추정)',
+    'C': 'C: 역 지수 함수',
+}
+
+
+def _rank_key(result):
+    """BIC, AIC가 낮은 순. 피팅에 실패한 후보는 맨 뒤"""
+    stats = result['stats']
+    return (0, stats['BIC'], stats['AIC']) if stats else (1, 0.0, 0.0)
+
+
+def comparison_table(results):
+    """compare_models 결과를 화면 표시용 표로 만듭니다. (BIC 순, 첫 행이 추천 모델)"""
+    best_bic = next((r['stats']['BIC'] for r in results if r['stats']), None)
+    rows = []
+    for rank, result in enumerate(results, start=1):
+        stats = result['stats']
+        row = {
+            "순위": rank if stats else None,
+            "모델": MODEL_LABELS.get(result['candidate'], result['candidate']),
+            "계수": ', '.join(f"{name}={value:.6g}" for name, value in result['params'].items()) if result['params'] else "-",
+        }
+        if stats:
+            row.update({
+                "R²": stats['R-squared'], "RMSE": stats['RMSE'],
+                "AIC": stats['AIC'], "BIC": stats['BIC'], "ΔBIC": stats['BIC'] - best_bic,
+                "잔차 평균": stats['Residual mean'], "Durbin-Watson": stats['Durbin-Watson'],
+                "반복": stats['Iterations'],
+                "비고": "",
+            })
+        else:
+            row["비고"] = result['error'] or "피팅 실패"
+        rows.append(row)
+    return pd.DataFrame(rows)
 
 class SurveyAnalyzer:
     def __init__(self):
@@ -15,38 +56,63 @@ class SurveyAnalyzer:
         self.kpi_abbreviations = self.dm.KPI_ABBREVIATIONS
         self.s_max = 10.0 # 만족도 점수의 최대값 (고정)
 
-    # --- 만족도 모델 함수 정의 ---
-    # Model A: S(X) = S_max * (1 - exp(-c * X))
-    def _model_a(self, X, c):
-        # 오버플로우 방지를 위해 np.exp에 클리핑 적용 가능하나, 보통 c가 작아서 괜찮음
-        return self.s_max * (1 - np.exp(-c * X))
-
-    # Model C: S(X) = S_max * exp(-c * X)
-    def _model_c(self, X, c):
-        return self.s_max * np.exp(-c * X)
+    def compare_models(self, rail_type, kpi_abbr, X_data, S_data, candidates=MODEL_CANDIDATES):
+        """
+        후보 모델을 모두 피팅하고 BIC가 낮은 순으로 정렬한 결과 목록을 반환합니다. (fitting.fit_many)
+        X_data는 원래 단위입니다. 단위 변환은 작업(job)의 scale로 적용됩니다.
+        """
+        jobs = [fitting.make_job(kpi_abbr, rail_type, candidate, X_data, S_data, key=candidate, s_max=self.s_max) for candidate in candidates]
+        return sorted(fitting.fit_many(jobs), key=_rank_key)
 
-    def _fit_model(self, X_data, S_data, model_func, initial_guesses, bounds=None):
-        """주어진 데이터를 사용하여 모델의 계수를 피팅합니다."""
-        try:
-            # maxfev를 늘려 복잡한 피팅도 시도
-            if bounds:
-                popt, pcov = curve_fit(model_func, X_data, S_data, p0=initial_guesses, bounds=bounds, maxfev=10000)
-            else:
-                popt, pcov = curve_fit(model_func, X_data, S_data, p0=initial_guesses, maxfev=10000)
-            return popt
-        except RuntimeError as e:
-            st.error(f"모델 피팅 실패(수렴하지 않음): {e}")
-            return None
-        except ValueError as e:
-            st.error(f"모델 피팅 값 오류: {e}")
-            return None
+    @timed("m6.cross_validate")
+    def cross_validate(self, rail_type, kpi_name_kor, survey_df, model_type, k=5, group_column=None):
+        """
+        k-fold 교차 검증 (fitting.cross_validate_many). model_type='auto'이면 모든 후보 모델을 함께 검증합니다.
+        group_column을 주면 같은 값(예: 응답자 ID)의 행이 학습/검증 폴드에 나뉘지 않도록 그룹 단위로 나눕니다.
+        반환: (요약 표, 후보별 결과 목록). 데이터가 부족하면 ValueError
+        """
+        kpi_abbr = self.kpi_abbreviations.get(kpi_name_kor, kpi_name_kor)
+        if kpi_abbr == "TCI":
+            raise ValueError("TCI는 수단별 계수를 함께 추정하므로 교차 검증을 지원하지 않습니다.")
+        if 'kpi_value' not in survey_df.columns:
+            raise ValueError("교차 검증에는 KPI 열이 필요합니다. (접근 수단 열로 추정하는 PAI 가중치는 지원하지 않습니다.)")
+        X_data = survey_df['kpi_value'].values.astype(float)
+        S_data = survey_df['satisfaction_score'].values.astype(float)
+        candidates = MODEL_CANDIDATES if model_type == 'auto' else (model_type,)
+        jobs = [fitting.make_job(kpi_abbr, rail_type, candidate, X_data, S_data, key=candidate, s_max=self.s_max) for candidate in candidates]
+        groups = survey_df[group_column].values if group_column else None
+        reports = fitting.cross_validate_many(jobs, k=k, groups=groups)
+        summary = pd.DataFrame([
+            {
+                "모델": MODEL_LABELS.get(report['candidate'], report['candidate']),
+                "폴드": report['summary']['k'],
+                "검증 RMSE 평균": report['summary']['RMSE mean'], "검증 RMSE 표준편차": report['summary']['RMSE std'],
+                "검증 R² 평균": report['summary']['R-squared mean'], "검증 R² 표준편차": report['summary']['R-squared std'],
+                "계수 변동계수": ', '.join(f"{row.parameter}={row.cv:.3f}" for row in report['parameters'].itertuples()) or "-",
+                "실패 폴드": report['summary']['failed folds'],
+            }
+            for report in reports
+        ]).sort_values("검증 RMSE 평균", na_position='last')
+        return summary, reports
 
+    @timed("m6.calculate_coefficients")
     def calculate_coefficients(self, rail_type, kpi_name_kor, survey_df, model_type, original_filename=None):
         """
         설문조사 데이터를 기반으로 계수를 산출합니다.
         [수정] 경제적 접근성(고속/일반)은 '만원' 단위로 변환하여 계산
         [수정] Model B는 평균값을 X0로 고정
+        [추가] 환승시설 편의성(TCI)은 model_type과 관계없이 수단별 P_j, c_j를 함께 추정 (calculate_tci_coefficients)
+        [추가] 물리적 접근성(PAI) 데이터에 KPI 열 없이 접근 수단 열이 있으면 수단 가중치와 alpha를 추정 (calculate_pai_weights)
+        model_type='auto': A, B(X0 고정), B(X0 추정)를 모두 피팅해 BIC로 선택하고 stats['comparison']에 비교표를 담습니다.
         """
+        kpi_abbr = self.kpi_abbreviations.get(kpi_name_kor, kpi_name_kor)
+        if kpi_abbr == "TCI":
+            # TCI는 단일 X가 아니라 수단별 거리로 P_j, c_j를 함께 추정합니다.
+            return self.calculate_tci_coefficients(rail_type, survey_df, original_filename)
+        if kpi_abbr == "PAI" and 'kpi_value' not in survey_df.columns:
+            # KPI 열 대신 접근 수단별 이용 가능 여부가 있으면 수단 가중치와 alpha를 추정합니다.
+            return self.calculate_pai_weights(rail_type, survey_df, original_filename)
+
         # 1. 데이터 준비
         X_data = survey_df['kpi_value'].values.astype(float)
         S_data = survey_df['satisfaction_score'].values.astype(float)
@@ -55,105 +121,64 @@ class SurveyAnalyzer:
             st.warning(f"데이터 포인트가 부족합니다. (최소 2개 필요)")
             return pd.DataFrame(), None
         
-        kpi_abbr = self.kpi_abbreviations.get(kpi_name_kor, kpi_name_kor)
-        
         # 2. [핵심 수정] 단위 변환 (원 -> 만원)
-        # 경제적 접근성이며 고속/일반철도인 경우 스케일링 적용
-        scale_factor = 1.0
-        if kpi_abbr == "EAI" and rail_type in ["고속철도", "일반철도"]:
-            scale_factor = 10000.0
-            X_data = X_data / scale_factor
-            st.info(f"💡 '{kpi_name_kor}({rail_type})' 분석을 위해 데이터를 '만원' 단위로 변환하여 계산합니다. (나누기 10,000)")
+        # 경제적 접근성이며 고속/일반철도인 경우 스케일링 적용 (피팅 작업의 scale로 전달됩니다)
+        scale_factor = fitting.unit_scale(kpi_abbr, rail_type)
+        if scale_factor != 1.0:
+            st.info(f"💡 '{kpi_name_kor}({rail_type})' 분석을 위해 데이터를 '만원' 단위로 변환하여 계산합니다. (나누기 {scale_factor:,.0f}, 산출 계수는 원 단위로 되돌려 저장)")
 
         params_found = None
-        model_func = None
-        popt = None
         stats = None
+        comparison = None
 
         try:
-            if kpi_abbr == "TCI":
-                st.warning("TCI는 별도 산출 방식이 필요합니다.")
-                return pd.DataFrame(), None
-
             # 3. 모델별 피팅 로직
-            if model_type == 'A':
-                model_func = self._model_a
-                initial_guesses = [0.01] 
-                bounds = ([0.], [np.inf])
-                popt = self._fit_model(X_data, S_data, model_func, initial_guesses, bounds)
-                if popt is not None:
-                    params_found = {'c': popt[0]}
-            
-            elif model_type == 'B':
-                # [핵심 수정] X0(변곡점)를 데이터의 '평균값'으로 고정!
-                avg_X = np.mean(X_data)
-                st.write(f"📊 **데이터 평균값(변곡점 기준)**: {avg_X:.4f} (단위 변환 적용됨)")
-
-                # 고정된 X0를 사용하는 내부 함수 정의
-                def _model_b_fixed_x0(x, a):
-                    # a가 양수여야 비용 증가 시 만족도 하락 (분모 커짐)
-                    # S = S_max / (1 + exp(a * (x - avg_X)))
-                    try:
-                        # overflow 방지: 지수승이 너무 크면 700 정도로 제한
-                        val = a * (x - avg_X)
-                        val = np.clip(val, -700, 700) 
-                        return self.s_max / (1 + np.exp(val))
-                    except Exception:
-                        return 0.0
-
-                # 기울기(a)만 추정하면 됨
-                initial_guesses = [0.5] 
-                bounds = ([0], [np.inf]) # a > 0
-                
-                popt = self._fit_model(X_data, S_data, _model_b_fixed_x0, initial_guesses, bounds)
-                
-                if popt is not None:
-                    # 결과 저장 시 X0는 고정했던 평균값(avg_X)을 사용
-                    params_found = {'a': popt[0], f'{kpi_abbr}_0': avg_X}
-            
-            elif model_type == 'C':
-                model_func = self._model_c
-                initial_guesses = [0.001]
-                bounds = ([0.], [np.inf])
-                popt = self._fit_model(X_data, S_data, model_func, initial_guesses, bounds)
-                if popt is not None:
-                    params_found = {'c': popt[0]}
-            
+            if model_type == 'auto':
+                # 후보 모델을 모두 피팅해 BIC가 가장 낮은 모델을 사용합니다.
+                results = self.compare_models(rail_type, kpi_abbr, X_data, S_data)
+                comparison = comparison_table(results)
+                best = results[0]
+                if best['params'] is None:
+                    st.error("모든 후보 모델의 피팅에 실패했습니다.")
+                    return pd.DataFrame(), None
+                st.info(f"💡 자동 선택: {MODEL_LABELS[best['candidate']]} (BIC {best['stats']['BIC']:.2f})")
+            elif model_type in ('A', 'B', 'C'):
+                job = fitting.make_job(kpi_abbr, rail_type, model_type, X_data, S_data, s_max=self.s_max)
+                if model_type == 'B':
+                    st.write(f"📊 **데이터 평균값(변곡점 기준)**: {job['x0']:.4f} (단위 변환 적용됨)")
+                best = fitting.fit_many([job])[0]
+                if best['error']:
+                    st.error(best['error'])
             else:
                 st.error(f"알 수 없는 모델 타입: {model_type}")
                 return pd.DataFrame(), None
 
+            params_found = best['params']
+            model_type = best['model_type']
+
             # 4. 결과 정리 및 저장
             if params_found:
-                # 통계치 계산을 위한 예측값 생성 (Model B는 별도 함수 사용)
-                if model_type == 'B':
-                    def _final_model_b(x, a, x0):
-                        val = np.clip(a * (x - x0), -700, 700)
-                        return self.s_max / (1 + np.exp(val))
-                    s_pred = _final_model_b(X_data, params_found['a'], params_found[f'{kpi_abbr}_0'])
-                else:
-                    s_pred = model_func(X_data, *popt)
-
-                sse = np.sum((S_data - s_pred) ** 2)
-                sst = np.sum((S_data - np.mean(S_data)) ** 2)
-                r_squared = 1 - (sse / sst) if sst > 0 else 0
-                stats = { "SSE": sse, "SST": sst, "R-squared": r_squared }
+                stats = dict(best['stats'])
+                if comparison is not None:
+                    stats['comparison'] = comparison
 
                 # 결과 텍스트 파일 저장
                 if original_filename:
                     result_text = [
                         f"1. 입력 파일명: {original_filename}",
                         f"2. 분석 성과지표: {kpi_name_kor} ({rail_type})",
-                        f"3. 적용 모델: Model {model_type}",
+                        f"3. 적용 모델: Model {model_type}" + (f" (자동 선택: {MODEL_LABELS[best['candidate']]})" if comparison is not None else ""),
                         "\n4. 분석 결과",
                         f" - 산출 계수: {', '.join([f'{name}={val:.6f}' for name, val in params_found.items()])}",
                         f" - SSE: {stats['SSE']:.4f}",
                         f" - R-squared: {stats['R-squared']:.4f}",
-                        f" - (참고) 적용된 단위 스케일: 1/{scale_factor}"
+                        f" - 반복 횟수: {stats['Iterations']} (함수 계산 {stats['Function evaluations']}회, 수렴)",
+                        f" - (참고) 피팅 단위 스케일: 1/{scale_factor} (산출 계수는 원래 단위)"
                     ]
+                    if comparison is not None:
+                        result_text += ["\n5. 모델 비교 (BIC 순)", comparison.to_string(index=False)]
                     output_filename = f"{os.path.splitext(original_filename)[0]}_result.txt"
-                    with open(output_filename, 'w', encoding='utf-8') as f:
-                        f.write("\n".join(result_text))
+                    write_text_atomic(output_filename, "\n".join(result_text))
                     st.info(f"✅ 결과 저장 완료: {output_filename}")
 
                 # DataFrame 반환용 데이터 생성
@@ -177,4 +202,119 @@ class SurveyAnalyzer:
 
         except Exception as e:
             st.error(f"오류 발생: {e}")
-            return pd.DataFrame(), None
\ No newline at end of file
+            return pd.DataFrame(), None
+    @timed("m6.calculate_tci_coefficients")
+    def calculate_tci_coefficients(self, rail_type, survey_df, original_filename=None):
+        """
+        환승시설 편의성(TCI)의 수단별 P_j, c_j를 설문 데이터로 함께 추정합니다. (fitting.fit_tci)
+        데이터 형식은 fitting.tci_design 참고: 수단별 거리 열(넓은 형식) 또는 respond_ID/Mode/Distance(긴 형식)
+        반환 DataFrame은 수단별 한 행 (param1: P_<수단>, param2: c_<수단>)
+        """
+        try:
+            D, S = fitting.tci_design(survey_df.rename(columns={'satisfaction_score': 'Satisfaction'}), self.dm.TCI_ALL_MODES)
+            st.info(f"💡 응답자 {len(S):,}명, 수단 {len(self.dm.TCI_ALL_MODES)}개의 P_j, c_j를 함께 추정합니다. (제약: P_j ≥ 0, ΣP_j ≤ 1)")
+            result = fitting.fit_tci(D, S, self.dm.TCI_ALL_MODES, s_max=self.s_max)
+        except ValueError as e:
+            st.error(str(e))
+            return pd.DataFrame(), None
+        if result['params'] is None:
+            st.error(result['message'])
+            return pd.DataFrame(), None
+
+        stats = result['stats']
+        rows = [
+            {
+                'rail_type': rail_type, 'kpi': 'TCI', 'model_type': 'TCI',
+                'param1_name': f"P_{mode}", 'param1_value': result['params'][f"P_{mode}"],
+                'param2_name': f"c_{mode}", 'param2_value': result['params'][f"c_{mode}"],
+            }
+            for mode in result['modes'] if f"P_{mode}" in result['params']
+        ]
+        missing = [mode for mode in result['modes'] if f"P_{mode}" not in result['params']]
+        if missing:
+            st.warning(f"이용 응답이 없어 추정하지 않은 수단: {', '.join(missing)}")
+
+        if original_filename:
+            result_text = [
+                f"1. 입력 파일명: {original_filename}",
+                f"2. 분석 성과지표: 환승시설 편의성 ({rail_type})",
+                "3. 적용 모델: S = S_max × Σ P_j × (1 - exp(-c_j / d_j))",
+                "\n4. 분석 결과",
+                *[f" - {row['param1_name']}={row['param1_value']:.6f}, {row['param2_name']}={row['param2_value']:.6f}" for row in rows],
+                f" - ΣP_j: {stats['Sum P']:.4f}",
+                f" - SSE: {stats['SSE']:.4f}",
+                f" - R-squared: {stats['R-squared']:.4f}",
+                f" - 반복 횟수: {stats['Iterations']} (함수 계산 {stats['Function evaluations']}회, 수렴)",
+            ]
+            output_filename = f"{os.path.splitext(original_filename)[0]}_result.txt"
+            write_text_atomic(output_filename, "\n".join(result_text))
+            st.info(f"✅ 결과 저장 완료: {output_filename}")
+        return pd.DataFrame(rows), stats
+
+    @timed("m6.calculate_pai_weights")
+    def calculate_pai_weights(self, rail_type, survey_df, original_filename=None):
+        """
+        물리적 접근성(PAI)의 접근 수단 가중치(w_<수단>, 합 100)와 alpha를 설문 데이터로 추정합니다. (fitting.fit_pai)
+        만족도 곡선은 현재 저장된 PAI 계수(모델 A/B/C)를 그대로 사용하며, 반환 DataFrame에 그 행도 함께 담습니다.
+        파일에 열이 없는 수단은 기존 가중치의 기여(alpha × w)를 유지합니다. (fitting.keep_absent_pai_weights)
+        """
+        coeffs, pai_coeffs, _ = self.dm.load_coefficients()
+        config = coeffs['coefficients']
+        kpi_config = config.get(rail_type, {}).get('PAI')
+        if not kpi_config or not kpi_config['params']:
+            st.error(f"'{rail_type}'의 물리적 접근성 만족도 계수(c 또는 a)가 없어 가중치를 추정할 수 없습니다. 먼저 KPI 값으로 계수를 산출하세요.")
+            return pd.DataFrame(), None
+        model_type = kpi_config['model_type']
+        params = kpi_config['params']
+        if model_type == 'B':
+            curve_params = {'a': params['a'], 'PAI_0': params['PAI_0']}
+            values, x0 = [params['a']], params['PAI_0']
+        else:
+            curve_params = {'c': params['c']}
+            values, x0 = [params['c']], None
+
+        try:
+            A, S, modes = fitting.pai_design(survey_df.rename(columns={'satisfaction_score': 'Satisfaction'}), self.dm.PAI_ALL_MODES)
+            st.info(f"💡 응답자 {len(S):,}명, 접근 수단 {len(modes)}개의 가중치와 alpha를 추정합니다. (만족도 곡선: Model {model_type}, {', '.join(f'{k}={v:.6g}' for k, v in curve_params.items())})")
+            result = fitting.fit_pai(A, S, modes, model_type, values, s_max=self.s_max, x0=x0)
+        except ValueError as e:
+            st.error(str(e))
+            return pd.DataFrame(), None
+        if result['params'] is None:
+            st.error(result['message'])
+            return pd.DataFrame(), None
+
+        stats = result['stats']
+        params, kept = fitting.keep_absent_pai_weights(
+            result, pai_coeffs['weights'].get(rail_type, {}), pai_coeffs['alpha'].get(rail_type, 1.0))
+        if kept:
+            st.warning(f"설문 파일에 열이 없는 수단은 기존 가중치의 기여를 유지합니다: {', '.join(kept)}")
+        curve_items = list(curve_params.items())
+        rows = [{
+            'rail_type': rail_type, 'kpi': 'PAI', 'model_type': model_type,
+            'param1_name': curve_items[0][0], 'param1_value': curve_items[0][1],
+            'param2_name': curve_items[1][0] if len(curve_items) > 1 else None,
+            'param2_value': curve_items[1][1] if len(curve_items) > 1 else None,
+        }]
+        rows += [
+            {'rail_type': rail_type, 'kpi': 'PAI', 'model_type': model_type,
+             'param1_name': name, 'param1_value': value, 'param2_name': None, 'param2_value': None}
+            for name, value in params.items()
+        ]
+
+        if original_filename:
+            result_text = [
+                f"1. 입력 파일명: {original_filename}",
+                f"2. 분석 성과지표: 물리적 접근성 ({rail_type})",
+                f"3. 적용 모델: PAI = alpha × Σ w_j × (수단 j 이용 가능), 만족도 곡선 Model {model_type} (고정)",
+                "\n4. 분석 결과",
+                *[f" - {name}={value:.6f}" for name, value in params.items()],
+                f" - 응답자 수: {len(S):,} (수단 조합 {stats['Patterns']}가지)",
+                f" - SSE: {stats['SSE']:.4f}",
+                f" - R-squared: {stats['R-squared']:.4f}",
+                f" - 반복 횟수: {stats['Iterations']} (함수 계산 {stats['Function evaluations']}회, 수렴)",
+            ]
+            output_filename = f"{os.path.splitext(original_filename)[0]}_result.txt"
+            write_text_atomic(output_filename, "\n".join(result_text))
+            st.info(f"✅ 결과 저장 완료: {output_filename}")
+        return pd.DataFrame(rows), stats
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# Metrics: perf 집계를 Prometheus 텍스트 형식으로 내보내는 exporter
+#
+# 아래 환경 변수 중 하나 이상을 지정하면 m3.py가 시작될 때 exporter가 프로세스당 한 번 실행됩니다.
+# - RAILWAY_METRICS_PORT: 이 포트에서 HTTP로 /metrics 를 제공합니다. (RAILWAY_METRICS_HOST, 기본 127.0.0.1)
+#     curl http://127.0.0.1:<포트>/metrics
+# - RAILWAY_METRICS_FILE: RAILWAY_METRICS_INTERVAL초(기본 15초)마다 이 파일을 원자적으로 다시 씁니다.
+#   (node_exporter의 textfile collector 등에서 읽을 수 있습니다)
+# 히스토그램은 perf의 span 측정값으로 만들어지므로, exporter가 시작되면 perf 측정도 함께 켜집니다.
+#
+# 직접 확인: python metrics.py  (이 프로세스의 현재 값을 한 번 출력)
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import perf
+from atomic_io import write_text_atomic
+
+PORT_ENV = "RAILWAY_METRICS_PORT"
+HOST_ENV = "RAILWAY_METRICS_HOST"
+FILE_ENV = "RAILWAY_METRICS_FILE"
+INTERVAL_ENV = "RAILWAY_METRICS_INTERVAL"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "railway"
+
+# perf 카운터 -> (지표 이름, 설명, 라벨)
+COUNTERS = [
+    ('scoring_calls', 'scoring_calls_total', "만족도 점수/역산 계산 건수", {}),
+    ('reports_generated', 'reports_generated_total', "생성된 PDF 보고서 수", {}),
+    ('fits_run', 'fits_total', "실행된 만족도 모델 피팅 수", {}),
+    ('fit_failures', 'fit_failures_total', "실패한(수렴하지 않은) 만족도 모델 피팅 수", {}),
+    ('data_changes_detected', 'data_changes_detected_total', "앱 밖에서 바뀐 데이터 파일을 감지해 데이터 버전을 올린 횟수", {}),
+    # 메모리 캐시와 디스크 캐시(disk_cache)를 모두 놓쳐 파일을 실제로 파싱한 횟수
+    ('cache.disk_policy.misses', 'file_reloads_total', "데이터 파일을 다시 읽은 횟수", {'dataset': 'policy'}),
+    ('cache.disk_coefficients.misses', 'file_reloads_total', "데이터 파일을 다시 읽은 횟수", {'dataset': 'coefficients'}),
+]
+
+# perf span 이름 (접두어) -> (지표 이름, 설명, 라벨 이름)
+HISTOGRAMS = [
+    ('rerun.', 'rerun_duration_seconds', "화면 한 번 실행(rerun)에 걸린 시간", 'view'),
+    ('user_view.', 'section_duration_seconds', "사용자 화면 구간별 소요시간", 'section'),
+    ('m5.generate_report', 'pdf_render_duration_seconds', "PDF 보고서 생성 시간", None),
+    ('fitting.fit', 'curve_fit_duration_seconds', "만족도 모델 피팅 시간", None),
+]
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Writer:
+    """같은 지표 이름의 HELP/TYPE 줄을 한 번만 쓰는 텍스트 형식 작성기"""
+
+    def __init__(self):
+        self.lines = []
+        self._declared = set()
+
+    def declare(self, name, help_text, metric_type):
+        if name in self._declared:
+            return
+        self._declared.add(name)
+        self.lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        self.lines.append(f"# TYPE {PREFIX}_{name} {metric_type}")
+
+    def sample(self, name, value, labels=None):
+        self.lines.append(f"{PREFIX}_{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name, summary, labels=None):
+        """perf 히스토그램(ms 구간)을 초 단위 누적 구간으로 바꿔 씁니다."""
+        labels = labels or {}
+        cumulative = 0
+        for bound_ms, count in zip(list(perf.BUCKET_BOUNDS_MS) + [float('inf')], summary['buckets']):
+            cumulative += count
+            le = '+Inf' if bound_ms == float('inf') else _number(bound_ms / 1000)
+            self.sample(f"{name}_bucket", cumulative, {**labels, 'le': le})
+        self.sample(f"{name}_sum", summary['total_ms'] / 1000, labels)
+        self.sample(f"{name}_count", summary['count'], labels)
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def render():
+    """현재 프로세스의 지표를 Prometheus 텍스트 형식 문자열로 만듭니다."""
+    writer = _Writer()
+
+    counters = perf.counters()
+    for key, name, help_text, labels in COUNTERS:
+        writer.declare(name, help_text, 'counter')
+        writer.sample(name, counters.get(key, 0), labels)
+
+    summary = perf.process_summary()
+    for prefix, name, help_text, label_name in HISTOGRAMS:
+        writer.declare(name, help_text, 'histogram')
+        for span_name in sorted(summary):
+            if label_name is None and span_name == prefix:
+                writer.histogram(name, summary[span_name])
+            elif label_name is not None and span_name.startswith(prefix):
+                writer.histogram(name, summary[span_name], {label_name: span_name[len(prefix):]})
+
+    sessions = perf.active_sessions()
+    writer.declare('active_sessions', "Streamlit 서버에 연결된 세션 수", 'gauge')
+    writer.sample('active_sessions', len(sessions))
+    state_bytes = [perf.session_state_bytes(state) for _, _, state in sessions]
+    writer.declare('session_state_bytes', "모든 세션의 session_state 크기 합계", 'gauge')
+    writer.sample('session_state_bytes', sum(b for b in state_bytes if b is not None))
+    memory = perf.process_memory_bytes()
+    if memory is not None:
+        writer.declare('process_resident_memory_bytes', "프로세스 상주 메모리(RSS)", 'gauge')
+        writer.sample('process_resident_memory_bytes', memory)
+    writer.declare('inflight_operations', "진행 중인 작업 수", 'gauge')
+    for operation, value in sorted(perf.gauges().items()):
+        writer.sample('inflight_operations', value, {'operation': operation})
+
+    return writer.text()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 수집 요청마다 로그를 남기지 않습니다.
+
+
+def serve_http(port, host='127.0.0.1'):
+    """백그라운드 스레드에서 /metrics HTTP 서버를 시작하고 서버 객체를 반환합니다."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="railway-metrics-http", daemon=True).start()
+    return server
+
+
+def write_file(path):
+    write_text_atomic(path, render())
+
+
+def _write_periodically(path, interval, stop_event):
+    while not stop_event.is_set():
+        try:
+            write_file(path)
+        except OSError as e:
+            logging.warning(f"지표 파일을 쓰지 못했습니다: {e}")
+        stop_event.wait(interval)
+
+
+def write_file_periodically(path, interval=15.0):
+    """백그라운드 스레드에서 interval초마다 지표 파일을 씁니다. 반환된 Event를 set하면 멈춥니다."""
+    stop_event = threading.Event()
+    threading.Thread(target=_write_periodically, args=(path, interval, stop_event), name="railway-metrics-file", daemon=True).start()
+    return stop_event
+
+
+def start_from_env():
+    """
+    환경 변수에 설정된 exporter를 시작합니다. 여러 번 호출해도 프로세스당 한 번만 시작됩니다.
+    설정이 없으면 아무것도 하지 않고 False를 반환합니다.
+    """
+    global _started
+    port, path = os.environ.get(PORT_ENV), os.environ.get(FILE_ENV)
+    if not port and not path:
+        return False
+    with _start_lock:
+        if _started:
+            return True
+        _started = True
+        perf.set_enabled(True)
+        if port:
+            host = os.environ.get(HOST_ENV, '127.0.0.1')
+            try:
+                serve_http(int(port), host)
+                logging.info(f"Prometheus 지표 제공: http://{host}:{port}/metrics")
+            except (OSError, ValueError) as e:
+                logging.error(f"지표 HTTP 서버를 시작하지 못했습니다 ({host}:{port}): {e}")
+        if path:
+            write_file_periodically(path, float(os.environ.get(INTERVAL_ENV, 15)))
+            logging.info(f"Prometheus 지표 파일: {path}")
+    return True
+
+
+if __name__ == "__main__":
+    print(render(), end='')
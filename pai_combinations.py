@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# PAI Combinations: 물리적 접근성(PAI)의 접근 수단 조합별 만족도 표와 추가 수단 제안
+#
+# - 접근 수단은 최대 8개이므로 철도 유형마다 가능한 조합은 2^8 = 256가지뿐입니다.
+#   모든 조합의 PAI 값(alpha × Σ 가중치)과 만족도를 배열 연산 한 번으로 계산해 계수 버전별로 캐시합니다.
+# - suggest_additions: 현재 수단 조합과 목표 만족도로, 목표에 닿는 최소한의 추가 수단 묶음을
+#   (그 묶음의 어느 부분집합으로도 목표에 닿지 않는 것) 추가 수가 적은 순, 같으면 만족도 상승 폭 순으로 반환합니다.
+import numpy as np
+import streamlit as st
+
+from data_watcher import data_version
+from m1 import DataManager
+from m2 import SatisfactionCalculator
+from perf import cache_lookup, cache_miss
+
+# 광역철도는 지하철/광역철도를 접근 수단으로 선택하지 않습니다. (사용자 화면과 같음)
+EXCLUDED_MODES = {'광역철도': ['지하철/광역철도']}
+
+
+def access_modes(rail_type):
+    """철도 유형에서 선택할 수 있는 접근 수단 (사용자 화면 체크박스 순서)"""
+    excluded = EXCLUDED_MODES.get(rail_type, [])
+    return [mode for mode in DataManager.PAI_ALL_MODES if mode not in excluded]
+
+
+def build_table(config, pai_coeffs, rail_type):
+    """
+    철도 유형의 모든 접근 수단 조합의 PAI 값과 만족도
+    반환: {'modes', 'bits': (조합 수, 수단 수) 0/1 배열, 'sizes', 'values', 'scores'}
+    조합 번호의 j번째 비트가 modes[j] 선택 여부이며, 아무것도 선택하지 않은 조합은 화면과 같이 0점입니다.
+    """
+    modes = access_modes(rail_type)
+    codes = np.arange(1 << len(modes))
+    bits = ((codes[:, None] >> np.arange(len(modes))) & 1).astype(float)
+    weights = pai_coeffs.get('weights', {}).get(rail_type, {})
+    alpha = pai_coeffs.get('alpha', {}).get(rail_type, 0)
+    values = alpha * (bits @ np.array([weights.get(mode, 0) for mode in modes], dtype=float))
+    scores = SatisfactionCalculator(config).calculate_satisfaction_array(rail_type, 'PAI', values)
+    scores = np.where(codes == 0, 0.0, scores)
+    return {'modes': modes, 'bits': bits, 'sizes': bits.sum(axis=1).astype(int), 'values': values, 'scores': scores}
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _table_for_version(data_dir, version, rail_type):
+    """계수 버전(data_dir, version)과 철도 유형별 조합 표"""
+    cache_miss('pai_combinations')
+    config, pai_coeffs, _ = DataManager().load_coefficients_cached()
+    return build_table(config, pai_coeffs, rail_type)
+
+
+def combination_table(rail_type):
+    """현재 계수 버전의 조합 표 (계수가 저장될 때만 다시 계산)"""
+    dm = DataManager()
+    cache_lookup('pai_combinations')
+    return _table_for_version(dm.data_dir, data_version(dm.data_dir), rail_type)
+
+
+def _code(table, selected_modes):
+    return sum(1 << j for j, mode in enumerate(table['modes']) if mode in selected_modes)
+
+
+def score_of(table, selected_modes):
+    """선택한 수단 조합의 (PAI 값, 만족도)"""
+    code = _code(table, selected_modes)
+    return float(table['values'][code]), float(table['scores'][code])
+
+
+def suggest_additions(table, current_modes, goal_score, limit=5):
+    """
+    현재 수단에 더해 목표 만족도에 닿는 최소 추가 수단 묶음 (추가 수가 적은 순, 같으면 만족도 상승 폭 순)
+    반환: [{'add': 추가 수단 목록, 'modes': 전체 수단 목록, 'value', 'score', 'gain'}]
+    이미 목표 이상이거나 모든 수단을 더해도 닿지 않으면 빈 목록입니다. (reachable()로 구분)
+    """
+    current = _code(table, current_modes)
+    codes = np.arange(len(table['scores']))
+    current_score = table['scores'][current]
+    if current_score >= goal_score:
+        return []
+    feasible = codes[((codes & current) == current) & (table['scores'] >= goal_score)]
+    if not len(feasible):
+        return []
+    added = feasible ^ current
+    # 다른 추가 묶음을 부분집합으로 포함하면 최소가 아닙니다. (조합 수가 적어 행렬로 한 번에 비교)
+    contains = ((added[:, None] & added[None, :]) == added[None, :]) & (added[:, None] != added[None, :])
+    minimal = feasible[~contains.any(axis=1)]
+    gains = table['scores'][minimal] - current_score
+    order = np.lexsort((-gains, table['sizes'][minimal]))[:limit]
+    modes = table['modes']
+    return [
+        {
+            'add': [mode for j, mode in enumerate(modes) if (code ^ current) >> j & 1],
+            'modes': [mode for j, mode in enumerate(modes) if code >> j & 1],
+            'value': float(table['values'][code]),
+            'score': float(table['scores'][code]),
+            'gain': float(gain),
+        }
+        for code, gain in zip(minimal[order], gains[order])
+    ]
+
+
+def reachable(table, current_modes, goal_score):
+    """현재 수단에 수단을 더해 목표 만족도에 닿을 수 있는지와 가능한 최고 만족도"""
+    current = _code(table, current_modes)
+    codes = np.arange(len(table['scores']))
+    best = float(table['scores'][(codes & current) == current].max())
+    return best >= goal_score, best
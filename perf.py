@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-
+# Perf: 화면 구간 및 주요 계산 호출의 소요시간 측정 (span/타이머)
+#
+# - 측정은 환경 변수 RAILWAY_PERF 로 켭니다. ('1', 'true', 'on' / 기본값은 꺼짐)
+#   꺼져 있으면 span()은 아무 일도 하지 않는 공용 객체를 반환하므로 호출 비용이 거의 없습니다.
+# - 측정값은 이름별 히스토그램으로 프로세스 전체와 세션별로 따로 집계됩니다.
+# - 끝난 span은 최근 기록(RECENT_SPANS건)으로 보관되며 export_jsonl()로 JSONL 추적 파일을 만들 수 있습니다.
+#   RAILWAY_PERF_TRACE 에 파일 경로를 지정하면 끝나는 span마다 해당 파일에 한 줄씩 이어 씁니다.
+# - RAILWAY_PERF_SLOW_MS(기본 500ms) 이상 걸린 span은 입력 요약과 함께 느린 작업 목록에 남습니다.
+# - 캐시 조회/적중 건수, 진행 중인 작업 수(gauge) 같은 카운터는 측정 설정과 관계없이 항상 집계됩니다.
+#
+# 사용 예:
+#     with span("user_view.policy_editor", rows=len(df)):
+#         ...
+#
+#     @timed("m4.create_timeline_data")
+#     def create_timeline_data(...):
+#         ...
+import bisect
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+try:
+    from streamlit import runtime as streamlit_runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # Streamlit 없이 스크립트에서 사용할 때
+    streamlit_runtime = None
+    get_script_run_ctx = None
+
+ENABLE_ENV = "RAILWAY_PERF"
+TRACE_ENV = "RAILWAY_PERF_TRACE"
+SLOW_ENV = "RAILWAY_PERF_SLOW_MS"
+
+# 히스토그램 구간 상한 (ms). 마지막 구간은 상한이 없습니다.
+BUCKET_BOUNDS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SAMPLE_SIZE = 256      # 백분위수 계산에 쓰는 이름별 최근 측정값 수
+RECENT_SPANS = 2000    # JSONL로 내보낼 수 있는 최근 span 수
+MAX_SESSIONS = 200     # 집계를 유지하는 최대 세션 수 (오래 쓰지 않은 세션부터 제거)
+SLOW_SPANS = 50        # 보관하는 느린 작업 수
+CACHE_NAMES = ('data', 'coefficients', 'charts', 'pdf')  # 관리자 화면에 표시하는 캐시 (순서 유지)
+
+PROCESS = "process"    # 세션 밖(스크립트, 백그라운드 스레드)에서 측정된 span의 세션 이름
+
+
+def _env_enabled():
+    return os.environ.get(ENABLE_ENV, '').strip().lower() in ('1', 'true', 'on', 'yes')
+
+
+def _env_slow_ms():
+    try:
+        return float(os.environ.get(SLOW_ENV, 500))
+    except ValueError:
+        return 500.0
+
+
+_enabled = _env_enabled()
+_slow_ms = _env_slow_ms()
+_lock = threading.Lock()
+_span_ids = itertools.count(1)
+_current_span = contextvars.ContextVar('railway_perf_span', default=None)
+
+
+class Histogram:
+    """이름 하나에 대한 소요시간 분포 (구간별 건수 + 최근 측정값)"""
+
+    __slots__ = ('count', 'total_ms', 'max_ms', 'buckets', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def observe(self, duration_ms):
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ms)] += 1
+        self.samples.append(duration_ms)
+
+    def percentile(self, q):
+        """최근 측정값 기준 백분위수 (측정값이 없으면 None)"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': self.max_ms,
+            'buckets': list(self.buckets),
+        }
+
+
+class _Stats:
+    """이름별 Histogram 묶음"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.last_seen = time.time()
+
+    def observe(self, name, duration_ms):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(duration_ms)
+        self.last_seen = time.time()
+
+
+_process_stats = _Stats()
+_session_stats = OrderedDict()  # {session_id: _Stats}
+_recent = deque(maxlen=RECENT_SPANS)
+_slow = deque(maxlen=SLOW_SPANS)
+_counters = {}
+_gauges = {}
+_trace_file = None
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(flag):
+    """실행 중에 측정을 켜거나 끕니다. (환경 변수 설정보다 우선합니다)"""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def slow_threshold_ms():
+    return _slow_ms
+
+
+def current_session_id():
+    """Streamlit 세션 안에서 호출되면 세션 ID를, 아니면 PROCESS를 반환합니다."""
+    if get_script_run_ctx is None:
+        return PROCESS
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else PROCESS
+
+
+def _write_trace(record):
+    global _trace_file
+    path = os.environ.get(TRACE_ENV)
+    if not path:
+        return
+    if _trace_file is None or _trace_file.name != path:
+        _trace_file = open(path, 'a', encoding='utf-8', buffering=1)
+    _trace_file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+
+def _record(name, started_at, duration_ms, span_id, parent_id, attrs):
+    session_id = current_session_id()
+    record = {
+        'ts': started_at,
+        'name': name,
+        'duration_ms': round(duration_ms, 3),
+        'session': session_id,
+        'span_id': span_id,
+        'parent_id': parent_id,
+        'thread': threading.current_thread().name,
+        'attrs': attrs,
+    }
+    with _lock:
+        _process_stats.observe(name, duration_ms)
+        stats = _session_stats.get(session_id)
+        if stats is None:
+            stats = _session_stats[session_id] = _Stats()
+            while len(_session_stats) > MAX_SESSIONS:
+                _session_stats.popitem(last=False)
+        else:
+            _session_stats.move_to_end(session_id)
+        stats.observe(name, duration_ms)
+        _recent.append(record)
+        if duration_ms >= _slow_ms:
+            _slow.append(record)
+        _write_trace(record)
+
+
+def describe_value(value, limit=80):
+    """느린 작업 목록에 남길 짧은 입력 설명 (DataFrame은 크기만, 나머지는 잘린 repr)"""
+    shape = getattr(value, 'shape', None)
+    if shape is not None and hasattr(value, 'columns'):
+        return f"{type(value).__name__}({shape[0]}x{shape[1]})"
+    if isinstance(value, dict):
+        return f"dict({len(value)} keys)"
+    if isinstance(value, (list, tuple)) and len(value) > 5:
+        return f"{type(value).__name__}({len(value)})"
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+class _Span:
+    __slots__ = ('name', 'attrs', 'describe', 'span_id', 'parent_id', '_started_at', '_started', '_token')
+
+    def __init__(self, name, attrs, describe=None):
+        self.name = name
+        self.attrs = attrs
+        self.describe = describe  # 느린 작업일 때만 호출되어 입력 요약을 만듭니다.
+
+    def set(self, **attrs):
+        """측정 도중에 알게 된 값(행 수, 결과 크기 등)을 span에 덧붙입니다."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.span_id = next(_span_ids)
+        self.parent_id = _current_span.get()
+        self._token = _current_span.set(self.span_id)
+        self._started_at = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        if self.describe is not None and duration_ms >= _slow_ms:
+            self.attrs['inputs'] = self.describe()
+        _record(self.name, self._started_at, duration_ms, self.span_id, self.parent_id, self.attrs)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name, **attrs):
+    """with 문으로 감싼 구간의 소요시간을 name으로 기록합니다. attrs는 추적 기록에 함께 남습니다."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+def timed(name=None):
+    """
+    함수 호출 시간을 기록하는 데코레이터입니다.
+    name을 생략하면 '모듈.함수' 이름으로 기록합니다. (@timed 또는 @timed("이름") 모두 사용 가능)
+    """
+    def decorate(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+        # 메서드는 첫 인자(self)를 입력 요약에서 뺍니다.
+        skip_first = '.' in func.__qualname__.replace('.<locals>.', '')
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            def describe():
+                inputs = [describe_value(arg) for arg in args[1 if skip_first else 0:]]
+                inputs += [f"{key}={describe_value(value)}" for key, value in kwargs.items()]
+                return ', '.join(inputs)
+
+            with _Span(span_name, {}, describe):
+                return func(*args, **kwargs)
+        return wrapper
+
+    if callable(name):
+        func, name = name, None
+        return decorate(func)
+    return decorate
+
+
+def increment(name, amount=1):
+    """
+    카운터를 증가시킵니다. (측정 설정과 관계없이 항상 집계)
+    점수 계산처럼 자주 불리는 곳에서도 쓰이므로 잠금 없이 더합니다.
+    여러 스레드가 정확히 같은 순간에 더하면 드물게 1건이 빠질 수 있지만 값이 줄어들지는 않습니다.
+    """
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def cache_lookup(cache):
+    """캐시 조회 1건을 기록합니다. 조회 함수(캐시 바깥)에서 호출합니다."""
+    increment(f"cache.{cache}.lookups")
+
+
+def cache_miss(cache):
+    """캐시 적중 실패 1건을 기록합니다. 실제로 값을 계산하는 곳(캐시 안쪽)에서 호출합니다."""
+    increment(f"cache.{cache}.misses")
+
+
+def counters():
+    return dict(_counters)
+
+
+def cache_stats():
+    """캐시별 {'lookups', 'misses', 'hit_rate'} (조회가 없으면 hit_rate는 None)"""
+    snapshot = counters()
+    names = list(CACHE_NAMES) + sorted({key.split('.')[1] for key in snapshot if key.startswith('cache.')} - set(CACHE_NAMES))
+    stats = {}
+    for cache in names:
+        lookups = snapshot.get(f"cache.{cache}.lookups", 0)
+        misses = min(snapshot.get(f"cache.{cache}.misses", 0), lookups)
+        stats[cache] = {
+            'lookups': lookups,
+            'misses': misses,
+            'hit_rate': (lookups - misses) / lookups if lookups else None,
+        }
+    return stats
+
+
+class inflight:
+    """with 문 안에서 실행 중인 작업 수를 name 게이지로 집계합니다. (예: 진행 중인 PDF 내보내기 수)"""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        with _lock:
+            _gauges[self.name] = _gauges.get(self.name, 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with _lock:
+            _gauges[self.name] -= 1
+        return False
+
+
+def gauges():
+    with _lock:
+        return dict(_gauges)
+
+
+def slow_operations():
+    """느린 작업 기록 (최근 순)"""
+    with _lock:
+        return list(reversed(_slow))
+
+
+def active_sessions():
+    """
+    Streamlit 서버에 연결된 세션 목록을 반환합니다.
+    [(session_id, 스크립트 실행 횟수, session_state)] / 서버 밖(테스트 등)에서는 빈 목록
+    """
+    if streamlit_runtime is None or not streamlit_runtime.exists():
+        return []
+    try:
+        # 세션 관리자는 공개 API가 아니므로, 구조가 바뀐 버전에서는 빈 목록으로 처리합니다.
+        infos = streamlit_runtime.get_instance()._session_mgr.list_active_sessions()
+        return [(info.session.id, info.script_run_count, info.session.session_state) for info in infos]
+    except (AttributeError, RuntimeError):
+        return []
+
+
+def session_state_bytes(session_state):
+    """Streamlit이 집계하는 세션 상태 크기 (바이트)"""
+    try:
+        return sum(stat.byte_length for stat in session_state.get_stats())
+    except Exception:
+        return None
+
+
+def process_memory_bytes():
+    """현재 프로세스의 상주 메모리(RSS) 크기. 확인할 수 없으면 None"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def process_summary():
+    """프로세스 전체의 이름별 집계 {name: summary}"""
+    with _lock:
+        return {name: h.summary() for name, h in _process_stats.histograms.items()}
+
+
+def session_summary(session_id=None):
+    """세션별 이름별 집계 {name: summary} (session_id를 생략하면 현재 세션)"""
+    session_id = session_id or current_session_id()
+    with _lock:
+        stats = _session_stats.get(session_id)
+        return {name: h.summary() for name, h in stats.histograms.items()} if stats else {}
+
+
+def sessions():
+    """집계가 있는 세션 목록 [(session_id, 마지막 측정 시각)] (최근 순)"""
+    with _lock:
+        return [(session_id, stats.last_seen) for session_id, stats in reversed(_session_stats.items())]
+
+
+def recent_spans(limit=None):
+    with _lock:
+        records = list(_recent)
+    return records[-limit:] if limit else records
+
+
+def to_jsonl(records=None):
+    """최근 span(또는 지정한 records)을 JSONL 문자열로 만듭니다."""
+    records = recent_spans() if records is None else records
+    return ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in records)
+
+
+def export_jsonl(path, records=None):
+    """최근 span(또는 지정한 records)을 JSONL 추적 파일로 저장하고 기록 수를 반환합니다."""
+    records = recent_spans() if records is None else records
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(to_jsonl(records))
+    return len(records)
+
+
+def reset():
+    """span 집계와 최근/느린 작업 기록을 모두 지웁니다. (카운터와 게이지는 유지)"""
+    with _lock:
+        _process_stats.histograms.clear()
+        _session_stats.clear()
+        _recent.clear()
+        _slow.clear()
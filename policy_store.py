@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Policy Store: 세션 간 공유되는 읽기 전용 정책 DB와 세션별 변경분(overlay) 관리
+import sys
+import pandas as pd
+import streamlit as st
+from data_watcher import data_version
+from m1 import DataManager
+from perf import cache_lookup, cache_miss
+from storage import to_editable
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_shared_policy_db(data_dir, version):
+    """
+    데이터 버전별로 정책 DB를 한 번만 읽어 모든 세션이 같은 객체를 공유합니다.
+    다른 워커가 이미 읽은 버전이면 디스크 캐시에서 가져옵니다.
+    """
+    cache_miss('data')
+    return DataManager().load_policy_data_shared()
+
+
+def get_shared_policy_db():
+    """
+    모든 세션이 공유하는 정책 DB를 반환합니다.
+    반환된 DataFrame은 읽기 전용으로 취급해야 하며, 세션별 변경은 PolicyOverlay에 기록합니다.
+    """
+    dm = DataManager()
+    cache_lookup('data')
+    return _load_shared_policy_db(dm.data_dir, data_version(dm.data_dir))
+
+
+class PolicyOverlay:
+    """
+    세션별 정책 DB 변경분입니다.
+    공유 DB의 인덱스를 키로 하여 변경된 값(활성화 여부, 셀 편집)만 보관하므로
+    메모리 사용량은 카탈로그 크기가 아니라 편집 건수에 비례합니다.
+    """
+    EDITABLE_COLUMNS = ['category', 'name', 'cost', 'process']
+
+    def __init__(self):
+        self.active = {}  # {index: bool}
+        self.edits = {}   # {index: {column: value}}
+
+    def clear(self):
+        self.active.clear()
+        self.edits.clear()
+
+    def set_active_by_names(self, base_df, names):
+        """불러온 시나리오의 활성 과제명 목록을 base_df 행 기준 활성화 플래그로 기록합니다."""
+        names = set(names)
+        for idx, name in base_df['name'].items():
+            self.active[idx] = name in names
+
+    def apply(self, base_df):
+        """
+        base_df(공유 DB의 부분 집합)에 세션 변경분을 적용한 사본을 반환합니다.
+        사본은 화면에 표시되는 행에 대해서만 만들어집니다.
+        """
+        # 범주형(Categorical) 컬럼에도 새 값을 입력할 수 있도록 일반 컬럼으로 바꾼 사본을 만듭니다.
+        df = to_editable(base_df.copy())
+        if 'active' not in df.columns:
+            df['active'] = False
+        df['active'] = df['active'].astype(bool)
+
+        for idx, flag in self.active.items():
+            if idx in df.index:
+                df.at[idx, 'active'] = flag
+        for idx, changes in self.edits.items():
+            if idx in df.index:
+                for col, value in changes.items():
+                    if col in df.columns:
+                        df.at[idx, col] = value
+        return df
+
+    def record_editor_result(self, base_df, edited_df):
+        """
+        data_editor 결과를 공유 DB와 비교해 달라진 값만 기록합니다.
+        공유 DB와 같아진 값은 변경분에서 제거합니다.
+        """
+        if edited_df is None or edited_df.empty:
+            return
+        base_active = base_df['active'] if 'active' in base_df.columns else None
+
+        for idx, row in edited_df.iterrows():
+            if idx not in base_df.index:
+                continue
+            if 'active' in edited_df.columns:
+                default_flag = bool(base_active.at[idx]) if base_active is not None else False
+                flag = bool(row['active'])
+                if flag == default_flag:
+                    self.active.pop(idx, None)
+                else:
+                    self.active[idx] = flag
+
+            changes = self.edits.get(idx, {})
+            for col in self.EDITABLE_COLUMNS:
+                if col not in edited_df.columns or col not in base_df.columns:
+                    continue
+                new_value = row[col]
+                base_value = base_df.at[idx, col]
+                if (pd.isna(new_value) and pd.isna(base_value)) or new_value == base_value:
+                    changes.pop(col, None)
+                else:
+                    changes[col] = new_value
+            if changes:
+                self.edits[idx] = changes
+            else:
+                self.edits.pop(idx, None)
+
+    def memory_usage(self):
+        """변경분이 차지하는 대략적인 메모리(바이트)를 계산합니다."""
+        total = sys.getsizeof(self.active) + sys.getsizeof(self.edits)
+        for changes in self.edits.values():
+            total += sys.getsizeof(changes)
+            total += sum(sys.getsizeof(v) for v in changes.values())
+        return total
+
+
+def session_memory_report(session_state=None):
+    """
+    현재 세션의 정책 데이터 메모리 사용량을 반환합니다.
+    - shared_bytes: 모든 세션이 공유하는 정책 DB (세션 수와 무관하게 1벌)
+    - overlay_bytes: 이 세션의 변경분
+    """
+    session_state = session_state if session_state is not None else st.session_state
+    shared_df = get_shared_policy_db()
+    overlay = session_state.get('policy_overlay')
+
+    overlay_bytes = overlay.memory_usage() if overlay is not None else 0
+    return {
+        'shared_rows': len(shared_df),
+        'shared_bytes': int(shared_df.memory_usage(deep=True).sum()),
+        'overlay_active_flags': len(overlay.active) if overlay is not None else 0,
+        'overlay_edited_rows': len(overlay.edits) if overlay is not None else 0,
+        'overlay_bytes': overlay_bytes,
+    }
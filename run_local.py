@@ -1,11 +1,14 @@
 import sys
 import os
 import multiprocessing
-import time # Added for time.sleep
+import threading
 import traceback # Added for printing full traceback
+import webbrowser
 
 import socket
 
+from health_check import ServerStartError, startup_timeout, wait_for_server
+
 def find_free_port():
     """Find a free port on localhost."""
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
@@ -22,6 +25,33 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+def pause_before_exit():
+    """Keep the console window open after an error until the user has read it."""
+    if sys.stdin is not None and sys.stdin.isatty():
+        try:
+            input("--- Press Enter to close this window ---")
+        except EOFError:
+            pass
+
+def watch_startup(port):
+    """
+    Poll Streamlit's health endpoint (with backoff) while stcli.main() runs in the main thread.
+    Opens the browser as soon as the server is ready, or exits with a diagnostic on timeout.
+    """
+    try:
+        elapsed = wait_for_server(port)
+    except ServerStartError as e:
+        print("--- THE STREAMLIT SERVER DID NOT BECOME READY ---")
+        print(f"Error Details: {e}")
+        print(f"Timeout: {startup_timeout():.0f}s (set RAILWAY_STARTUP_TIMEOUT to change it)")
+        pause_before_exit()
+        os._exit(1)
+    print(f"--- Server ready in {elapsed:.2f}s: http://localhost:{port} ---")
+    # Warm up heavy modules and caches in this (server) process before the first page is requested.
+    import warmup
+    warmup.start()
+    webbrowser.open(f"http://localhost:{port}")
+
 # --- Add GTK to DLL search path (for WeasyPrint) ---
 # This ensures that the GTK DLLs are found when running from source (e.g., in VS Code)
 # or when packaged. This is the recommended way for Python 3.8+ on Windows.
@@ -69,16 +99,22 @@ if __name__ == '__main__':
             "--server.headless", "true",
         ]
 
+        # Open the browser once the health endpoint answers (no fixed sleep).
+        threading.Thread(target=watch_startup, args=(port,), name="startup-watch", daemon=True).start()
+
         # We then call Streamlit's main function directly.
         stcli.main()
 
+    except SystemExit as e:
+        # stcli.main() always ends with SystemExit; only a non-zero code is an error.
+        if e.code not in (None, 0):
+            print(f"--- Streamlit exited with code {e.code} ---")
+            pause_before_exit()
     except BaseException as e:
         print("--- AN ERROR OCCURRED IN THE LAUNCHER ---")
         print(f"Error Type: {type(e)}")
         print(f"Error Details: {e}")
         traceback.print_exc() # Print full traceback for more details
+        pause_before_exit()
     finally:
-        print("\n--- Launcher has finished or encountered an error. ---")
-        print("--- Keeping window open for 10 seconds to read messages ---")
-        time.sleep(10) # Keep console window open for 10 seconds
         print("--- Exiting ---")
\ No newline at end of file
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# Scenario Compare: 여러 시나리오의 현재/예측/목표 값과 만족도를 한 번에 계산하는 비교 엔진
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from m1 import DataManager
+from m2 import SatisfactionCalculator
+
+# 환승시설 편의성은 성과지표 값이 곧 만족도 점수입니다.
+SCORE_IS_VALUE_KPIS = ["환승시설 편의성"]
+
+_NUMERIC_KEYS = [
+    'input_val_1', 'input_val_2', 'input_val_3', 'input_minute',
+    'target_year_input', 'target_month_input', 'predict_score',
+    'future_goal_score_input', 'future_goal_kpi_input',
+]
+
+
+def _numeric(df, column):
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+
+
+def current_kpi_values(df):
+    """
+    시나리오 입력값으로 현재 성과지표 값을 계산합니다.
+    접근 교통수단(PAI)과 환승 거리(TCI)는 시나리오 파일에 저장되지 않으므로 NaN입니다.
+    """
+    val1, val2, val3 = _numeric(df, 'input_val_1'), _numeric(df, 'input_val_2'), _numeric(df, 'input_val_3')
+    minutes = _numeric(df, 'input_minute')
+    # 표정속도의 소요 시간은 분 입력이 있으면 그것을 시간으로 바꿔 사용합니다.
+    kpi = df['target_kpi'].to_numpy(dtype=object)
+    val2 = np.where((kpi == "표정속도") & ~np.isnan(minutes), minutes / 60.0, val2)
+    return indicators.kpi_values(kpi, val1, val2, val3)
+
+
+def _feasible_policy_counts(df, policy_df, now):
+    """목표 시점까지 남은 개월 수 안에 끝낼 수 있는 관련 추진과제 수를 성과지표별로 계산합니다."""
+    counts = np.zeros(len(df), dtype=int)
+    if policy_df is None or policy_df.empty or 'related_kpi' not in policy_df.columns:
+        return counts
+
+    months_left = (_numeric(df, 'target_year_input') * 12 + _numeric(df, 'target_month_input')) - (now.year * 12 + now.month)
+    kpis = df['target_kpi'].to_numpy(dtype=object)
+    durations_all = pd.to_numeric(policy_df['duration_months'], errors='coerce')
+
+    for kpi in pd.unique(kpis):
+        mask = kpis == kpi
+        related = policy_df['related_kpi'].str.contains(str(kpi), na=False, regex=False)
+        durations = np.sort(durations_all[related].dropna().to_numpy())
+        left = np.nan_to_num(months_left[mask], nan=-1)
+        counts[mask] = np.searchsorted(durations, left, side='right')
+    return counts
+
+
+def compare_scenarios(scenarios, config, policy_df=None, now=None):
+    """
+    여러 시나리오를 비교합니다.
+    scenarios: [(이름, 시나리오 값 dict), ...]
+    반환값: 목표 대비 부족한 만족도가 큰 순서로 정렬된 DataFrame
+    """
+    now = now or datetime.now()
+    if not scenarios:
+        return pd.DataFrame()
+
+    df = pd.DataFrame([values for _, values in scenarios])
+    df.insert(0, 'name', [name for name, _ in scenarios])
+    for column in ['target_kpi', 'rail_type', 'goal_input_method', 'line_name'] + _NUMERIC_KEYS:
+        if column not in df.columns:
+            df[column] = None
+
+    calc = SatisfactionCalculator(config)
+    current_val = current_kpi_values(df)
+    predict_score = _numeric(df, 'predict_score')
+    goal_score = _numeric(df, 'future_goal_score_input')
+    goal_kpi_input = _numeric(df, 'future_goal_kpi_input')
+    use_kpi_goal = (df['goal_input_method'] == '성과지표').to_numpy() & ~np.isnan(goal_kpi_input)
+
+    current_score = np.full(len(df), np.nan)
+    predict_val = np.full(len(df), np.nan)
+    goal_val = np.full(len(df), np.nan)
+
+    # (철도 유형, 성과지표) 그룹마다 계수를 한 번 조회하고 배열 단위로 계산합니다.
+    for (rail_type, kpi), index in df.groupby(['rail_type', 'target_kpi'], sort=False).indices.items():
+        if kpi in SCORE_IS_VALUE_KPIS:
+            predict_val[index] = predict_score[index]
+            goal_val[index] = goal_score[index]
+            continue
+        metric = DataManager.KPI_ABBREVIATIONS.get(kpi, kpi)
+        try:
+            current_score[index] = calc.calculate_satisfaction_array(rail_type, metric, current_val[index])
+            predict_val[index] = calc.reverse_calculate_value_array(rail_type, metric, predict_score[index])
+            goal_val[index] = calc.reverse_calculate_value_array(rail_type, metric, goal_score[index])
+        except ValueError:
+            # 계수가 없는 조합은 NaN으로 남깁니다.
+            continue
+
+    goal_val = np.where(use_kpi_goal, goal_kpi_input, goal_val)
+
+    result = pd.DataFrame({
+        'name': df['name'],
+        'line_name': df['line_name'],
+        'rail_type': df['rail_type'],
+        'target_kpi': df['target_kpi'],
+        'target_year': _numeric(df, 'target_year_input'),
+        'target_month': _numeric(df, 'target_month_input'),
+        'current_val': current_val,
+        'current_score': current_score,
+        'predict_val': predict_val,
+        'predict_score': predict_score,
+        'goal_val': goal_val,
+        'goal_score': goal_score,
+    })
+    result['score_gap'] = result['goal_score'] - result['predict_score']
+    result['value_gap'] = result['goal_val'] - result['predict_val']
+    result['is_fail'] = result['predict_score'] < result['goal_score']
+    result['feasible_policies'] = _feasible_policy_counts(df, policy_df, now)
+
+    result = result.sort_values('score_gap', ascending=False, na_position='last', kind='stable').reset_index(drop=True)
+    result.insert(0, 'rank', np.arange(1, len(result) + 1))
+    return result
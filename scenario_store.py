@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+# Scenario Store: SQLite 기반 시나리오 라이브러리 (저장, 일괄 가져오기, 검색)
+# 실행: python scenario_store.py import <폴더 또는 CSV 파일...>
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from ingest import decode_text
+
+DEFAULT_DB_PATH = os.path.join("data", "scenarios.db")
+
+# 시나리오 CSV(key/value)로 저장되는 세션 상태 키
+SCENARIO_KEYS = [
+    'target_kpi', 'rail_type', 'line_name', 'station_name_input', 'start_station_input',
+    'end_station_input', 'line_section_input', 'line_length_input', 'input_val_1', 'input_val_2',
+    'input_minute', 'future_input_val_1', 'future_input_val_2', 'future_input_minute',
+    'target_year_input', 'target_month_input', 'future_goal_score_input', 'predict_score',
+    'goal_input_method', 'use_current_elements_for_future',
+    # 경제적 접근성의 주차 비용과 성과지표 기준 목표값도 함께 저장해야 불러온 시나리오가 그대로 재현됩니다.
+    'input_val_3', 'future_input_val_3', 'future_goal_kpi_input'
+]
+
+# 검색/정렬에 사용하는 타입 컬럼: (DB 컬럼명, 시나리오 키, SQL 타입)
+_TYPED_COLUMNS = [
+    ('line_name', 'line_name', 'TEXT'),
+    ('rail_type', 'rail_type', 'TEXT'),
+    ('target_kpi', 'target_kpi', 'TEXT'),
+    ('target_year', 'target_year_input', 'INTEGER'),
+    ('target_month', 'target_month_input', 'INTEGER'),
+    ('station_name', 'station_name_input', 'TEXT'),
+    ('line_section', 'line_section_input', 'TEXT'),
+    ('line_length', 'line_length_input', 'REAL'),
+    ('predict_score', 'predict_score', 'REAL'),
+    ('future_goal_score', 'future_goal_score_input', 'REAL'),
+]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    {', '.join(f'{col} {sql_type}' for col, _, sql_type in _TYPED_COLUMNS)},
+    active_policy_names TEXT,
+    payload TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    source_path TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_line_name ON scenarios(line_name);
+CREATE INDEX IF NOT EXISTS idx_scenarios_rail_type ON scenarios(rail_type);
+CREATE INDEX IF NOT EXISTS idx_scenarios_target_kpi ON scenarios(target_kpi);
+CREATE INDEX IF NOT EXISTS idx_scenarios_target_year ON scenarios(target_year);
+"""
+
+
+# --- 시나리오 CSV 변환 함수 ---
+def convert_value(value):
+    """시나리오 CSV의 문자열 값을 원래 타입(None, int, float, bool, str)으로 복원합니다."""
+    if value in ['None', 'nan', ''] or pd.isna(value):
+        return None
+    try:
+        float_val = float(value)
+        return int(float_val) if float_val.is_integer() else float_val
+    except (ValueError, TypeError):
+        if str(value).lower() == 'true': return True
+        if str(value).lower() == 'false': return False
+        return value
+
+
+def parse_scenario_csv(source):
+    """
+    key/value 형식의 시나리오 CSV(파일 경로, 업로드 파일 또는 bytes)를 dict로 읽습니다.
+    'active_policy_names'는 과제명 리스트로 변환됩니다.
+    """
+    text, _ = decode_text(source)
+
+    # 파일 수천 개를 일괄로 가져올 때를 위해 pandas 대신 csv 모듈로 가볍게 읽습니다.
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if header is None or header[:2] != ['key', 'value']:
+        raise ValueError("시나리오 파일 형식이 아닙니다. (key, value 컬럼 필요)")
+
+    values = {}
+    for row in reader:
+        if not row:
+            continue
+        key, value = row[0], row[1] if len(row) > 1 else ''
+        if key == 'active_policy_names':
+            values[key] = [name for name in value.split(',') if name] if value else []
+        else:
+            values[key] = convert_value(value)
+    return values
+
+
+def scenario_to_csv_bytes(values):
+    """시나리오 dict를 기존 다운로드 형식과 같은 key/value CSV(utf-8-sig)로 변환합니다."""
+    state_to_save = {key: values.get(key) for key in SCENARIO_KEYS}
+    if values.get('active_policy_names') is not None:
+        state_to_save['active_policy_names'] = ','.join(values['active_policy_names'])
+    df_to_save = pd.DataFrame(state_to_save.items(), columns=['key', 'value'])
+    output = io.BytesIO()
+    df_to_save.to_csv(output, index=False, encoding='utf-8-sig')
+    return output.getvalue()
+
+
+def _to_sql_value(value, sql_type):
+    if value is None or value == '':
+        return None
+    try:
+        if sql_type == 'INTEGER':
+            return int(float(value))
+        if sql_type == 'REAL':
+            return float(value)
+    except (ValueError, TypeError):
+        return None
+    return str(value)
+
+
+class ScenarioStore:
+    """
+    시나리오 라이브러리입니다.
+    검색 대상 항목(노선명, 철도 유형, 성과지표, 목표연도 등)은 타입 컬럼과 인덱스로,
+    나머지 입력값은 payload(JSON)로 보관합니다. 같은 내용의 시나리오는 한 번만 저장됩니다.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # Streamlit은 rerun마다 다른 스레드에서 실행될 수 있으므로 작업마다 연결을 엽니다.
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _build_row(values, name, source_path=None):
+        payload = json.dumps({k: v for k, v in values.items()}, ensure_ascii=False, sort_keys=True, default=str)
+        content_hash = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        typed_values = [_to_sql_value(values.get(key), sql_type) for _, key, sql_type in _TYPED_COLUMNS]
+        active_names = values.get('active_policy_names') or []
+        return [name, *typed_values, ','.join(active_names), payload, content_hash,
+                source_path, datetime.now().isoformat(timespec='seconds')]
+
+    def _insert_sql(self):
+        columns = ['name', *[col for col, _, _ in _TYPED_COLUMNS], 'active_policy_names',
+                   'payload', 'content_hash', 'source_path', 'created_at']
+        placeholders = ', '.join('?' for _ in columns)
+        return f"INSERT OR IGNORE INTO scenarios ({', '.join(columns)}) VALUES ({placeholders})"
+
+    def save(self, values, name, source_path=None):
+        """시나리오 하나를 저장하고 id를 반환합니다. 이미 같은 내용이 있으면 기존 id를 반환합니다."""
+        row = self._build_row(values, name, source_path)
+        with self._connect() as conn:
+            conn.execute(self._insert_sql(), row)
+            found = conn.execute("SELECT id FROM scenarios WHERE content_hash = ?", (row[-3],)).fetchone()
+        return found[0] if found else None
+
+    def import_csv_files(self, paths):
+        """
+        여러 시나리오 CSV를 하나의 트랜잭션으로 가져옵니다.
+        paths에는 파일 경로 또는 (이름, bytes/파일 객체) 튜플을 넣을 수 있습니다.
+        반환값: {'imported': 새로 저장된 수, 'skipped': 중복 수, 'failed': [(이름, 오류)]}
+        """
+        rows, failed = [], []
+        for item in paths:
+            if isinstance(item, tuple):
+                name, source = item
+                source_path = None
+            else:
+                name, source, source_path = os.path.basename(item), item, os.path.abspath(item)
+            try:
+                rows.append(self._build_row(parse_scenario_csv(source), name, source_path))
+            except Exception as e:
+                failed.append((name, str(e)))
+
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(self._insert_sql(), rows)
+            imported = conn.total_changes - before
+        return {'imported': imported, 'skipped': len(rows) - imported, 'failed': failed}
+
+    def search(self, line_name=None, rail_type=None, target_kpi=None, year_from=None, year_to=None,
+               page=0, page_size=20):
+        """
+        조건에 맞는 시나리오를 최신순으로 페이지 단위 조회합니다.
+        반환값: (결과 DataFrame, 전체 건수)
+        """
+        conditions, params = [], []
+        if line_name:
+            conditions.append("line_name LIKE ?")
+            params.append(f"%{line_name}%")
+        if rail_type:
+            conditions.append("rail_type = ?")
+            params.append(rail_type)
+        if target_kpi:
+            conditions.append("target_kpi = ?")
+            params.append(target_kpi)
+        if year_from is not None:
+            conditions.append("target_year >= ?")
+            params.append(int(year_from))
+        if year_to is not None:
+            conditions.append("target_year <= ?")
+            params.append(int(year_to))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM scenarios {where}", params).fetchone()[0]
+            df = pd.read_sql_query(
+                f"SELECT id, name, line_name, rail_type, target_kpi, target_year, target_month, "
+                f"predict_score, future_goal_score, created_at FROM scenarios {where} "
+                f"ORDER BY id DESC LIMIT ? OFFSET ?",
+                conn, params=[*params, int(page_size), int(page) * int(page_size)]
+            )
+        return df, total
+
+    def load(self, scenario_id):
+        """저장된 시나리오의 (이름, 값 dict)를 반환합니다. 없으면 (None, None)."""
+        with self._connect() as conn:
+            found = conn.execute("SELECT name, payload FROM scenarios WHERE id = ?", (int(scenario_id),)).fetchone()
+        if not found:
+            return None, None
+        return found[0], json.loads(found[1])
+
+    def load_many(self, scenario_ids):
+        """여러 시나리오의 (id, 이름, 값 dict) 목록을 반환합니다."""
+        ids = [int(i) for i in scenario_ids]
+        if not ids:
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, name, payload FROM scenarios WHERE id IN ({', '.join('?' for _ in ids)})", ids
+            ).fetchall()
+        return [(row[0], row[1], json.loads(row[2])) for row in rows]
+
+    def delete(self, scenario_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scenarios WHERE id = ?", (int(scenario_id),))
+
+    def distinct_values(self, column):
+        """필터 선택지 구성을 위해 인덱스 컬럼의 고유값 목록을 반환합니다."""
+        if column not in ('line_name', 'rail_type', 'target_kpi', 'target_year'):
+            raise ValueError(f"지원하지 않는 컬럼: {column}")
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT DISTINCT {column} FROM scenarios WHERE {column} IS NOT NULL ORDER BY {column}").fetchall()
+        return [row[0] for row in rows]
+
+
+def _collect_csv_paths(targets):
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            for root, _, files in os.walk(target):
+                paths.extend(os.path.join(root, f) for f in files if f.lower().endswith('.csv'))
+        elif os.path.isfile(target):
+            paths.append(target)
+    return paths
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != 'import':
+        print("사용법: python scenario_store.py import <폴더 또는 CSV 파일...>")
+        sys.exit(1)
+
+    csv_paths = _collect_csv_paths(sys.argv[2:])
+    store = ScenarioStore()
+    start = datetime.now()
+    result = store.import_csv_files(csv_paths)
+    elapsed = (datetime.now() - start).total_seconds()
+    print(f"✅ {len(csv_paths)}개 파일 처리 ({elapsed:.2f}초): 신규 {result['imported']}건, 중복 {result['skipped']}건, 실패 {len(result['failed'])}건")
+    for name, error in result['failed']:
+        print(f"  ⚠️ {name}: {error}")
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+# Serve: 여러 Streamlit 워커 프로세스 + 고정 세션(sticky session) 로컬 리버스 프록시
+#
+# 실행: python serve.py [--workers N] [--port 8501] [--host 127.0.0.1] [--cache-dir data/cache]
+#
+# - 워커 N개(기본값: CPU 코어 수)를 빈 포트에서 실행하고, 프록시 하나가 --port에서 요청을 받습니다.
+# - 처음 접속한 브라우저에는 연결 수가 가장 적은 워커를 배정하고 쿠키(railway_worker)로 기억합니다.
+#   Streamlit 세션 상태, 업로드 파일, 웹소켓은 워커 프로세스 안에 있으므로 같은 브라우저는 항상 같은 워커로 보냅니다.
+# - HTTP keep-alive 연결과 웹소켓(/_stcore/stream)은 바이트 단위로 그대로 중계합니다.
+# - 워커가 종료되면 같은 포트로 다시 시작하고, 준비될 때까지 새 접속은 다른 워커로 보냅니다.
+# - 모든 워커는 RAILWAY_CACHE_DIR(--cache-dir)의 디스크 캐시를 함께 사용합니다.
+#   데이터 파일 쓰기는 atomic_io의 프로세스 간 잠금과 데이터 버전으로 워커 사이에서도 안전합니다.
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+from http.cookies import SimpleCookie
+
+from disk_cache import DIR_ENV as CACHE_DIR_ENV
+from health_check import ServerStartError, wait_for_server
+from run_local import find_free_port
+
+COOKIE_NAME = "railway_worker"
+MAX_HEAD_BYTES = 64 * 1024
+RESTART_DELAY = 1.0
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Worker:
+    """Streamlit 워커 프로세스 하나"""
+
+    def __init__(self, index, port, env):
+        self.index = index
+        self.port = port
+        self.env = env
+        self.process = None
+        self.ready = False
+        self.connections = 0
+
+    def start(self):
+        cmd = [
+            sys.executable, "-m", "streamlit", "run", os.path.join(BASE_DIR, "m3.py"),
+            "--server.port", str(self.port),
+            "--server.address", "127.0.0.1",
+            "--server.headless", "true",
+            "--global.developmentMode", "false",
+        ]
+        self.ready = False
+        self.process = subprocess.Popen(cmd, cwd=BASE_DIR, env=self.env)
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def worker_env(index, cache_dir):
+    """워커별 환경 변수. 지표 exporter 포트/파일은 워커마다 달라야 하므로 번호를 붙입니다."""
+    env = dict(os.environ)
+    env[CACHE_DIR_ENV] = cache_dir
+    if env.get("RAILWAY_METRICS_PORT"):
+        env["RAILWAY_METRICS_PORT"] = str(int(env["RAILWAY_METRICS_PORT"]) + index)
+    if env.get("RAILWAY_METRICS_FILE"):
+        root, ext = os.path.splitext(env["RAILWAY_METRICS_FILE"])
+        env["RAILWAY_METRICS_FILE"] = f"{root}.worker{index}{ext}"
+    return env
+
+
+class StickyProxy:
+    def __init__(self, workers):
+        self.workers = workers
+        self._next = 0
+
+    def _pick_new(self):
+        """쿠키가 없거나 배정된 워커가 준비되지 않은 경우: 연결 수가 가장 적은 준비된 워커"""
+        ready = [w for w in self.workers if w.ready]
+        if not ready:
+            return None
+        self._next = (self._next + 1) % len(ready)
+        rotated = ready[self._next:] + ready[:self._next]  # 연결 수가 같으면 돌아가며 배정
+        return min(rotated, key=lambda w: w.connections)
+
+    def _worker_from_cookie(self, headers):
+        for name, value in headers:
+            if name.lower() != 'cookie':
+                continue
+            cookie = SimpleCookie()
+            try:
+                cookie.load(value)
+            except Exception:
+                continue
+            morsel = cookie.get(COOKIE_NAME)
+            if morsel is not None and morsel.value.isdigit():
+                index = int(morsel.value)
+                if index < len(self.workers) and self.workers[index].ready:
+                    return self.workers[index]
+        return None
+
+    async def handle(self, client_reader, client_writer):
+        try:
+            head = await client_reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            client_writer.close()
+            return
+
+        lines = head.decode('latin-1').split("\r\n")
+        headers = [tuple(part.strip() for part in line.split(':', 1)) for line in lines[1:] if ':' in line]
+        worker = self._worker_from_cookie(headers)
+        assign_cookie = worker is None
+        if worker is None:
+            worker = self._pick_new()
+        if worker is None:
+            client_writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nRetry-After: 2\r\nConnection: close\r\n\r\n")
+            await client_writer.drain()
+            client_writer.close()
+            return
+
+        try:
+            backend_reader, backend_writer = await asyncio.open_connection('127.0.0.1', worker.port)
+        except OSError:
+            worker.ready = False
+            client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await client_writer.drain()
+            client_writer.close()
+            return
+
+        if assign_cookie:
+            head = self._close_after_response(lines, headers)
+
+        worker.connections += 1
+        try:
+            backend_writer.write(head)
+            await backend_writer.drain()
+            response_task = self._relay_response(backend_reader, client_writer, worker.index if assign_cookie else None)
+            await asyncio.gather(self._pipe(client_reader, backend_writer), response_task)
+        finally:
+            worker.connections -= 1
+            for writer in (backend_writer, client_writer):
+                writer.close()
+
+    @staticmethod
+    def _close_after_response(lines, headers):
+        """
+        쿠키가 아직 없는 요청은 응답 하나만 받고 연결을 닫도록 바꿉니다.
+        keep-alive 연결이 배정 전 워커에 묶여, 쿠키가 정해진 뒤의 요청(업로드 등)이 다른 워커로 가는 일을 막습니다.
+        웹소켓 업그레이드 요청은 그대로 둡니다.
+        """
+        if any(name.lower() == 'upgrade' for name, _ in headers):
+            return '\r\n'.join(lines).encode('latin-1')
+        kept = [line for line in lines[1:] if line and line.split(':', 1)[0].strip().lower() not in ('connection', 'keep-alive')]
+        return '\r\n'.join([lines[0]] + kept + ['Connection: close', '', '']).encode('latin-1')
+
+    async def _relay_response(self, backend_reader, client_writer, cookie_index):
+        """첫 응답 헤더에 워커 쿠키를 넣은 뒤 나머지는 그대로 중계합니다."""
+        if cookie_index is not None:
+            try:
+                head = await backend_reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            cookie = f"Set-Cookie: {COOKIE_NAME}={cookie_index}; Path=/; HttpOnly; SameSite=Lax\r\n".encode()
+            client_writer.write(head[:-2] + cookie + b"\r\n")
+        await self._pipe(backend_reader, client_writer)
+
+    @staticmethod
+    async def _pipe(reader, writer):
+        try:
+            while True:
+                data = await reader.read(64 * 1024)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            if writer.can_write_eof():
+                try:
+                    writer.write_eof()
+                except (OSError, RuntimeError):
+                    pass
+
+
+async def supervise(worker):
+    """워커를 시작하고, 준비 여부를 확인하며, 종료되면 다시 시작합니다."""
+    while True:
+        worker.start()
+        try:
+            elapsed = await asyncio.to_thread(wait_for_server, worker.port, exit_code=worker.process.poll)
+            worker.ready = True
+            logging.info(f"워커 {worker.index} 준비 완료 (포트 {worker.port}, {elapsed:.2f}초)")
+        except ServerStartError as e:
+            logging.error(f"워커 {worker.index} 시작 실패: {e}")
+        code = await asyncio.to_thread(worker.process.wait)
+        worker.ready = False
+        logging.warning(f"워커 {worker.index} 종료 (종료 코드 {code}), {RESTART_DELAY:.0f}초 후 다시 시작합니다.")
+        await asyncio.sleep(RESTART_DELAY)
+
+
+async def serve(worker_count, host, port, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    workers = [Worker(i, find_free_port(), worker_env(i, cache_dir)) for i in range(worker_count)]
+    proxy = StickyProxy(workers)
+    server = await asyncio.start_server(proxy.handle, host, port, limit=MAX_HEAD_BYTES)
+    logging.info(f"프록시 시작: http://{host}:{port} (워커 {worker_count}개, 캐시 폴더 {cache_dir})")
+    supervisors = [asyncio.create_task(supervise(w)) for w in workers]
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for task in supervisors:
+            task.cancel()
+        for worker in workers:
+            worker.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 Streamlit 워커를 고정 세션 프록시 뒤에서 실행합니다.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="워커 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8501)
+    parser.add_argument('--cache-dir', default=os.environ.get(CACHE_DIR_ENV, os.path.join(BASE_DIR, 'data', 'cache')))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(serve(max(1, args.workers), args.host, args.port, os.path.abspath(args.cache_dir)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
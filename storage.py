@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Storage: 정책 DB, 만족도 계수, 설문조사 데이터를 CSV 또는 Parquet(열 기반) 형식으로 저장하는 백엔드
+#
+# - 저장 형식은 환경 변수 RAILWAY_DATA_FORMAT 으로 선택합니다. ('csv' 기본값, 'parquet')
+# - Parquet는 데이터셋별 명시적 스키마로 저장하며, 반복되는 범주 값(rail_type, kpi, category 등)은
+#   사전 인코딩(dictionary encoding)하여 읽을 때 pandas Categorical로 복원됩니다.
+#   (추진 절차, 관련 성과지표처럼 몇 가지 값이 반복되는 문자열 컬럼도 같은 방식으로 저장합니다)
+# - 원본 데이터(data/*.csv)는 그대로 CSV로 유지되며, 아래 명령으로 서로 변환할 수 있습니다.
+#     python storage.py import <입력.csv> <출력.parquet> --dataset policy|coefficients|survey
+#     python storage.py export <입력.parquet> <출력.csv> --dataset policy|coefficients|survey
+import argparse
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ingest import read_table
+
+FORMAT_ENV = "RAILWAY_DATA_FORMAT"
+FORMAT_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet'}
+
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMAS = {
+    'policy': pa.schema([
+        ('active', pa.bool_()),
+        ('category', _CATEGORY),
+        ('name', pa.string()),
+        ('cost', pa.string()),
+        ('duration_months', pa.int32()),
+        ('process', _CATEGORY),
+        ('related_kpi', _CATEGORY),
+    ]),
+    'coefficients': pa.schema([
+        ('rail_type', _CATEGORY),
+        ('kpi', _CATEGORY),
+        ('model_type', _CATEGORY),
+        ('param1_name', _CATEGORY),
+        ('param1_value', pa.float64()),
+        ('param2_name', _CATEGORY),
+        ('param2_value', pa.float64()),
+        ('R_squared', pa.float64()),
+    ]),
+    # 설문조사 결과 양식 + 여러 설문을 하나로 묶어 보관할 때의 구분 컬럼
+    'survey': pa.schema([
+        ('respond_ID', pa.string()),
+        ('rail_type', _CATEGORY),
+        ('kpi', _CATEGORY),
+        ('KPI', pa.float64()),
+        ('Satisfaction', pa.float64()),
+    ]),
+}
+
+# CSV로 내보낼 때의 구분자 (coefficients.csv는 탭으로 구분됩니다)
+CSV_SEPARATORS = {'policy': ',', 'coefficients': '\t', 'survey': ','}
+
+
+def configured_format():
+    """환경 변수에 설정된 저장 형식을 반환합니다."""
+    data_format = os.environ.get(FORMAT_ENV, 'csv').strip().lower()
+    if data_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"지원하지 않는 저장 형식: {data_format} (csv 또는 parquet)")
+    return data_format
+
+
+def is_parquet(path):
+    return str(path).lower().endswith('.parquet')
+
+
+def _to_arrow(series, arrow_type):
+    """pandas 컬럼을 스키마에 지정된 Arrow 타입으로 변환합니다."""
+    if pa.types.is_dictionary(arrow_type):
+        values = pa.array(series.astype('string'), from_pandas=True)
+        return values.dictionary_encode().cast(arrow_type)
+    if pa.types.is_string(arrow_type):
+        return pa.array(series.astype('string'), from_pandas=True)
+    if pa.types.is_boolean(arrow_type):
+        return pa.array(series.astype('boolean'), from_pandas=True)
+    numeric = pd.to_numeric(series, errors='coerce')
+    return pa.array(numeric, from_pandas=True).cast(arrow_type)
+
+
+def to_arrow_table(df, dataset):
+    """스키마에 있는 컬럼은 지정된 타입으로, 없는 컬럼은 추론된 타입으로 Arrow 테이블을 만듭니다."""
+    schema = SCHEMAS[dataset]
+    arrays, fields = [], []
+    for col in df.columns:
+        if col in schema.names:
+            field = schema.field(col)
+            arrays.append(_to_arrow(df[col], field.type))
+        else:
+            arrays.append(pa.array(df[col], from_pandas=True))
+            field = pa.field(col, arrays[-1].type)
+        fields.append(field)
+    metadata = {b'railway_dataset': dataset.encode()}
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields, metadata=metadata))
+
+
+def write_parquet(df, path, dataset):
+    pq.write_table(to_arrow_table(df, dataset), path, compression='zstd')
+
+
+def read_parquet(path, columns=None):
+    """Parquet 파일을 읽습니다. 사전 인코딩된 컬럼은 pandas Categorical로 복원됩니다."""
+    return pq.read_table(path, columns=columns).to_pandas()
+
+
+def to_editable(df):
+    """
+    Categorical 컬럼을 일반 문자열 컬럼으로 바꾼 사본을 반환합니다.
+    편집 화면에서 기존 범주에 없는 값을 입력할 수 있도록 할 때 사용합니다.
+    """
+    categorical = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if not categorical:
+        return df
+    editable = df.astype({col: object for col in categorical})
+    editable.attrs = dict(df.attrs)
+    return editable
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV <-> Parquet 데이터 변환")
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('source')
+    parser.add_argument('target')
+    parser.add_argument('--dataset', choices=list(SCHEMAS.keys()), required=True)
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        write_parquet(read_table(args.source), args.target, args.dataset)
+    else:
+        read_parquet(args.source).to_csv(args.target, index=False, encoding='utf-8', sep=CSV_SEPARATORS[args.dataset])
+    print(f"✅ 변환 완료: {args.source} -> {args.target}")
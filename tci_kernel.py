@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# TCI Kernel: 환승시설 편의성(TCI) 수단별 항의 배열 계산 (numpy만 사용)
+#
+# 사용자 화면의 점수 계산(m2)과 계수 추정(fitting)이 같은 식을 쓰도록 분리했습니다.
+# m2가 이 모듈만 가져오므로 사용자 화면을 띄울 때 scipy와 피팅 엔진을 읽지 않습니다.
+#   g_ij = 1 (d_ij = 0),  1 - exp(-c_j / d_ij) (d_ij > 0),  0 (이용하지 않은 수단: NaN)
+import numpy as np
+
+EXP_LIMIT = 700.0  # exp 오버플로우 방지 (fitting.EXP_LIMIT와 같음)
+
+
+def tci_arrays(D):
+    """거리 행렬에서 고정된 배열: 이용 여부, 거리 0 여부, 1/d (그 밖에는 0)"""
+    used = np.isfinite(D)
+    zero = used & (D == 0)
+    positive = used & (D > 0)
+    U = np.zeros_like(D)
+    np.divide(1.0, D, out=U, where=positive)
+    return used, zero, U
+
+
+def tci_terms(c, D=None, arrays=None):
+    """
+    수단별 항 g_ij와 exp(-c_j / d_ij) 행렬 (배열 연산)
+    - 거리 0: g = 1, 이용하지 않은 수단: g = 0
+    """
+    used, zero, U = arrays if arrays is not None else tci_arrays(np.asarray(D, dtype=float))
+    E = np.exp(-np.minimum(np.asarray(c, dtype=float)[None, :] * U, EXP_LIMIT))
+    G = np.where(zero, 1.0, np.where(used, 1.0 - E, 0.0))
+    return G, E
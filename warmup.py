@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Warmup: 서버 시작 직후 무거운 모듈과 데이터를 백그라운드 스레드에서 미리 준비합니다.
+#
+# 첫 사용자가 PDF를 내보내거나, 관리자가 처음 계수를 산출하거나, 첫 화면을 열 때 치르던
+# 모듈 임포트(WeasyPrint, vl-convert, Altair, SciPy), 파일 파싱, 이미지 인코딩 비용을 미리 치러
+# 첫 상호작용도 평소와 같은 속도가 되도록 합니다. 화면 그리기를 막지 않도록 daemon 스레드에서 실행됩니다.
+# - 환경 변수 RAILWAY_WARMUP=0 으로 끌 수 있습니다.
+# - 캐시(st.cache_*)를 채우는 단계가 있으므로 Streamlit 서버가 실행된 뒤에 start()를 호출해야 합니다.
+import logging
+import os
+import threading
+import time
+
+import perf
+
+ENABLE_ENV = "RAILWAY_WARMUP"
+
+_started = False
+_start_lock = threading.Lock()
+_results = {}  # {단계 이름: {'ok': bool, 'seconds': float, 'error': str|None}}
+
+
+def _imports():
+    import altair  # noqa: F401
+    import scipy.optimize  # noqa: F401
+    import vl_convert  # noqa: F401
+    import weasyprint  # noqa: F401
+
+
+def _landing_assets():
+    from m3_2 import get_base64_of_bin_file
+    for path in ("railway_background.png", "logo.jpg"):
+        if os.path.exists(path):
+            get_base64_of_bin_file(path)
+
+
+def _coefficients():
+    from m1 import DataManager
+    DataManager().load_coefficients_cached()
+
+
+def _policy_db():
+    from policy_store import get_shared_policy_db
+    get_shared_policy_db()
+
+
+def _curve_fit():
+    import numpy as np
+    import fitting
+    x = np.linspace(1, 50, 20)
+    fitting.fit('B_free', x, 10 / (1 + np.exp(0.1 * (x - 25))))
+
+
+def _chart():
+    import altair as alt
+    import pandas as pd
+    from m5 import PdfGenerator
+    chart = alt.Chart(pd.DataFrame({'시점': ['현재', '목표'], '값': [1.0, 2.0]})).mark_line(point=True).encode(x='시점', y='값')
+    if PdfGenerator()._chart_to_base64_svg(chart) is None:
+        raise RuntimeError("차트를 SVG로 변환하지 못했습니다.")
+
+
+def _pdf():
+    from weasyprint import HTML
+    # 보고서와 같은 글꼴을 지정해 글꼴 검색 결과도 미리 캐시되도록 합니다.
+    HTML(string="""
+        <html><head><style>
+            @page { size: A4; margin: 1.5cm; }
+            body { font-family: 'Malgun Gothic', 'Apple SD Gothic Neo', sans-serif; font-size: 9pt; }
+        </style></head>
+        <body><h1>성과분석 보고서</h1><table><tr><th>구분</th><td>만족도</td></tr></table></body></html>
+    """).write_pdf()
+
+
+STEPS = [
+    ('imports', _imports),
+    ('landing_assets', _landing_assets),
+    ('coefficients', _coefficients),
+    ('policy_db', _policy_db),
+    ('curve_fit', _curve_fit),
+    ('chart', _chart),
+    ('pdf', _pdf),
+]
+
+
+def run():
+    """모든 예열 단계를 순서대로 실행합니다. 한 단계가 실패해도 나머지 단계는 계속합니다."""
+    total_started = time.perf_counter()
+    for name, step in STEPS:
+        started = time.perf_counter()
+        error = None
+        try:
+            with perf.span(f"warmup.{name}"):
+                step()
+        except Exception as e:  # 예열 실패는 해당 기능을 처음 쓸 때 다시 드러나므로 기록만 합니다.
+            error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+            logging.warning(f"예열 단계 '{name}' 실패: {error}")
+        _results[name] = {'ok': error is None, 'seconds': time.perf_counter() - started, 'error': error}
+    logging.info(f"서버 예열 완료: {time.perf_counter() - total_started:.2f}초")
+
+
+def start():
+    """
+    예열 스레드를 시작합니다. 여러 번 호출해도 프로세스당 한 번만 실행됩니다.
+    RAILWAY_WARMUP=0 이면 아무것도 하지 않고 False를 반환합니다.
+    """
+    global _started
+    if os.environ.get(ENABLE_ENV, '1').strip().lower() in ('0', 'false', 'off', 'no'):
+        return False
+    with _start_lock:
+        if not _started:
+            _started = True
+            threading.Thread(target=run, name="railway-warmup", daemon=True).start()
+    return True
+
+
+def results():
+    """단계별 예열 결과 (아직 실행되지 않은 단계는 없음)"""
+    return dict(_results)